@@ -0,0 +1,10 @@
+"""
+Suite de benchmarks de punta a punta. Se ejecuta con
+``python manage.py run_benchmarks``:
+
+- ``scenarios``: una o más peticiones por cada URL de ``inventory/urls.py``
+  sobre datos generados con ``seed_load_data``.
+- ``micro``: validación de IMEI, códigos QR y etiquetas, sin base de datos.
+- ``runner``: mediciones (percentiles de latencia, consultas SQL y memoria
+  pico) y comparación con ``baseline.json``.
+"""
@@ -0,0 +1,84 @@
+"""
+Micro-benchmarks de las utilidades que no necesitan la base de datos. Cada
+uno prepara sus datos y retorna la operación a medir.
+"""
+from decimal import Decimal
+
+from inventory import qr
+from inventory.labels import DEFAULT_TEMPLATE
+from inventory.models import Brand, Phone, PhoneModel
+from inventory.utils import IMEIValidator, LabelGenerator, QRCodeGenerator
+
+
+def _imeis(count):
+    bodies = [f'35{index:012d}' for index in range(count)]
+    return [body + IMEIValidator.calculate_check_digit(body) for body in bodies]
+
+
+def _phones(count):
+    model = PhoneModel(name='Galaxy S23 Ultra', brand=Brand(name='Samsung'))
+    return [
+        Phone(model=model, imei=imei, price=Decimal('899999.00'), color='Negro', storage_capacity='256GB')
+        for imei in _imeis(count)
+    ]
+
+
+def _clear_qr_caches():
+    qr.get_matrix.cache_clear()
+    qr.get_runs.cache_clear()
+    qr.get_pdf_path.cache_clear()
+
+
+def imei_validation():
+    """1000 IMEI validados con Luhn"""
+    imeis = _imeis(1000)
+    return lambda: [IMEIValidator.is_valid_imei(imei) for imei in imeis]
+
+
+def imei_info():
+    """1000 IMEI validados y separados en TAC, serie y verificador"""
+    imeis = _imeis(1000)
+    return lambda: [IMEIValidator.get_imei_info(imei) for imei in imeis]
+
+
+def qr_svg():
+    """20 códigos QR distintos en SVG, sin matrices en caché"""
+    payloads = [QRCodeGenerator.generate_phone_qr_data(phone) for phone in _phones(20)]
+
+    def run():
+        _clear_qr_caches()
+        return [QRCodeGenerator.generate_qr_svg(data) for data in payloads]
+    return run
+
+
+def qr_png():
+    """20 códigos QR distintos en PNG base64, sin matrices en caché"""
+    payloads = [QRCodeGenerator.generate_phone_qr_data(phone) for phone in _phones(20)]
+
+    def run():
+        _clear_qr_caches()
+        return [QRCodeGenerator.generate_qr_code(data) for data in payloads]
+    return run
+
+
+def label_single():
+    """Etiqueta térmica de un celular"""
+    phone = _phones(1)[0]
+
+    def run():
+        _clear_qr_caches()
+        return LabelGenerator.generate_phone_label_pdf(phone).getvalue()
+    return run
+
+
+def label_sheet():
+    """Dos hojas de etiquetas de la plantilla por defecto (42 celulares)"""
+    phones = _phones(42)
+
+    def run():
+        _clear_qr_caches()
+        return LabelGenerator.generate_multiple_labels_pdf(phones, DEFAULT_TEMPLATE).getvalue()
+    return run
+
+
+MICRO_BENCHMARKS = [imei_validation, imei_info, qr_svg, qr_png, label_single, label_sheet]
@@ -0,0 +1,218 @@
+"""
+Mediciones de la suite y comparación con una línea base.
+
+Cada escenario se repite ``iterations`` veces (después de ``warmup``
+repeticiones que no se cuentan) y se guardan los percentiles de latencia, la
+mayor cantidad de consultas SQL de una repetición y la memoria pico de una
+repetición extra medida con ``tracemalloc`` (que hace todo más lento, por eso
+no se mezcla con los tiempos).
+"""
+import gc
+import json
+import platform
+import time
+import tracemalloc
+from contextlib import ExitStack
+from http.cookies import SimpleCookie
+
+import django
+from asgiref.sync import async_to_sync
+from django.db import connection, connections, transaction
+from django.test import AsyncClient, Client
+from django.test.utils import CaptureQueriesContext, override_settings
+from django.urls import reverse
+from django.utils import timezone
+
+# Diferencias menores a estas se consideran ruido aunque superen el umbral
+MIN_LATENCY_DELTA_MS = 1.0
+MIN_MEMORY_DELTA_KB = 256
+
+
+def percentile(samples, fraction):
+    """Percentil por rango más cercano de una lista ya ordenada"""
+    index = max(0, min(len(samples) - 1, round(fraction * len(samples) + 0.5) - 1))
+    return samples[index]
+
+
+def summarize(samples):
+    """Resumen en milisegundos de una lista de duraciones en segundos"""
+    samples = sorted(sample * 1000 for sample in samples)
+    return {
+        'p50_ms': round(percentile(samples, 0.5), 3),
+        'p90_ms': round(percentile(samples, 0.9), 3),
+        'p99_ms': round(percentile(samples, 0.99), 3),
+        'mean_ms': round(sum(samples) / len(samples), 3),
+        'min_ms': round(samples[0], 3),
+    }
+
+
+def peak_memory_kb(run):
+    """Memoria pico (KB) reservada por Python durante una ejecución de ``run``"""
+    tracemalloc.start()
+    try:
+        run()
+        return round(tracemalloc.get_traced_memory()[1] / 1024)
+    finally:
+        tracemalloc.stop()
+
+
+def measure(run, iterations, warmup, count_queries=False):
+    for _ in range(warmup):
+        run()
+    # Como timeit: sin recolector de basura mientras se mide, para que las
+    # pausas que causan los escenarios anteriores no caigan en este
+    gc.collect()
+    gc.disable()
+    try:
+        samples, queries = _time(run, iterations, count_queries)
+    finally:
+        gc.enable()
+    result = summarize(samples)
+    if count_queries:
+        result['queries'] = queries
+    result['peak_kb'] = peak_memory_kb(run)
+    return result
+
+
+def _time(run, iterations, count_queries):
+    samples, queries = [], 0
+    for _ in range(iterations):
+        with ExitStack() as stack:
+            captured = [
+                stack.enter_context(CaptureQueriesContext(connections[alias]))
+                for alias in connections
+            ] if count_queries else []
+            start = time.perf_counter()
+            run()
+            samples.append(time.perf_counter() - start)
+        queries = max(queries, sum(len(context) for context in captured))
+    return samples, queries
+
+
+class ViewBenchmark:
+    """
+    Ejecuta los escenarios de vistas con el cliente de pruebas de Django,
+    con una sesión iniciada por rol. Antes de cada petición se restauran las
+    cookies de la sesión (por ejemplo, para no arrastrar la de lectura de la
+    base principal que deja un POST).
+    """
+
+    def __init__(self, fixtures):
+        self.fixtures = fixtures
+        self.clients = {}
+        for role, user in fixtures['users'].items():
+            for asgi, client_class in ((False, Client), (True, AsyncClient)):
+                client = client_class()
+                client.force_login(user)
+                self.clients[role, asgi] = (client, SimpleCookie(client.cookies.output(header='', sep='\n')))
+
+    def get_path(self, scenario):
+        kwargs = {name: scenario.resolve(value, self.fixtures) for name, value in scenario.kwargs.items()}
+        return reverse(scenario.url_name, kwargs=kwargs)
+
+    def request(self, scenario):
+        """Una petición del escenario, en una transacción que se revierte"""
+        client, cookies = self.clients[scenario.role, scenario.asgi]
+        client.cookies = SimpleCookie(cookies.output(header='', sep='\n'))
+        path = self.get_path(scenario)
+        if scenario.method == 'get':
+            data, extra = scenario.resolve(scenario.params, self.fixtures), {}
+        else:
+            data = scenario.resolve(scenario.data, self.fixtures)
+            extra = {'content_type': 'application/json'} if scenario.json else {}
+        send = getattr(client, scenario.method)
+
+        with override_settings(**scenario.settings), transaction.atomic():
+            if scenario.asgi:
+                response = async_to_sync(self._send_async)(send, path, data, extra)
+            else:
+                response = send(path, data, **extra)
+                if response.streaming:
+                    b''.join(response.streaming_content)
+                response.close()
+            transaction.set_rollback(scenario.rollback)
+        return response
+
+    @staticmethod
+    async def _send_async(send, path, data, extra):
+        response = await send(path, data, **extra)
+        if response.streaming:
+            [chunk async for chunk in response.streaming_content]
+        return response
+
+    def run(self, scenario, iterations, warmup):
+        response = self.request(scenario)
+        if response.status_code != scenario.status:
+            raise AssertionError(
+                f'{scenario.name}: respuesta {response.status_code}, se esperaba {scenario.status}'
+            )
+        return measure(lambda: self.request(scenario), iterations, warmup, count_queries=True)
+
+
+def run_micro(factory, iterations, warmup):
+    return measure(factory(), iterations, warmup)
+
+
+def get_environment():
+    return {
+        'created': timezone.now().isoformat(timespec='seconds'),
+        'python': platform.python_version(),
+        'django': django.get_version(),
+        'database': connection.vendor,
+        'machine': platform.machine(),
+        'host': platform.node(),
+    }
+
+
+def same_machine(results, baseline):
+    """Si la base se midió en esta máquina (con el mismo Python y la misma base de datos)"""
+    keys = ('host', 'machine', 'python', 'database')
+    current, previous = results['environment'], baseline.get('environment', {})
+    return all(current.get(key) == previous.get(key) for key in keys)
+
+
+def load_results(path):
+    with open(path, encoding='utf-8') as file:
+        return json.load(file)
+
+
+def save_results(path, results):
+    with open(path, 'w', encoding='utf-8') as file:
+        json.dump(results, file, indent=2, ensure_ascii=False, sort_keys=True)
+        file.write('\n')
+
+
+def compare(results, baseline, threshold, latency=False):
+    """
+    Regresiones de ``results`` frente a ``baseline``: más consultas SQL (son
+    deterministas: cualquier consulta de más cuenta) o memoria pico más de
+    ``threshold`` (fracción) por encima de la base.
+
+    Con ``latency`` también la mediana y el mínimo a la vez más de
+    ``threshold`` por encima. Una regresión real corre toda la distribución;
+    el ruido de una máquina compartida suele mover la mediana pero no el
+    mínimo. Los tiempos solo son comparables si la base se midió en la misma
+    máquina (ver ``same_machine``).
+    """
+    regressions = []
+    for section in ('views', 'micro'):
+        for name, current in results.get(section, {}).items():
+            previous = baseline.get(section, {}).get(name)
+            if previous is None:
+                continue
+            if (latency and all(current[key] > previous[key] * (1 + threshold) for key in ('p50_ms', 'min_ms'))
+                    and current['p50_ms'] - previous['p50_ms'] >= MIN_LATENCY_DELTA_MS):
+                regressions.append(
+                    f'{name}: mediana {previous["p50_ms"]:.2f} -> {current["p50_ms"]:.2f} ms, '
+                    f'mínimo {previous["min_ms"]:.2f} -> {current["min_ms"]:.2f} ms'
+                )
+            if current.get('queries', 0) > previous.get('queries', 0):
+                regressions.append(
+                    f'{name}: consultas {previous.get("queries", 0)} -> {current["queries"]}'
+                )
+            if (current['peak_kb'] > previous['peak_kb'] * (1 + threshold)
+                    and current['peak_kb'] - previous['peak_kb'] >= MIN_MEMORY_DELTA_KB):
+                regressions.append(
+                    f'{name}: memoria pico {previous["peak_kb"]} -> {current["peak_kb"]} KB'
+                )
+    return regressions
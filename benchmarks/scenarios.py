@@ -0,0 +1,157 @@
+"""
+Peticiones que se miden para cada URL de ``inventory/urls.py`` y los datos
+que necesitan (usuarios, un celular, una venta, un trabajo terminado...).
+"""
+from io import StringIO
+
+from django.core.management import call_command
+from django.urls import get_resolver
+from inventory.audit import AuditService
+from inventory.jobs import JobQueue
+from inventory.labels import DEFAULT_TEMPLATE
+from inventory.models import Customer, CustomUser, Phone, Sale
+
+# Cantidad de códigos de los lotes (búsqueda por lote y auditoría)
+BATCH_SIZE = 100
+
+
+class ViewScenario:
+    """
+    Una petición a una URL con nombre. Los argumentos de la URL (``kwargs``),
+    la query string (``params``) y el cuerpo (``data``) pueden ser funciones
+    que reciben los datos de prueba, como las que arma ``pk()``.
+
+    Cada petición se ejecuta en una transacción que se revierte, así que todas
+    las repeticiones ven la misma base. Con ``rollback=False`` se confirma:
+    para las vistas que guardan estado en memoria del proceso que no vuelve
+    atrás con la transacción (como las sesiones de auditoría).
+    """
+
+    def __init__(self, name, url_name=None, kwargs=None, method='get', role='employee',
+                 params=None, data=None, json=False, status=200, asgi=False, settings=None,
+                 rollback=True):
+        self.name = name
+        self.url_name = url_name or name
+        self.kwargs = kwargs or {}
+        self.method = method
+        self.role = role
+        self.params = params
+        self.data = data
+        self.json = json
+        self.status = status
+        self.asgi = asgi
+        self.settings = settings or {}
+        self.rollback = rollback
+
+    def resolve(self, value, fixtures):
+        return value(fixtures) if callable(value) else value
+
+
+def pk(name):
+    """Argumento de URL tomado de la pk de un dato de prueba"""
+    return lambda fixtures: fixtures[name].pk
+
+
+VIEW_SCENARIOS = [
+    ViewScenario('home', role='admin'),
+    ViewScenario('inventory_list'),
+    ViewScenario('inventory_list_search', 'inventory_list', params={'search': 'Galaxy'}),
+    ViewScenario('inventory_new_list'),
+    ViewScenario('inventory_used_list'),
+    ViewScenario('add_phone'),
+    ViewScenario('add_phone_model', role='admin'),
+    ViewScenario('phone_detail', kwargs={'phone_id': pk('phone')}),
+    ViewScenario('edit_phone', kwargs={'phone_id': pk('phone')}),
+    ViewScenario('delete_phone', kwargs={'phone_id': pk('phone')}, role='admin'),
+    ViewScenario('add_comment', kwargs={'phone_id': pk('phone')}, method='post',
+                 data={'comment': 'Revisado en el benchmark'}, status=302),
+    ViewScenario('update_phone_status', kwargs={'phone_id': pk('phone')}, method='post', role='admin',
+                 data={'status': 'reserved'}, json=True),
+    ViewScenario('sales_list'),
+    ViewScenario('add_sale', kwargs={'phone_id': pk('phone')}),
+    ViewScenario('sale_detail', kwargs={'sale_id': pk('sale')}),
+    ViewScenario('mark_pickup', kwargs={'sale_id': pk('sale')}, method='post', status=302),
+    ViewScenario('customer_list'),
+    ViewScenario('add_customer'),
+    ViewScenario('customer_detail', kwargs={'customer_id': pk('customer')}),
+    ViewScenario('search_customers', params={'q': 'Gar'}),
+    ViewScenario('reports', role='admin'),
+    ViewScenario('export_inventory', role='admin'),
+    ViewScenario('report_job', kwargs={'kind': 'inventory_report'}, method='post', role='admin', status=302),
+    ViewScenario('print_labels'),
+    ViewScenario('job_detail', kwargs={'job_id': pk('job')}),
+    ViewScenario('job_download', kwargs={'job_id': pk('job')}),
+    ViewScenario('job_status_api', kwargs={'job_id': pk('job')}),
+    ViewScenario('search_phone', params=lambda fixtures: {'q': fixtures['phone'].imei}),
+    ViewScenario('search_phone_suffix', 'search_phone', params=lambda fixtures: {'q': fixtures['phone'].imei[-6:]}),
+    ViewScenario('phone_api', kwargs={'identifier': lambda fixtures: fixtures['phone'].imei}),
+    ViewScenario('phone_api_qr', 'phone_api',
+                 kwargs={'identifier': lambda fixtures: fixtures['phone'].get_qr_data()}),
+    ViewScenario('phone_batch_api', method='post', json=True,
+                 data=lambda fixtures: {'codes': fixtures['codes']}),
+    ViewScenario('phone_list_api'),
+    # Página máxima (API_MAX_PAGE_SIZE): con los campos por defecto y con casi todos
+    ViewScenario('phone_list_api_10k', 'phone_list_api', params={'limit': 10000}),
+    ViewScenario('phone_list_api_10k_wide', 'phone_list_api', params={
+        'limit': 10000,
+        'fields': 'id,internal_code,imei,brand,model,status,condition,price,storage_capacity,color,'
+                  'battery_percentage,acquisition_type,acquired_from,added_by,created_at,updated_at',
+    }),
+    ViewScenario('sale_list_api'),
+    ViewScenario('customer_list_api'),
+    ViewScenario('changes_api'),
+    # Solo la apertura del canal: el stream se corta enseguida
+    ViewScenario('inventory_events', asgi=True, settings={'SSE_MAX_STREAM_SECONDS': 0}),
+    ViewScenario('audit_start_api', method='post', json=True, data={'status': 'available'}, status=201),
+    ViewScenario('audit_api', kwargs={'audit_id': pk('audit')}),
+    # Desde la segunda repetición los códigos cuentan como repetidos
+    ViewScenario('audit_scan_api', kwargs={'audit_id': pk('audit')}, method='post', json=True,
+                 data=lambda fixtures: {'codes': fixtures['codes']}, rollback=False),
+    ViewScenario('audit_close_api', kwargs={'audit_id': pk('audit')}, method='post'),
+    ViewScenario('register_user', role='admin'),
+]
+
+
+def get_missing_url_names():
+    """Nombres de URL de la aplicación que no tienen ningún escenario"""
+    covered = {scenario.url_name for scenario in VIEW_SCENARIOS}
+    names = {pattern.name for pattern in get_resolver('inventory.urls').url_patterns}
+    return sorted(names - covered)
+
+
+def seed_dataset(phones, seed):
+    """Genera los datos con ``seed_load_data`` y retorna los conteos que imprimió"""
+    output = StringIO()
+    call_command('seed_load_data', phones=phones, seed=seed, stdout=output)
+    return output.getvalue()
+
+
+def create_fixtures():
+    """
+    Usuarios y objetos que usan los escenarios, elegidos entre los datos
+    generados: los más recientes, como los que se consultan en la tienda
+    """
+    admin = CustomUser.objects.create_user(username='benchmark_admin', role='admin')
+    employee = CustomUser.objects.create_user(username='benchmark_employee', role='employee')
+    phone = Phone.objects.filter(status='available').order_by('-created_at').first()
+    sale = Sale.objects.filter(is_picked_up=False).order_by('-sale_date').first()
+    codes = list(Phone.objects.order_by('-created_at').values_list('imei', flat=True)[:BATCH_SIZE])
+
+    # Un trabajo terminado con su PDF, para la página de espera y la descarga
+    JobQueue.enqueue('phone_labels', {
+        'phone_ids': [str(phone_id) for phone_id in Phone.objects.filter(
+            status='available').order_by('-created_at').values_list('id', flat=True)[:21]],
+        'label_type': DEFAULT_TEMPLATE,
+    }, employee)
+    job = JobQueue.claim('benchmark')
+    JobQueue.run(job)
+
+    return {
+        'users': {'admin': admin, 'employee': employee},
+        'phone': phone,
+        'sale': sale,
+        'customer': Customer.objects.get(pk=sale.customer_id),
+        'job': job,
+        'audit': AuditService.start_audit(employee, status='available'),
+        'codes': codes,
+    }
@@ -1,6 +1,48 @@
+import uuid
+
 from django.contrib import admin
 from django.contrib.auth.admin import UserAdmin
-from .models import CustomUser, Brand, PhoneModel, Phone, PhoneComment, Customer, Sale
+from django.db.models import Q
+from .models import (
+    CustomUser, Brand, PhoneModel, Phone, PhoneComment, Customer, Sale,
+    InventoryAudit, BackgroundJob,
+)
+from .pagination import EstimatedCountPaginator
+from .utils import SearchHelper
+
+
+class LargeTableAdmin(admin.ModelAdmin):
+    """
+    Admin para las tablas que crecen con la operación de la tienda: pagina
+    con la cantidad estimada y no cuenta la tabla completa al buscar o
+    filtrar (el "N en total" del listado).
+
+    Si la búsqueda es un identificador exacto (IMEI, UUID o código QR),
+    ``get_exact_search`` la resuelve con el índice único correspondiente en
+    lugar de recorrer todas las ``search_fields``; el resto de las búsquedas
+    usan los índices trigram de la migración 0010 en PostgreSQL.
+    """
+    paginator = EstimatedCountPaginator
+    show_full_result_count = False
+
+    def get_exact_search(self, parsed):
+        """``Q`` para una búsqueda ya analizada, o ``None`` si es texto libre"""
+        return None
+
+    def get_search_results(self, request, queryset, search_term):
+        if search_term:
+            parsed = SearchHelper.parse_search_query(search_term)
+            exact = self.get_exact_search(parsed) if parsed['type'] != 'text' else None
+            if exact is not None:
+                return queryset.filter(exact), False
+        return super().get_search_results(request, queryset, search_term)
+
+    @staticmethod
+    def parse_uuid(value):
+        try:
+            return uuid.UUID(value)
+        except ValueError:
+            return None
 
 
 @admin.register(CustomUser)
@@ -34,6 +76,12 @@ class PhoneModelAdmin(admin.ModelAdmin):
     list_display = ('brand', 'name', 'is_active', 'created_at')
     list_filter = ('brand', 'is_active', 'created_at')
     search_fields = ('name', 'brand__name')
+    list_select_related = ('brand',)
+    autocomplete_fields = ('brand',)
+
+    def get_queryset(self, request):
+        # También para el autocompletado, que muestra "Marca Modelo"
+        return super().get_queryset(request).select_related(*self.list_select_related)
 
 
 class PhoneCommentInline(admin.TabularInline):
@@ -41,14 +89,33 @@ class PhoneCommentInline(admin.TabularInline):
     extra = 0
     readonly_fields = ('user', 'created_at')
 
+    def get_queryset(self, request):
+        return super().get_queryset(request).select_related('user')
+
 
 @admin.register(Phone)
-class PhoneAdmin(admin.ModelAdmin):
+class PhoneAdmin(LargeTableAdmin):
     list_display = ('model', 'imei', 'status', 'condition', 'price', 'added_by', 'created_at')
     list_filter = ('status', 'condition', 'model__brand', 'created_at')
+    list_select_related = ('model__brand', 'added_by')
     search_fields = ('imei', 'model__name', 'model__brand__name')
+    autocomplete_fields = ('model', 'acquired_from')
     readonly_fields = ('id', 'added_by', 'created_at', 'updated_at')
     inlines = [PhoneCommentInline]
+
+    def get_queryset(self, request):
+        # También para el autocompletado de celulares de las ventas, que
+        # muestra el modelo. El listado solo aplica list_select_related si el
+        # queryset no trae ya un select_related, por eso se usa acá
+        return super().get_queryset(request).select_related(*self.list_select_related)
+
+    def get_exact_search(self, parsed):
+        if parsed['type'] == 'imei':
+            return Q(imei=parsed['value'])
+        if parsed['type'] in ('uuid', 'qr_phone'):
+            phone_id = self.parse_uuid(parsed['value'])
+            return Q(pk=phone_id) if phone_id else None
+        return None
     
     def save_model(self, request, obj, form, change):
         if not change:  # Si es un nuevo objeto
@@ -57,18 +124,34 @@ class PhoneAdmin(admin.ModelAdmin):
 
 
 @admin.register(Customer)
-class CustomerAdmin(admin.ModelAdmin):
+class CustomerAdmin(LargeTableAdmin):
     list_display = ('name', 'email', 'phone', 'dni', 'created_at')
     search_fields = ('name', 'email', 'phone', 'dni')
     list_filter = ('created_at',)
 
 
 @admin.register(Sale)
-class SaleAdmin(admin.ModelAdmin):
+class SaleAdmin(LargeTableAdmin):
     list_display = ('id', 'customer', 'phone', 'sale_price', 'payment_method', 'is_picked_up', 'sold_by', 'sale_date')
     list_filter = ('payment_method', 'is_picked_up', 'has_trade_in', 'sale_date')
+    list_select_related = ('customer', 'phone__model__brand', 'sold_by')
     search_fields = ('customer__name', 'phone__imei', 'phone__model__name')
+    autocomplete_fields = ('phone', 'customer', 'trade_in_phone')
     readonly_fields = ('id', 'sold_by', 'sale_date')
+
+    def get_exact_search(self, parsed):
+        if parsed['type'] == 'imei':
+            return Q(phone__imei=parsed['value'])
+        if parsed['type'] in ('uuid', 'qr_phone', 'qr_sale'):
+            object_id = self.parse_uuid(parsed['value'])
+            if object_id is None:
+                return None
+            if parsed['type'] == 'qr_sale':
+                return Q(pk=object_id)
+            if parsed['type'] == 'qr_phone':
+                return Q(phone_id=object_id)
+            return Q(pk=object_id) | Q(phone_id=object_id)
+        return None
     
     def save_model(self, request, obj, form, change):
         if not change:  # Si es un nuevo objeto
@@ -76,6 +159,24 @@ class SaleAdmin(admin.ModelAdmin):
         super().save_model(request, obj, form, change)
 
 
+@admin.register(InventoryAudit)
+class InventoryAuditAdmin(admin.ModelAdmin):
+    list_display = ('id', 'scope_status', 'scope_condition', 'status', 'expected_count', 'started_by', 'started_at', 'closed_at')
+    list_filter = ('status', 'scope_status', 'scope_condition')
+    list_select_related = ('started_by',)
+    exclude = ('expected',)
+    readonly_fields = ('scope_status', 'scope_condition', 'status', 'expected_count', 'report', 'started_by', 'started_at', 'closed_at')
+
+
+
+@admin.register(BackgroundJob)
+class BackgroundJobAdmin(admin.ModelAdmin):
+    list_display = ('id', 'kind', 'status', 'progress', 'attempts', 'created_by', 'created_at', 'finished_at')
+    list_filter = ('kind', 'status')
+    list_select_related = ('created_by',)
+    readonly_fields = ('worker', 'started_at', 'finished_at', 'error', 'created_by', 'created_at')
+
+
 # Configuración del sitio admin
 admin.site.site_header = 'Administración - Tienda de Celulares'
 admin.site.site_title = 'Tienda de Celulares'
@@ -0,0 +1,211 @@
+"""
+API JSON de solo lectura para celulares, ventas y clientes
+
+Cada recurso define qué campos se pueden pedir con ``fields=`` y a qué lookup
+del ORM corresponden. Las filas se leen con ``values_list()`` (solo las
+columnas pedidas, sin instanciar modelos) y se paginan con cursores por
+clave (keyset) en lugar de OFFSET, así que pedir la página 500 cuesta lo
+mismo que pedir la primera.
+"""
+import base64
+import json
+from operator import attrgetter
+
+from django.db.models import Q
+from django.utils.dateparse import parse_datetime
+
+from .catalog import get_catalog
+from .forms import PhoneSearchForm
+from .models import Phone, Sale, Customer
+from .services import InventoryService
+
+
+class ApiError(ValueError):
+    """Parámetro inválido en una consulta a la API"""
+
+
+class ApiResource:
+    """
+    Recurso paginado de la API. Las subclases definen el modelo, los campos
+    disponibles (nombre público -> lookup del ORM) y el campo de orden.
+    """
+    model = None
+    fields = {}
+    default_fields = ()
+    # Campos que se leen como ``model_id`` y se resuelven con el catálogo en
+    # memoria (nombre público -> función que recibe el PhoneModel)
+    catalog_fields = {}
+    # Se ordena de más nuevo a más viejo por este campo y luego por pk
+    cursor_field = 'created_at'
+
+    def get_queryset(self, params):
+        return self.model.objects.all()
+
+    def parse_fields(self, raw):
+        if not raw:
+            return list(self.default_fields)
+        names = [name.strip() for name in raw.split(',') if name.strip()]
+        unknown = [name for name in names if name not in self.fields]
+        if unknown:
+            raise ApiError(f"Campos desconocidos: {', '.join(unknown)}")
+        return names
+
+    def encode_cursor(self, value, pk):
+        raw = json.dumps([value.isoformat(), str(pk)])
+        return base64.urlsafe_b64encode(raw.encode()).decode()
+
+    def decode_cursor(self, cursor):
+        try:
+            value, pk = json.loads(base64.urlsafe_b64decode(cursor.encode()))
+            value = parse_datetime(value)
+            pk = self.model._meta.pk.to_python(pk)
+        except Exception:
+            raise ApiError('Cursor inválido')
+        if value is None:
+            raise ApiError('Cursor inválido')
+        return value, pk
+
+    def page(self, params, limit):
+        """
+        Retorna ``(campos, filas, siguiente_cursor)`` para los parámetros GET
+        """
+        field_names = self.parse_fields(params.get('fields'))
+        lookups = [self.fields[name] for name in field_names]
+        queryset = self.get_queryset(params).order_by(f'-{self.cursor_field}', '-pk')
+
+        cursor = params.get('cursor')
+        if cursor:
+            value, pk = self.decode_cursor(cursor)
+            queryset = queryset.filter(
+                Q(**{f'{self.cursor_field}__lt': value}) |
+                Q(**{self.cursor_field: value, 'pk__lt': pk})
+            )
+
+        # Las dos últimas columnas son la clave del cursor
+        rows = list(queryset.values_list(*lookups, self.cursor_field, 'pk')[:limit + 1])
+        next_cursor = None
+        if len(rows) > limit:
+            rows = rows[:limit]
+            next_cursor = self.encode_cursor(rows[-1][-2], rows[-1][-1])
+
+        # zip corta en la cantidad de campos pedidos, descartando la clave
+        results = [dict(zip(field_names, row)) for row in rows]
+        resolved = [name for name in field_names if name in self.catalog_fields]
+        if resolved:
+            models = get_catalog().models
+            for result in results:
+                for name in resolved:
+                    model = models.get(result[name])
+                    result[name] = self.catalog_fields[name](model) if model else None
+        return field_names, results, next_cursor
+
+
+class PhoneResource(ApiResource):
+    model = Phone
+    fields = {
+        'id': 'id',
+        'internal_code': 'internal_code',
+        'imei': 'imei',
+        'brand': 'model_id',
+        'model': 'model_id',
+        'model_id': 'model_id',
+        'status': 'status',
+        'condition': 'condition',
+        'price': 'price',
+        'storage_capacity': 'storage_capacity',
+        'color': 'color',
+        'battery_percentage': 'battery_percentage',
+        'acquisition_type': 'acquisition_type',
+        'acquired_from': 'acquired_from_id',
+        'notes': 'notes',
+        'added_by': 'added_by__username',
+        'created_at': 'created_at',
+        'updated_at': 'updated_at',
+    }
+    default_fields = ('id', 'imei', 'brand', 'model', 'status', 'condition', 'price')
+    catalog_fields = {
+        'brand': attrgetter('brand.name'),
+        'model': attrgetter('name'),
+    }
+
+    def get_queryset(self, params):
+        # Mismos filtros que las listas de inventario
+        form = PhoneSearchForm(params)
+        if not form.is_valid():
+            raise ApiError('Filtros inválidos')
+        return InventoryService.filter_phones(Phone.objects.all(), form.cleaned_data)
+
+
+class SaleResource(ApiResource):
+    model = Sale
+    fields = {
+        'id': 'id',
+        'phone': 'phone_id',
+        'imei': 'phone__imei',
+        'customer': 'customer_id',
+        'customer_name': 'customer__name',
+        'sale_price': 'sale_price',
+        'payment_method': 'payment_method',
+        'is_picked_up': 'is_picked_up',
+        'pickup_date': 'pickup_date',
+        'has_trade_in': 'has_trade_in',
+        'trade_in_phone': 'trade_in_phone_id',
+        'trade_in_value': 'trade_in_value',
+        'sold_by': 'sold_by__username',
+        'sale_date': 'sale_date',
+        'updated_at': 'updated_at',
+        'notes': 'notes',
+    }
+    default_fields = ('id', 'phone', 'customer', 'sale_price', 'payment_method', 'is_picked_up', 'sale_date')
+    cursor_field = 'sale_date'
+
+    def get_queryset(self, params):
+        sales = Sale.objects.all()
+        payment_method = params.get('payment_method')
+        if payment_method:
+            if payment_method not in dict(Sale.PAYMENT_METHODS):
+                raise ApiError('Forma de pago inválida')
+            sales = sales.filter(payment_method=payment_method)
+        is_picked_up = params.get('is_picked_up')
+        if is_picked_up in ('true', 'false'):
+            sales = sales.filter(is_picked_up=is_picked_up == 'true')
+        customer = params.get('customer')
+        if customer:
+            if not customer.isdigit():
+                raise ApiError('Cliente inválido')
+            sales = sales.filter(customer_id=customer)
+        return sales
+
+
+class CustomerResource(ApiResource):
+    model = Customer
+    fields = {
+        'id': 'id',
+        'name': 'name',
+        'email': 'email',
+        'phone': 'phone',
+        'address': 'address',
+        'dni': 'dni',
+        'created_at': 'created_at',
+        'updated_at': 'updated_at',
+    }
+    default_fields = ('id', 'name', 'email', 'phone', 'dni')
+
+    def get_queryset(self, params):
+        customers = Customer.objects.all()
+        search = params.get('search', '').strip()
+        if search:
+            customers = customers.filter(
+                Q(name__icontains=search) |
+                Q(email__icontains=search) |
+                Q(phone__icontains=search) |
+                Q(dni__icontains=search)
+            )
+        return customers
+
+
+API_RESOURCES = {
+    'phones': PhoneResource(),
+    'sales': SaleResource(),
+    'customers': CustomerResource(),
+}
@@ -5,3 +5,16 @@ class InventoryConfig(AppConfig):
     default_auto_field = 'django.db.models.BigAutoField'
     name = 'inventory'
     verbose_name = 'Gestión de Inventario'
+
+    def ready(self):
+        from . import signals  # noqa: F401
+        from django.db.backends.signals import connection_created
+        from reportlab import rl_config
+
+        from .db import configure_connection
+
+        connection_created.connect(configure_connection, dispatch_uid='inventory.db.configure_connection')
+
+        # Los PDFs (etiquetas, reportes) se escriben con streams binarios: la
+        # codificación ASCII85 de ReportLab es Python puro y agranda el archivo
+        rl_config.useA85 = 0
@@ -0,0 +1,129 @@
+"""
+Versiones asíncronas de las vistas de consulta y JSON, para el despliegue
+ASGI (ver ``ASYNC_VIEWS`` en settings). Usan el ORM asíncrono, así que un
+long-poll esperando cambios no ocupa un hilo.
+"""
+import asyncio
+
+from asgiref.sync import sync_to_async
+from django.conf import settings
+from django.contrib import messages
+from django.db.models import Q
+from django.http import JsonResponse
+from django.shortcuts import render
+
+from .conditional import conditional_page
+from .decorators import async_login_required, async_admin_required
+from .identifiers import PhoneLookup
+from .models import Phone, Customer
+from .serializers import PhoneSerializer
+from .services import ChangeFeedService, ReportService
+
+
+@async_login_required
+async def search_customers(request):
+    """
+    Vista para buscar clientes via AJAX para autocompletado
+    """
+    query = request.GET.get('q', '').strip()
+    if request.method != 'GET' or len(query) < 2:
+        return JsonResponse({'results': []})
+
+    customers = Customer.objects.filter(
+        Q(name__icontains=query) |
+        Q(email__icontains=query) |
+        Q(phone__icontains=query) |
+        Q(dni__icontains=query)
+    ).order_by('name').values('id', 'name', 'email', 'phone', 'dni')[:20]
+
+    results = []
+    async for customer in customers:
+        results.append({
+            'id': customer['id'],
+            'name': customer['name'],
+            'email': customer['email'] or '',
+            'phone': customer['phone'] or '',
+            'dni': customer['dni'] or '',
+            'display_text': f"{customer['name']} - {customer['phone'] or customer['email'] or customer['dni']}"
+        })
+
+    return JsonResponse({'results': results})
+
+
+async def _phone_api_state(request, identifier):
+    phones = await PhoneLookup(identifier).aresolve(Phone.objects.only('id', 'updated_at', 'internal_code'))
+    if len(phones) != 1:
+        return None
+    return phones[0].updated_at, str(phones[0].id)
+
+
+@async_login_required
+@conditional_page(_phone_api_state)
+async def phone_api(request, identifier):
+    """
+    API para obtener información de un celular por IMEI (o sus últimos
+    dígitos), código interno, ID o código QR
+    """
+    phones = await PhoneLookup(identifier).aresolve(PhoneSerializer.get_queryset(Phone.objects.all()))
+    data, status = PhoneSerializer.lookup_result(phones)
+    return JsonResponse(data, status=status)
+
+
+@async_login_required
+async def changes_api(request):
+    """
+    Feed de cambios posteriores a ``after``, con la misma garantía que la
+    versión síncrona (``ChangeFeedService.get_queryset``). El long-poll
+    espera con asyncio.sleep, sin ocupar un hilo por cliente.
+    """
+    try:
+        after = int(request.GET.get('after', 0))
+        limit = int(request.GET.get('limit', 500))
+        wait = int(request.GET.get('wait', 0))
+    except ValueError:
+        return JsonResponse({'error': 'Parámetros inválidos'}, status=400)
+
+    limit = max(1, min(limit, 1000))
+    wait = max(0, min(wait, getattr(settings, 'CHANGE_FEED_MAX_WAIT', 25)))
+    loop = asyncio.get_running_loop()
+    deadline = loop.time() + wait
+
+    while True:
+        changes = [
+            change async for change in ChangeFeedService.get_queryset(after, limit)
+        ]
+        if changes or loop.time() >= deadline:
+            break
+        await asyncio.sleep(1)
+
+    return JsonResponse({
+        'changes': [
+            {
+                'seq': change['id'],
+                'model': change['model'],
+                'id': change['object_id'],
+                'action': change['action'],
+                'changed_at': change['changed_at'],
+            }
+            for change in changes
+        ],
+        'next': changes[-1]['id'] if changes else after,
+    })
+
+
+@async_login_required
+@async_admin_required
+async def reports(request):
+    """
+    Reportes del sistema (solo administradores). Las secciones se calculan
+    en paralelo en el pool de ReportService.build_report.
+    """
+    context, failed = await sync_to_async(ReportService.build_report, thread_sensitive=False)()
+
+    # El render usa la sesión (mensajes) y el ORM: se hace en modo sincrónico
+    def render_report():
+        if failed:
+            messages.warning(request, 'Algunas secciones del reporte no están actualizadas.')
+        return render(request, 'inventory/reports.html', context)
+
+    return await sync_to_async(render_report)()
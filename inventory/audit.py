@@ -0,0 +1,279 @@
+"""
+Motor de auditorías de inventario (conteo físico por escaneo)
+
+Al abrir una auditoría se guarda la lista de celulares esperados y se carga en
+memoria; cada escaneo se resuelve contra diccionarios en O(1), sin consultas a
+la base por código. Los escaneos se persisten por lote para que otros procesos
+(u otro worker después de un reinicio) puedan reconstruir la sesión.
+
+Cada proceso guarda sus sesiones en un LRU: se descartan las que no se usan
+hace ``AUDIT_SESSION_IDLE_TIMEOUT`` segundos (por defecto 1800; auditorías
+abandonadas o cerradas desde otro proceso) y las más viejas cuando hay más de
+``AUDIT_SESSION_CACHE_SIZE`` (por defecto 20). Una sesión descartada se
+reconstruye desde la base si la auditoría vuelve a usarse.
+"""
+import threading
+import time
+import uuid
+from collections import OrderedDict
+
+from django.conf import settings
+from django.utils import timezone
+
+from .catalog import get_catalog
+from .models import Phone, InventoryAudit, InventoryAuditScan
+from .utils import SearchHelper
+
+
+class AuditSession:
+    """
+    Estado en memoria de una auditoría abierta
+    """
+
+    def __init__(self, audit_id, expected):
+        self.audit_id = audit_id
+        self.by_imei = {}
+        self.by_id = {}
+        for phone_id, imei in expected:
+            phone_id = uuid.UUID(phone_id)
+            self.by_imei[imei] = phone_id
+            self.by_id[phone_id] = phone_id
+        self.found = set()
+        self.unexpected = {}
+        self.duplicates = 0
+        self.scanned = 0
+        self.last_scan_id = 0
+        self.last_used = time.monotonic()
+        self.lock = threading.Lock()
+
+    def _match(self, code):
+        """Busca el celular esperado que corresponde a un código"""
+        parsed = SearchHelper.parse_search_query(code)
+        if parsed['type'] == 'imei':
+            return self.by_imei.get(parsed['value'])
+        if parsed['type'] in ('uuid', 'qr_phone'):
+            try:
+                return self.by_id.get(uuid.UUID(parsed['value']))
+            except ValueError:
+                return None
+        return None
+
+    def scan(self, code):
+        """
+        Registra un código escaneado y retorna el resultado:
+        'found', 'duplicate' o 'unexpected'
+        """
+        self.scanned += 1
+        phone_id = self._match(code)
+        if phone_id is None:
+            self.unexpected[code] = self.unexpected.get(code, 0) + 1
+            return 'unexpected'
+        if phone_id in self.found:
+            self.duplicates += 1
+            return 'duplicate'
+        self.found.add(phone_id)
+        return 'found'
+
+    def tallies(self):
+        """Totales parciales de la auditoría"""
+        return {
+            'expected': len(self.by_id),
+            'found': len(self.found),
+            'missing': len(self.by_id) - len(self.found),
+            'unexpected': len(self.unexpected),
+            'duplicates': self.duplicates,
+            'scanned': self.scanned,
+        }
+
+    def catch_up(self):
+        """
+        Aplica los escaneos guardados desde la última sincronización (propios
+        o de otros procesos) y retorna el resultado de cada uno por ID
+        """
+        outcomes = {}
+        scans = InventoryAuditScan.objects.filter(
+            audit_id=self.audit_id, id__gt=self.last_scan_id
+        ).values_list('id', 'code').order_by('id')
+        for scan_id, code in scans.iterator():
+            outcomes[scan_id] = self.scan(code)
+            self.last_scan_id = scan_id
+        return outcomes
+
+
+class AuditService:
+    """
+    Servicio para abrir, alimentar y cerrar auditorías de inventario
+    """
+
+    # audit_id -> AuditSession, de la menos a la más recientemente usada
+    _sessions = OrderedDict()
+    _registry_lock = threading.Lock()
+
+    # Tamaño de los lotes para las consultas IN del reporte final
+    REPORT_CHUNK_SIZE = 500
+
+    @staticmethod
+    def get_scope_queryset(status='', condition=''):
+        """Celulares que se espera encontrar según el alcance de la auditoría"""
+        phones = Phone.objects.all()
+        if status:
+            phones = phones.filter(status=status)
+        else:
+            phones = phones.exclude(status='sold')
+        if condition:
+            phones = phones.filter(condition=condition)
+        return phones
+
+    @staticmethod
+    def start_audit(user, status='', condition=''):
+        """Abre una auditoría y carga en memoria los celulares esperados"""
+        expected = [
+            [str(phone_id), imei]
+            for phone_id, imei in AuditService.get_scope_queryset(status, condition)
+            .values_list('id', 'imei').iterator()
+        ]
+        audit = InventoryAudit.objects.create(
+            scope_status=status,
+            scope_condition=condition,
+            expected=expected,
+            expected_count=len(expected),
+            started_by=user,
+        )
+        with AuditService._registry_lock:
+            AuditService._sessions[audit.pk] = AuditSession(audit.pk, expected)
+            AuditService._evict()
+        return audit
+
+    @staticmethod
+    def get_session(audit):
+        """Obtiene la sesión en memoria, reconstruyéndola si este proceso no la tiene"""
+        with AuditService._registry_lock:
+            session = AuditService._sessions.get(audit.pk)
+            if session is None:
+                session = AuditSession(audit.pk, audit.expected)
+                AuditService._sessions[audit.pk] = session
+            else:
+                AuditService._sessions.move_to_end(audit.pk)
+            session.last_used = time.monotonic()
+            AuditService._evict()
+        return session
+
+    @staticmethod
+    def _evict():
+        """Descarta las sesiones sin uso reciente; se llama con ``_registry_lock`` tomado"""
+        idle = getattr(settings, 'AUDIT_SESSION_IDLE_TIMEOUT', 1800)
+        size = getattr(settings, 'AUDIT_SESSION_CACHE_SIZE', 20)
+        sessions = AuditService._sessions
+        now = time.monotonic()
+        while sessions:
+            audit_id, session = next(iter(sessions.items()))
+            if len(sessions) <= size and now - session.last_used < idle:
+                break
+            del sessions[audit_id]
+
+    @staticmethod
+    def scan_batch(audit, codes, user):
+        """
+        Registra un lote de códigos escaneados con un único INSERT y una
+        consulta para aplicar, en orden, todo lo escaneado desde la última
+        sincronización (incluido lo de otros procesos).
+        """
+        session = AuditService.get_session(audit)
+        with session.lock:
+            scans = InventoryAuditScan.objects.bulk_create([
+                InventoryAuditScan(audit=audit, code=code, scanned_by=user)
+                for code in codes
+            ])
+            if all(scan.pk for scan in scans):
+                outcomes = session.catch_up()
+                results = [
+                    {'code': scan.code, 'result': outcomes[scan.pk]}
+                    for scan in scans
+                ]
+            else:
+                # El backend no devuelve IDs en bulk_create: se aplica el lote
+                # localmente y se descarta lo que otro proceso haya intercalado
+                session.catch_up()
+                results = [{'code': code, 'result': session.scan(code)} for code in codes]
+                session.last_scan_id = InventoryAuditScan.objects.filter(
+                    audit=audit
+                ).order_by('-id').values_list('id', flat=True).first() or 0
+            return results, session.tallies()
+
+    @staticmethod
+    def get_tallies(audit):
+        """Totales parciales de una auditoría"""
+        session = AuditService.get_session(audit)
+        with session.lock:
+            session.catch_up()
+            return session.tallies()
+
+    @staticmethod
+    def close_audit(audit):
+        """Cierra la auditoría y genera el reporte de diferencias"""
+        session = AuditService.get_session(audit)
+        with session.lock:
+            session.catch_up()
+            missing_ids = [phone_id for phone_id in session.by_id if phone_id not in session.found]
+            report = session.tallies()
+            report['missing_phones'] = AuditService._describe_phones(missing_ids)
+            report['unexpected_codes'] = AuditService._describe_unexpected(session.unexpected)
+
+        audit.status = 'closed'
+        audit.closed_at = timezone.now()
+        audit.report = report
+        audit.save(update_fields=['status', 'closed_at', 'report'])
+        with AuditService._registry_lock:
+            AuditService._sessions.pop(audit.pk, None)
+        return report
+
+    @staticmethod
+    def _phone_rows(**lookup):
+        return Phone.objects.filter(**lookup).values('id', 'imei', 'status', 'model_id')
+
+    @staticmethod
+    def _row_to_dict(row, models):
+        return {
+            'id': str(row['id']),
+            'imei': row['imei'],
+            'model': str(models[row['model_id']]) if row['model_id'] in models else '',
+            'status': row['status'],
+        }
+
+    @staticmethod
+    def _describe_phones(phone_ids):
+        """Datos actuales de los celulares faltantes (consultas IN por lotes)"""
+        chunk = AuditService.REPORT_CHUNK_SIZE
+        models = get_catalog().models
+        phones = []
+        for start in range(0, len(phone_ids), chunk):
+            for row in AuditService._phone_rows(id__in=phone_ids[start:start + chunk]):
+                phones.append(AuditService._row_to_dict(row, models))
+        return phones
+
+    @staticmethod
+    def _describe_unexpected(unexpected):
+        """
+        Clasifica los códigos inesperados: celulares que existen pero están
+        fuera del alcance (por ejemplo marcados como vendidos) o códigos
+        desconocidos
+        """
+        resolved = {}
+        codes = list(unexpected)
+        chunk = AuditService.REPORT_CHUNK_SIZE
+        for start in range(0, len(codes), chunk):
+            resolved.update(SearchHelper.resolve_phone_codes(codes[start:start + chunk]))
+
+        described = []
+        for code, count in unexpected.items():
+            phone = resolved.get(code)
+            described.append({
+                'code': code,
+                'count': count,
+                'phone': {
+                    'id': str(phone.id),
+                    'imei': phone.imei,
+                    'status': phone.status,
+                } if phone else None,
+            })
+        return described
@@ -0,0 +1,66 @@
+"""
+Backend de autenticación con el usuario en caché
+
+En cada petición AuthenticationMiddleware vuelve a leer el usuario de la
+sesión con ``get_user``. Este backend guarda el usuario en la caché "default",
+compartida entre procesos (en disco con el perfil de producción), y las
+señales lo borran cuando el usuario se guarda o se elimina.
+``AUTH_USER_CACHE_TIMEOUT`` (segundos, por defecto 300) acota lo que puede
+quedar desactualizado un cambio hecho sin señales (``QuerySet.update``); 0
+desactiva la caché.
+
+El hash de la contraseña no se guarda en la caché: el usuario va con el campo
+``password`` diferido (si algo lo lee se consulta la base, y ``save()`` no lo
+escribe) y con los hash de sesión, que es lo único que Django necesita de la
+contraseña para validar la sesión, ya calculados (ver
+``CustomUser.get_session_auth_hash``).
+
+La sesión guarda la ruta del backend: reemplazar este backend en
+``AUTHENTICATION_BACKENDS`` cierra la sesión de todos los usuarios una vez.
+"""
+import copy
+
+from django.conf import settings
+from django.contrib.auth.backends import ModelBackend
+from django.core.cache import cache
+
+# Atributo con los hash de sesión (actual y de SECRET_KEY_FALLBACKS) del
+# usuario en caché
+SESSION_HASHES_ATTR = '_session_auth_hashes'
+
+
+def _user_cache_key(user_id):
+    return f'auth_user:{user_id}'
+
+
+def invalidate_cached_user(user_id):
+    cache.delete(_user_cache_key(user_id))
+
+
+def _without_password(user):
+    """Copia de ``user`` para la caché: hash de sesión sí, contraseña no"""
+    hashes = [user.get_session_auth_hash(), *user.get_session_auth_fallback_hash()]
+    cached = copy.copy(user)
+    del cached.password
+    setattr(cached, SESSION_HASHES_ATTR, hashes)
+    return cached
+
+
+class CachedModelBackend(ModelBackend):
+    """ModelBackend que resuelve ``get_user`` desde la caché"""
+
+    def get_user(self, user_id):
+        timeout = getattr(settings, 'AUTH_USER_CACHE_TIMEOUT', 300)
+        if not timeout:
+            return super().get_user(user_id)
+        key = _user_cache_key(user_id)
+        user = cache.get(key)
+        # Las entradas de versiones anteriores traen la contraseña: se reemplazan
+        if user is None or SESSION_HASHES_ATTR not in user.__dict__:
+            user = super().get_user(user_id)
+            if user is None:
+                return None
+            cache.set(key, _without_password(user), timeout)
+        # La caché devuelve una copia: lo que la petición guarde en el objeto
+        # (permisos, backend) no se comparte con otras peticiones
+        return user if self.user_can_authenticate(user) else None
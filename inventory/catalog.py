@@ -0,0 +1,166 @@
+"""
+Catálogo de marcas y modelos de celular en memoria del proceso
+
+Marcas y modelos son tablas chicas que casi no cambian, pero se muestran en
+casi todas las listas, reportes y etiquetas. En lugar de unirlas en cada
+consulta (``select_related('model__brand')``), cada proceso las carga una vez
+con una sola consulta y resuelve los nombres en memoria.
+
+Para invalidar entre procesos se usa un número de versión guardado en la
+caché "default" (compartida entre procesos, como la versión de las filas de
+``fragments``): las señales lo cambian cuando se edita una marca o un modelo
+y cada proceso vuelve a cargar su copia cuando ve una versión distinta.
+
+Los modelos del catálogo son instancias compartidas entre peticiones: son de
+solo lectura. Para editar un modelo hay que leerlo de la base.
+"""
+import threading
+import time
+from functools import lru_cache
+
+from django.core.cache import cache
+from django.db.models import Case, IntegerField, Value, When
+from django.db.models.query import ModelIterable
+
+CATALOG_VERSION_KEY = 'catalog:version'
+
+_catalog = None
+_lock = threading.Lock()
+
+
+class Catalog:
+    """Copia del catálogo cargada con una versión dada"""
+
+    def __init__(self, version, models):
+        self.version = version
+        # id -> PhoneModel con su marca ya cargada, ordenado por marca y nombre
+        self.models = {model.id: model for model in models}
+
+
+def get_catalog_version():
+    version = cache.get(CATALOG_VERSION_KEY)
+    if version is None:
+        # Si la versión se perdió (reinicio, desalojo) se arranca con un valor
+        # nuevo, así todos los procesos vuelven a cargar el catálogo
+        cache.add(CATALOG_VERSION_KEY, time.time_ns(), None)
+        version = cache.get(CATALOG_VERSION_KEY)
+    return version
+
+
+def get_catalog():
+    """Catálogo del proceso, recargado si otro proceso cambió la versión"""
+    global _catalog
+    version = get_catalog_version()
+    catalog = _catalog
+    if catalog is None or catalog.version != version:
+        from .models import PhoneModel
+
+        with _lock:
+            catalog = _catalog
+            if catalog is None or catalog.version != version:
+                catalog = _catalog = Catalog(
+                    version,
+                    PhoneModel.objects.select_related('brand').order_by('brand__name', 'name'),
+                )
+    return catalog
+
+
+def invalidate_catalog():
+    """Invalida el catálogo en todos los procesos"""
+    global _catalog
+    try:
+        cache.incr(CATALOG_VERSION_KEY)
+    except ValueError:
+        cache.set(CATALOG_VERSION_KEY, time.time_ns(), None)
+    _catalog = None
+
+
+def get_phone_model(model_id):
+    """Modelo (con su marca) del catálogo, o ``None`` si no está"""
+    return get_catalog().models.get(model_id)
+
+
+def get_model_names(model_id):
+    """``(marca, modelo)`` de un modelo, o ``(None, None)`` si no está"""
+    model = get_phone_model(model_id)
+    if model is None:
+        return None, None
+    return model.brand.name, model.name
+
+
+def get_model_choices(brand=None, active_only=False):
+    """Opciones ``(id, "Marca Modelo")``, como el ``__str__`` de PhoneModel"""
+    return [
+        (model.id, str(model))
+        for model in get_catalog().models.values()
+        if (brand is None or model.brand.name == brand) and (model.is_active or not active_only)
+    ]
+
+
+def get_model_ids(brand=None, active_only=False):
+    """Ids de los modelos de una marca (por nombre), para filtrar sin unir marcas"""
+    return [model_id for model_id, label in get_model_choices(brand, active_only)]
+
+
+def search_model_ids(text):
+    """
+    Ids de los modelos cuya marca, nombre o "Marca Modelo" contienen
+    ``text`` (sin distinguir mayúsculas), para buscar sin unir las tablas
+    """
+    text = text.casefold()
+    return [
+        model.id for model in get_catalog().models.values()
+        if text in model.name.casefold() or text in model.brand.name.casefold()
+        or text in str(model).casefold()
+    ]
+
+
+def model_order(field='model_id'):
+    """Expresión para ordenar por marca y nombre del modelo sin unir las tablas"""
+    models = get_catalog().models
+    return Case(
+        *[When(**{field: model_id}, then=Value(position)) for position, model_id in enumerate(models)],
+        default=Value(len(models)),
+        output_field=IntegerField(),
+    )
+
+
+class CatalogIterable(ModelIterable):
+    """
+    Iterable de ``with_catalog``: a cada objeto le asigna el modelo del
+    catálogo en la relación ``path`` (por ejemplo ``phone__model``)
+    """
+    path = ()
+
+    def __iter__(self):
+        models = get_catalog().models
+        *parents, name = self.path
+        for obj in super().__iter__():
+            target = obj
+            for parent in parents:
+                target = getattr(target, parent)
+                if target is None:
+                    break
+            else:
+                field = target._meta.get_field(name)
+                model = models.get(getattr(target, field.attname))
+                if model is not None:
+                    field.set_cached_value(target, model)
+            yield obj
+
+
+@lru_cache(maxsize=None)
+def _get_iterable_class(path):
+    return type('CatalogIterable', (CatalogIterable,), {'path': tuple(path.split('__'))})
+
+
+def with_catalog(queryset, path='model'):
+    """
+    ``queryset`` cuyos objetos traen el modelo de celular (y su marca) del
+    catálogo en memoria en lugar de unirlo en la consulta. Las relaciones
+    intermedias de ``path`` (``phone`` en ``phone__model``) tienen que venir
+    en un ``select_related``.
+    """
+    queryset = queryset.all()
+    queryset._iterable_class = _get_iterable_class(path)
+    return queryset
@@ -0,0 +1,128 @@
+"""
+Soporte de GET condicional (ETag / Last-Modified) para vistas de solo lectura
+"""
+import asyncio
+import calendar
+import hashlib
+from functools import wraps
+
+from django.core.exceptions import ValidationError
+from django.utils.cache import get_conditional_response, patch_cache_control
+from django.utils.http import http_date, quote_etag
+from django.views.decorators.cache import cache_control
+from django.views.decorators.http import condition
+
+
+def _has_pending_messages(request):
+    """Indica si hay mensajes flash pendientes (no deben perderse con un 304)"""
+    storage = getattr(request, '_messages', None)
+    return storage is not None and len(storage) > 0
+
+
+def _request_fingerprint(request):
+    """
+    Partes de la petición que cambian el HTML renderizado aunque los datos
+    sean los mismos: usuario, rol y token CSRF embebido en los formularios
+    """
+    user = request.user
+    return (
+        user.pk,
+        getattr(user, 'role', ''),
+        user.is_staff,
+        request.META.get('CSRF_COOKIE', ''),
+    )
+
+
+def _make_etag(request, state):
+    key = repr((_request_fingerprint(request), request.get_full_path(), state))
+    return hashlib.md5(key.encode()).hexdigest()
+
+
+def conditional_page(state_func):
+    """
+    Decorador que agrega ETag y Last-Modified a una vista.
+
+    ``state_func(request, *args, **kwargs)`` debe devolver una tupla
+    ``(last_modified, partes)`` con la fecha de la última modificación de los
+    datos mostrados y cualquier valor adicional que identifique su estado
+    (por ejemplo la cantidad de filas, para detectar eliminaciones). Si
+    devuelve ``None`` la vista se ejecuta normalmente. El estado se calcula
+    una sola vez por petición y, si no cambió, se responde 304 sin renderizar
+    el template.
+
+    Para vistas asíncronas ``state_func`` también debe ser asíncrona y el
+    usuario ya tiene que estar resuelto (ver async_login_required).
+    """
+    def get_state(request, *args, **kwargs):
+        if not hasattr(request, '_conditional_state'):
+            state = None
+            if not _has_pending_messages(request):
+                try:
+                    state = state_func(request, *args, **kwargs)
+                except (ValidationError, ValueError):
+                    # Identificador mal formado: la vista se encarga del error
+                    state = None
+            request._conditional_state = state
+        return request._conditional_state
+
+    def etag_func(request, *args, **kwargs):
+        state = get_state(request, *args, **kwargs)
+        if state is None:
+            return None
+        return _make_etag(request, state)
+
+    def last_modified_func(request, *args, **kwargs):
+        state = get_state(request, *args, **kwargs)
+        if state is None:
+            return None
+        return state[0]
+
+    def decorator(view_func):
+        if asyncio.iscoroutinefunction(view_func):
+            return _async_conditional(state_func, view_func)
+
+        # no-cache obliga al navegador a revalidar siempre (nunca mostrar datos
+        # viejos), pero la revalidación es barata cuando no hubo cambios
+        @wraps(view_func)
+        @cache_control(private=True, no_cache=True)
+        @condition(etag_func=etag_func, last_modified_func=last_modified_func)
+        def _wrapped_view(request, *args, **kwargs):
+            return view_func(request, *args, **kwargs)
+        return _wrapped_view
+
+    return decorator
+
+
+def _async_conditional(state_func, view_func):
+    """
+    Versión asíncrona de conditional_page (``condition`` de Django 4.2 es
+    solo sincrónico). Pensada para endpoints JSON: no revisa mensajes flash
+    porque leerlos requiere cargar la sesión.
+    """
+    @wraps(view_func)
+    async def _wrapped_view(request, *args, **kwargs):
+        state = None
+        if request.method in ('GET', 'HEAD'):
+            try:
+                state = await state_func(request, *args, **kwargs)
+            except (ValidationError, ValueError):
+                state = None
+
+        etag = last_modified = None
+        if state is not None:
+            etag = quote_etag(_make_etag(request, state))
+            if state[0] is not None:
+                last_modified = calendar.timegm(state[0].utctimetuple())
+            response = get_conditional_response(request, etag=etag, last_modified=last_modified)
+            if response is not None:
+                patch_cache_control(response, private=True, no_cache=True)
+                return response
+
+        response = await view_func(request, *args, **kwargs)
+        if etag and response.status_code == 200:
+            response.headers.setdefault('ETag', etag)
+            if last_modified:
+                response.headers.setdefault('Last-Modified', http_date(last_modified))
+        patch_cache_control(response, private=True, no_cache=True)
+        return response
+    return _wrapped_view
@@ -1,9 +1,26 @@
+from django.utils.functional import SimpleLazyObject
+
+
 def user_info(request):
     """
     Context processor para agregar información del usuario a todos los templates
+
+    Los valores se calculan recién cuando un template los usa (y una sola vez
+    por petición): las páginas que no los muestran no resuelven el usuario.
     """
-    context = {}
-    if request.user.is_authenticated:
-        context['user_role'] = 'admin' if request.user.is_staff else 'empleado'
-        context['user_full_name'] = request.user.get_full_name() or request.user.username
-    return context
+    def get_role():
+        user = request.user
+        if not user.is_authenticated:
+            return ''
+        return 'admin' if user.is_admin() else 'empleado'
+
+    def get_full_name():
+        user = request.user
+        if not user.is_authenticated:
+            return ''
+        return user.get_full_name() or user.username
+
+    return {
+        'user_role': SimpleLazyObject(get_role),
+        'user_full_name': SimpleLazyObject(get_full_name),
+    }
@@ -0,0 +1,108 @@
+"""
+Ajustes que dependen del motor de base de datos
+
+``configure_connection`` se conecta a ``connection_created`` (ver apps.py) y
+aplica en cada conexión nueva los PRAGMA de ``settings.SQLITE_PRAGMAS``; sin
+ese setting la conexión queda como la deja Django. Con conexiones
+persistentes (``CONN_MAX_AGE``) se aplican una sola vez por proceso e hilo.
+
+``retry_on_locked`` repite un bloque de escritura cuando SQLite responde
+"database is locked" después de agotar el ``busy_timeout``.
+
+``estimate_count`` usa en PostgreSQL la estimación del planificador en lugar
+de ``COUNT(*)``, que recorre toda la tabla.
+"""
+import json
+import logging
+import time
+from functools import wraps
+
+from django.conf import settings
+from django.db import DEFAULT_DB_ALIAS, OperationalError, connections, transaction
+
+from .routers import REPORTING_ALIAS
+
+logger = logging.getLogger(__name__)
+
+
+def get_sqlite_pragmas():
+    return getattr(settings, 'SQLITE_PRAGMAS', {})
+
+
+def apply_sqlite_pragmas(cursor, pragmas):
+    # journal_mode=WAL queda guardado en el archivo; el resto es por conexión
+    for name, value in pragmas.items():
+        cursor.execute(f'PRAGMA {name} = {value}')
+
+
+def configure_connection(sender, connection, **kwargs):
+    if connection.vendor != 'sqlite':
+        return
+    pragmas = get_sqlite_pragmas()
+    if connection.alias == REPORTING_ALIAS:
+        # La copia de reportes se reemplaza entera: se deja sin WAL y de
+        # solo lectura
+        pragmas = {name: value for name, value in pragmas.items() if name != 'journal_mode'}
+        pragmas['query_only'] = 1
+    if pragmas:
+        with connection.cursor() as cursor:
+            apply_sqlite_pragmas(cursor, pragmas)
+
+
+def is_locked_error(exc):
+    return isinstance(exc, OperationalError) and 'database is locked' in str(exc)
+
+
+def retry_on_locked(func=None, *, using=DEFAULT_DB_ALIAS):
+    """
+    Ejecuta ``func`` dentro de ``transaction.atomic`` y, si SQLite la aborta
+    por un bloqueo, la vuelve a ejecutar desde el principio (la transacción
+    ya se revirtió). ``func`` tiene que poder repetirse: no debe depender de
+    cambios en memoria que hizo un intento anterior.
+
+    Dentro de una transacción ya abierta no se reintenta (no se puede repetir
+    solo una parte); el error sigue hacia el bloque exterior.
+    """
+    def decorator(func):
+        @wraps(func)
+        def wrapper(*args, **kwargs):
+            retries = getattr(settings, 'SQLITE_LOCK_RETRIES', 3)
+            delay = getattr(settings, 'SQLITE_LOCK_RETRY_DELAY', 0.05)
+            attempt = 0
+            while True:
+                nested = connections[using].in_atomic_block
+                try:
+                    with transaction.atomic(using=using):
+                        return func(*args, **kwargs)
+                except OperationalError as exc:
+                    if nested or not is_locked_error(exc) or attempt >= retries:
+                        raise
+                    attempt += 1
+                    logger.warning('Base bloqueada en %s, reintento %d de %d', func.__qualname__, attempt, retries)
+                    time.sleep(delay * 2 ** (attempt - 1))
+        return wrapper
+
+    if func is None:
+        return decorator
+    return decorator(func)
+
+
+def estimate_count(queryset):
+    """
+    Cantidad de filas de ``queryset``. En PostgreSQL, si el planificador
+    estima al menos ``COUNT_ESTIMATE_THRESHOLD`` filas (por defecto 10000) se
+    devuelve esa estimación; por debajo, o en otras bases, se cuenta.
+    """
+    threshold = getattr(settings, 'COUNT_ESTIMATE_THRESHOLD', 10000)
+    connection = connections[queryset.db]
+    if threshold and connection.vendor == 'postgresql':
+        sql, params = queryset.order_by().values('pk').query.sql_with_params()
+        with connection.cursor() as cursor:
+            cursor.execute(f'EXPLAIN (FORMAT JSON) {sql}', params)
+            plan = cursor.fetchone()[0]
+        if isinstance(plan, str):
+            plan = json.loads(plan)
+        estimate = int(plan[0]['Plan']['Plan Rows'])
+        if estimate >= threshold:
+            return estimate
+    return queryset.count()
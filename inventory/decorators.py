@@ -0,0 +1,39 @@
+"""
+Decoradores para las vistas asíncronas (login_required de Django 4.2 solo
+soporta vistas sincrónicas)
+"""
+from functools import wraps
+
+from asgiref.sync import sync_to_async
+from django.contrib.auth.views import redirect_to_login
+
+
+def _load_user(request):
+    # Resuelve el usuario perezoso (consulta la sesión y la base de datos);
+    # SimpleLazyObject lo guarda y los accesos siguientes no hacen consultas
+    request.user.is_authenticated
+    return request.user
+
+
+def async_login_required(view_func):
+    """
+    Equivalente asíncrono de login_required. Deja ``request.user`` ya
+    resuelto, así la vista puede usarlo sin tocar la base de datos.
+    """
+    @wraps(view_func)
+    async def _wrapped_view(request, *args, **kwargs):
+        user = await sync_to_async(_load_user)(request)
+        if not user.is_authenticated:
+            return redirect_to_login(request.get_full_path())
+        return await view_func(request, *args, **kwargs)
+    return _wrapped_view
+
+
+def async_admin_required(view_func):
+    """Solo administradores (se usa junto con async_login_required)"""
+    @wraps(view_func)
+    async def _wrapped_view(request, *args, **kwargs):
+        if not request.user.is_admin():
+            return redirect_to_login(request.get_full_path())
+        return await view_func(request, *args, **kwargs)
+    return _wrapped_view
@@ -0,0 +1,139 @@
+"""
+Pub/sub en proceso para notificar cambios de inventario en vivo (SSE)
+
+Las señales de los modelos publican eventos pequeños (estado de un celular,
+venta nueva o retirada) y cada conexión SSE abierta los recibe por su propia
+cola asyncio. El broker vive en memoria: los eventos solo llegan a las
+conexiones atendidas por el mismo proceso, por eso el canal está pensado para
+el despliegue ASGI (un proceso con event loop que atiende las vistas y el SSE).
+"""
+import asyncio
+import json
+import threading
+
+from .catalog import get_model_names
+
+
+class EventBroker:
+    """
+    Distribuye eventos a las conexiones suscriptas, desde cualquier hilo
+    """
+
+    QUEUE_SIZE = 200
+
+    def __init__(self):
+        self._subscribers = set()
+        self._lock = threading.Lock()
+
+    def subscribe(self):
+        """Registra una conexión; debe llamarse desde el event loop que la atiende"""
+        subscriber = (asyncio.get_running_loop(), asyncio.Queue(maxsize=self.QUEUE_SIZE))
+        with self._lock:
+            self._subscribers.add(subscriber)
+        return subscriber
+
+    def unsubscribe(self, subscriber):
+        with self._lock:
+            self._subscribers.discard(subscriber)
+
+    def publish(self, event):
+        """Envía un evento a todas las conexiones (se puede llamar desde un hilo sync)"""
+        with self._lock:
+            subscribers = list(self._subscribers)
+        for subscriber in subscribers:
+            loop, queue = subscriber
+            try:
+                loop.call_soon_threadsafe(self._deliver, queue, event)
+            except RuntimeError:
+                # El event loop de esa conexión ya se cerró
+                self.unsubscribe(subscriber)
+
+    @staticmethod
+    def _deliver(queue, event):
+        try:
+            queue.put_nowait(event)
+        except asyncio.QueueFull:
+            # Cliente demasiado lento: se descartan los pendientes y se le
+            # pide que recargue la página completa
+            while not queue.empty():
+                queue.get_nowait()
+            queue.put_nowait({'type': 'resync'})
+
+    @property
+    def subscriber_count(self):
+        return len(self._subscribers)
+
+
+broker = EventBroker()
+
+
+def format_sse(event):
+    """Serializa un evento en el formato text/event-stream"""
+    return f"event: {event['type']}\ndata: {json.dumps(event, ensure_ascii=False)}\n\n"
+
+
+def phone_event(phone):
+    """Evento con el estado actual de un celular"""
+    from .templatetags.inventory_extras import STATUS_COLORS
+
+    return {
+        'type': 'phone',
+        'id': str(phone.pk),
+        'status': phone.status,
+        'status_display': phone.get_status_display(),
+        'color': STATUS_COLORS.get(phone.status, 'secondary'),
+        'price': str(phone.price),
+    }
+
+
+def sale_event(sale, created):
+    """Evento de una venta nueva o modificada (por ejemplo, retirada)"""
+    from django.utils import timezone
+    from django.urls import reverse
+
+    phone = sale.phone
+    sold_by = sale.sold_by
+    brand, model = get_model_names(phone.model_id)
+    return {
+        'type': 'sale',
+        'created': created,
+        'id': str(sale.pk),
+        'phone_id': str(phone.pk),
+        'customer_name': sale.customer.name,
+        'customer_phone': sale.customer.phone,
+        'brand': brand,
+        'model': model,
+        'imei': phone.imei,
+        'sale_price': str(sale.sale_price),
+        'payment_method_display': sale.get_payment_method_display(),
+        'is_picked_up': sale.is_picked_up,
+        'sold_by': (sold_by.get_full_name() or sold_by.username) if sold_by else '',
+        'sale_date': timezone.localtime(sale.sale_date).strftime('%d/%m/%Y %H:%M'),
+        'url': reverse('sale_detail', args=[sale.pk]),
+    }
+
+
+async def stream_events(max_seconds=300, heartbeat=15):
+    """
+    Generador asíncrono del stream SSE de una conexión. Se corta después de
+    ``max_seconds`` (EventSource reconecta solo) para no acumular conexiones
+    abandonadas cuyo cierre el servidor no detecta.
+    """
+    loop = asyncio.get_running_loop()
+    subscriber = broker.subscribe()
+    queue = subscriber[1]
+    deadline = loop.time() + max_seconds
+    try:
+        yield 'retry: 3000\n\n'
+        while True:
+            remaining = deadline - loop.time()
+            if remaining <= 0:
+                return
+            try:
+                event = await asyncio.wait_for(queue.get(), timeout=min(heartbeat, remaining))
+            except asyncio.TimeoutError:
+                yield ': ping\n\n'
+                continue
+            yield format_sse(event)
+    finally:
+        broker.unsubscribe(subscriber)
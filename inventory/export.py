@@ -0,0 +1,118 @@
+"""
+Exportación completa (o incremental) del inventario en NDJSON
+
+Una línea JSON por celular. Las filas se leen con ``values_list()`` por
+lotes de ``CHUNK_SIZE``, paginando por clave (``id``, o ``updated_at`` e
+``id`` en la incremental), y los nombres de marca/modelo se resuelven contra
+el catálogo en memoria (``catalog``), así que el uso de memoria no depende de
+la cantidad de celulares. Entre un lote y el siguiente no queda ningún cursor
+abierto: quien consume el generador puede escribir en la base (el progreso de
+los trabajos en segundo plano).
+"""
+import json
+
+from django.db.models import Q
+
+from .catalog import get_catalog
+from .models import Phone
+
+
+def _str_or_none(value):
+    return None if value is None else str(value)
+
+
+def _isoformat_or_none(value):
+    return None if value is None else value.isoformat()
+
+
+class InventoryExporter:
+    """
+    Genera la exportación NDJSON de la tabla de celulares
+    """
+
+    # (nombre en la exportación, columna, conversión a tipo JSON)
+    COLUMNS = [
+        ('id', 'id', str),
+        ('internal_code', 'internal_code', None),
+        ('imei', 'imei', None),
+        ('model_id', 'model_id', None),
+        ('status', 'status', None),
+        ('condition', 'condition', None),
+        ('price', 'price', _str_or_none),
+        ('storage_capacity', 'storage_capacity', None),
+        ('color', 'color', None),
+        ('battery_percentage', 'battery_percentage', None),
+        ('acquisition_type', 'acquisition_type', None),
+        ('acquired_from', 'acquired_from_id', None),
+        ('created_at', 'created_at', _isoformat_or_none),
+        ('updated_at', 'updated_at', _isoformat_or_none),
+    ]
+
+    CHUNK_SIZE = 2000
+
+    @staticmethod
+    def get_queryset(since=None, using=None):
+        """
+        Celulares a exportar. Con ``since`` solo los modificados desde esa
+        fecha (inclusive), ordenados por ``updated_at`` para que el consumidor
+        pueda usar el último valor recibido como próximo ``since``.
+        """
+        phones = Phone.objects.using(using)
+        if since is not None:
+            return phones.filter(updated_at__gte=since).order_by('updated_at', 'id')
+        return phones.order_by('id')
+
+    @staticmethod
+    def iter_rows(since=None, using=None):
+        """Genera un diccionario por celular, con marca y modelo resueltos en memoria"""
+        models = get_catalog().models
+        names = [name for name, column, convert in InventoryExporter.COLUMNS]
+        columns = [column for name, column, convert in InventoryExporter.COLUMNS]
+        converters = [
+            (index, convert)
+            for index, (name, column, convert) in enumerate(InventoryExporter.COLUMNS)
+            if convert is not None
+        ]
+        model_index = columns.index('model_id')
+        id_index = columns.index('id')
+        updated_index = columns.index('updated_at')
+
+        queryset = InventoryExporter.get_queryset(since, using).values_list(*columns)
+        after = Q()
+        while True:
+            rows = list(queryset.filter(after)[:InventoryExporter.CHUNK_SIZE])
+            if not rows:
+                break
+            for row in rows:
+                row = list(row)
+                for index, convert in converters:
+                    row[index] = convert(row[index])
+                record = dict(zip(names, row))
+                model = models.get(row[model_index])
+                record['brand'], record['model'] = (model.brand.name, model.name) if model else (None, None)
+                yield record
+            # El próximo lote empieza después de la última fila (sin convertir)
+            last = rows[-1]
+            if since is not None:
+                after = Q(updated_at__gt=last[updated_index]) | Q(updated_at=last[updated_index], id__gt=last[id_index])
+            else:
+                after = Q(id__gt=last[id_index])
+
+    @staticmethod
+    def iter_ndjson(since=None, using=None):
+        """
+        Genera la exportación como bloques de bytes NDJSON (varias líneas por
+        bloque para no pagar el costo de escritura por fila).
+
+        ``using`` es la base de la que se lee; se recibe ya resuelta porque el
+        generador se consume después de que termina la vista.
+        """
+        encode = json.JSONEncoder(ensure_ascii=False, separators=(',', ':')).encode
+        lines = []
+        for record in InventoryExporter.iter_rows(since, using):
+            lines.append(encode(record))
+            if len(lines) >= InventoryExporter.CHUNK_SIZE:
+                yield ('\n'.join(lines) + '\n').encode()
+                lines = []
+        if lines:
+            yield ('\n'.join(lines) + '\n').encode()
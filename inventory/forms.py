@@ -1,8 +1,89 @@
 from django import forms
 from django.contrib.auth.forms import UserCreationForm
+from django.core.exceptions import ValidationError
+from django.urls import reverse
+from .catalog import get_model_choices, get_phone_model
 from .models import CustomUser, Phone, PhoneComment, Customer, Sale, PhoneModel
 
 
+class LazySelect(forms.Select):
+    """
+    Select de una clave foránea que solo renderiza la opción elegida. Las
+    demás se buscan por AJAX en la URL ``search_url`` (atributo
+    ``data-search-url``), así la página no carga la tabla entera.
+    """
+
+    def __init__(self, search_url, attrs=None):
+        super().__init__(attrs)
+        self.search_url = search_url
+
+    def get_context(self, name, value, attrs):
+        context = super().get_context(name, value, attrs)
+        context['widget']['attrs']['data-search-url'] = reverse(self.search_url)
+        return context
+
+    def optgroups(self, name, value, attrs=None):
+        choices = self.choices
+        selected = [item for item in value if item]
+        try:
+            objects = list(choices.queryset.filter(pk__in=selected)) if selected else []
+        except (ValueError, ValidationError):
+            objects = []
+        self.choices = [choices.choice(obj) for obj in objects]
+        if choices.field.empty_label is not None:
+            self.choices.insert(0, ('', choices.field.empty_label))
+        try:
+            return super().optgroups(name, value, attrs)
+        finally:
+            self.choices = choices
+
+
+class CatalogChoiceIterator:
+    """Opciones del catálogo de modelos en caché, leídas recién al renderizar"""
+
+    def __init__(self, field):
+        self.field = field
+
+    def __iter__(self):
+        if self.field.empty_label is not None:
+            yield ('', self.field.empty_label)
+        yield from get_model_choices(self.field.brand, self.field.active_only)
+
+
+class CatalogModelChoiceField(forms.ModelChoiceField):
+    """
+    Modelo de celular con las opciones del catálogo en memoria: ni renderizar
+    el select ni validar el valor elegido consultan la base
+    """
+
+    def __init__(self, brand=None, active_only=False, **kwargs):
+        self.brand = brand
+        self.active_only = active_only
+        super().__init__(PhoneModel.objects.all(), **kwargs)
+
+    def to_python(self, value):
+        if value in self.empty_values:
+            return None
+        try:
+            model = get_phone_model(int(getattr(value, 'pk', value)))
+        except (TypeError, ValueError):
+            model = None
+        if (model is None
+                or (self.brand is not None and model.brand.name != self.brand)
+                or (self.active_only and not model.is_active)):
+            raise ValidationError(
+                self.error_messages['invalid_choice'],
+                code='invalid_choice',
+                params={'value': value},
+            )
+        return model
+
+    def _get_choices(self):
+        return CatalogChoiceIterator(self)
+
+    choices = property(_get_choices, forms.ChoiceField._set_choices)
+
+
 class CustomUserCreationForm(UserCreationForm):
     """
     Formulario personalizado para crear usuarios
@@ -36,6 +117,8 @@ class PhoneForm(forms.ModelForm):
     """
     Formulario para agregar/editar celulares
     """
+    model = CatalogModelChoiceField()
+    
     class Meta:
         model = Phone
         fields = [
@@ -44,6 +127,7 @@ class PhoneForm(forms.ModelForm):
         ]
         widgets = {
             'notes': forms.Textarea(attrs={'rows': 3}),
+            'acquired_from': LazySelect('search_customers'),
         }
 
     def __init__(self, *args, **kwargs):
@@ -142,8 +226,9 @@ class SaleForm(forms.ModelForm):
     """
     Formulario para registrar ventas
     """
-    trade_in_model = forms.ModelChoiceField(
-        queryset=PhoneModel.objects.filter(brand__name='Apple', is_active=True),
+    trade_in_model = CatalogModelChoiceField(
+        brand='Apple',
+        active_only=True,
         required=False,
         label='Modelo iPhone en parte de pago',
         widget=forms.Select(attrs={'class': 'form-control'}),
@@ -158,6 +243,7 @@ class SaleForm(forms.ModelForm):
         ]
         widgets = {
             'notes': forms.Textarea(attrs={'rows': 3}),
+            'customer': LazySelect('search_customers'),
         }
     
     def __init__(self, *args, **kwargs):
@@ -0,0 +1,45 @@
+"""
+Caché de fragmentos de las filas de las listas de inventario y ventas
+
+Cada fila se guarda con ``{% cache %}`` usando como clave el ``updated_at`` de
+los registros que muestra, así que una fila solo se vuelve a renderizar
+cuando cambió. Los datos que se muestran en la fila pero pertenecen a otros
+modelos sin fecha de modificación propia (marca, modelo, nombre del usuario)
+se cubren con un número de versión global que las señales cambian cuando se
+editan; todas las filas cacheadas quedan invalidadas a la vez.
+"""
+import time
+
+from django.conf import settings
+from django.core.cache import cache
+
+ROW_VERSION_KEY = 'row_fragments:version'
+
+
+def get_row_version():
+    # La versión se guarda en la caché "default", compartida entre procesos,
+    # aunque los fragmentos estén en una caché local ("template_fragments")
+    version = cache.get(ROW_VERSION_KEY)
+    if version is None:
+        # Si la versión se perdió (reinicio, desalojo) se arranca con un valor
+        # nuevo: nunca se reutiliza una clave de fragmentos anteriores
+        cache.add(ROW_VERSION_KEY, time.time_ns(), None)
+        version = cache.get(ROW_VERSION_KEY)
+    return version
+
+
+def bump_row_version():
+    """Invalida todas las filas cacheadas"""
+    try:
+        cache.incr(ROW_VERSION_KEY)
+    except ValueError:
+        cache.set(ROW_VERSION_KEY, time.time_ns(), None)
+
+
+def get_row_cache_settings():
+    """Timeout y versión para las etiquetas ``{% cache %}`` de las filas"""
+    timeout = getattr(settings, 'ROW_FRAGMENT_CACHE_TIMEOUT', 0)
+    return {
+        'timeout': timeout,
+        'version': get_row_version() if timeout else 0,
+    }
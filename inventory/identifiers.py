@@ -0,0 +1,126 @@
+"""
+Resolución de los códigos que se escriben o escanean en el mostrador
+
+Un código puede ser un IMEI completo, los últimos dígitos de un IMEI, el
+código interno de la etiqueta, el UUID del celular o el contenido de un QR
+(``PHONE:...`` o ``SALE:...``). ``PhoneLookup`` clasifica el código y lo busca
+con el índice que corresponde a cada tipo:
+
+- IMEI completo: índice único de ``imei``
+- UUID y QR de celular: clave primaria; QR de venta: clave primaria de la venta
+- código interno: índice único de ``internal_code``
+- últimos dígitos (de 4 a 14): rango sobre el índice de ``imei_reversed``
+  (el IMEI al revés, así el sufijo queda como prefijo). Como también pueden
+  ser un código interno numérico, se buscan las dos cosas en una consulta y
+  gana el código interno
+"""
+import uuid
+
+from django.db.models import Case, Q, Value, When
+
+from .models import Phone
+from .utils import SearchHelper
+
+MIN_SUFFIX_LENGTH = 4
+# Cantidad máxima de celulares que se devuelven para unos últimos dígitos
+MAX_MATCHES = 20
+
+
+def classify(code):
+    """
+    Retorna ``(tipo, valor)`` de un código: ``imei``, ``imei_suffix``,
+    ``internal_code``, ``uuid``, ``qr_phone``, ``qr_sale`` o ``text``. Para
+    ``uuid`` y los QR el valor es el ``UUID``.
+    """
+    code = code.strip()
+    parsed = SearchHelper.parse_search_query(code)
+    kind = parsed['type']
+    if kind == 'imei':
+        return kind, parsed['value']
+    if kind in ('uuid', 'qr_phone', 'qr_sale'):
+        try:
+            return kind, uuid.UUID(parsed['value'])
+        except ValueError:
+            return 'text', code
+    if code.isdigit() and MIN_SUFFIX_LENGTH <= len(code) < 15:
+        return 'imei_suffix', code
+    if code and len(code) <= Phone._meta.get_field('internal_code').max_length and len(code.split()) == 1:
+        return 'internal_code', code
+    return 'text', code
+
+
+def imei_suffix_filter(suffix):
+    """
+    ``Q`` de los IMEI que terminan en ``suffix``: un rango sobre el IMEI al
+    revés, que usa el índice en cualquier base (un ``LIKE 'x%'`` no lo usa en
+    SQLite ni en PostgreSQL con una colación distinta de C)
+    """
+    prefix = suffix[::-1]
+    lookup = Q(imei_reversed__gte=prefix)
+    # Menor cadena de dígitos mayor que todas las que empiezan con el prefijo
+    digits = prefix.rstrip('9')
+    if digits:
+        lookup &= Q(imei_reversed__lt=digits[:-1] + str(int(digits[-1]) + 1))
+    return lookup
+
+
+class PhoneLookup:
+    """
+    Búsqueda de celulares por un código. ``resolve`` (o ``aresolve`` en las
+    vistas asíncronas) retorna la lista de celulares que corresponden: uno si
+    el código es exacto, varios si son los últimos dígitos de más de un IMEI.
+    """
+
+    def __init__(self, code):
+        self.code = code.strip()
+        self.kind, self.value = classify(self.code)
+
+    def get_filter(self):
+        """``Q`` del código, o ``None`` si es texto libre"""
+        if self.kind == 'imei':
+            return Q(imei=self.value)
+        if self.kind in ('uuid', 'qr_phone'):
+            return Q(pk=self.value)
+        if self.kind == 'qr_sale':
+            return Q(sale__pk=self.value)
+        if self.kind == 'imei_suffix':
+            return Q(internal_code=self.value) | imei_suffix_filter(self.value)
+        if self.kind == 'internal_code':
+            return Q(internal_code=self.value)
+        return None
+
+    def get_queryset(self, queryset=None, limit=MAX_MATCHES):
+        """Consulta del filtro del código, o ``None`` si es texto libre"""
+        lookup = self.get_filter()
+        if lookup is None:
+            return None
+        if queryset is None:
+            queryset = Phone.objects.all()
+        candidates = queryset.filter(lookup)
+        if self.kind == 'imei_suffix':
+            # El código interno primero, aunque muchos IMEI terminen igual
+            candidates = candidates.order_by(
+                Case(When(internal_code=self.value, then=Value(0)), default=Value(1)),
+                *Phone._meta.ordering,
+            )
+        return candidates[:limit + 1]
+
+    def pick(self, phones, limit=MAX_MATCHES):
+        """Deja solo la coincidencia exacta, si la hay"""
+        if self.kind == 'imei_suffix':
+            exact = [phone for phone in phones if phone.internal_code == self.value]
+            if exact:
+                phones = exact
+        return phones[:limit]
+
+    def resolve(self, queryset=None, limit=MAX_MATCHES):
+        candidates = self.get_queryset(queryset, limit)
+        if candidates is None:
+            return []
+        return self.pick(list(candidates), limit)
+
+    async def aresolve(self, queryset=None, limit=MAX_MATCHES):
+        candidates = self.get_queryset(queryset, limit)
+        if candidates is None:
+            return []
+        return self.pick([phone async for phone in candidates], limit)
@@ -0,0 +1,30 @@
+"""
+Identificadores ordenados por tiempo para las claves primarias UUID
+
+``uuid7`` arma un UUID versión 7 (RFC 9562): los primeros 48 bits son los
+milisegundos Unix y el resto es aleatorio. Los registros nuevos quedan al
+final del índice de la clave primaria (y de las claves foráneas que la
+referencian) en lugar de en posiciones al azar, como pasa con ``uuid4``.
+Siguen siendo UUID comunes: las URLs ``<uuid:...>`` y los códigos QR
+``PHONE:<id>`` existentes no cambian.
+"""
+import os
+import time
+import uuid
+
+_VERSION = 0x7 << 76
+_VARIANT = 0x2 << 62
+_RANDOM_MASK = ~((0xF << 76) | (0x3 << 62)) & ((1 << 80) - 1)
+
+
+def uuid7(timestamp_ms=None, random_bits=None):
+    """
+    UUID versión 7 para ahora, o para ``timestamp_ms`` con los 80 bits
+    aleatorios ``random_bits`` (datos generados con una semilla)
+    """
+    if timestamp_ms is None:
+        timestamp_ms = time.time_ns() // 1_000_000
+    if random_bits is None:
+        random_bits = int.from_bytes(os.urandom(10), 'big')
+    timestamp_ms &= (1 << 48) - 1
+    return uuid.UUID(int=timestamp_ms << 80 | _VERSION | _VARIANT | random_bits & _RANDOM_MASK)
@@ -0,0 +1,352 @@
+"""
+Cola de trabajos en segundo plano respaldada por la base de datos
+
+Las vistas encolan los trabajos pesados (PDFs de etiquetas y reportes,
+exportaciones) como filas de ``BackgroundJob`` y responden enseguida; los
+procesos de ``manage.py run_workers`` los toman, guardan el archivo resultado
+en ``JOB_RESULTS_ROOT`` (privado, fuera de ``MEDIA_ROOT``) y actualizan el
+progreso, que el navegador consulta por polling. No hace falta ningún broker externo.
+
+Un trabajo que falla se reintenta con espera exponencial hasta
+``max_attempts``; los resultados vencen después de ``JOB_RESULT_TTL``
+segundos y se borran en la limpieza periódica de los workers.
+
+Con SQLite (modo WAL) nunca se escribe en la base mientras la misma conexión
+tiene una lectura abierta: una escritura sobre una lectura cuya versión de
+la base ya cambió (otro worker guardó su progreso) falla enseguida con
+"database is locked", sin esperar el ``busy_timeout``. Por eso los trabajos
+leen por lotes (``JobProgress.track_queryset``) y el progreso se escribe
+entre un lote y el siguiente.
+
+Las vistas guardan en ``params['using']`` la base de la que tenía que leer la
+petición (``get_reporting_alias()``): el worker no tiene la petición, y si
+quien lo encoló acaba de escribir, la copia de reportes todavía no tiene esos
+cambios.
+"""
+import logging
+import math
+import os
+import tempfile
+import time
+import traceback
+from datetime import timedelta
+
+from django.conf import settings
+from django.core.files import File
+from django.db import OperationalError, close_old_connections
+from django.db.models import F, Q
+from django.utils import timezone
+
+from .catalog import model_order, with_catalog
+from .db import is_locked_error, retry_on_locked
+from .export import InventoryExporter
+from .labels import DEFAULT_TEMPLATE
+from .models import BackgroundJob, Phone, Sale
+from .routers import get_reporting_alias
+from .utils import LabelGenerator, ReportGenerator
+
+logger = logging.getLogger(__name__)
+
+# Objetos que se leen por consulta al recorrer un queryset en un trabajo
+BATCH_SIZE = 2000
+
+
+class JobProgress:
+    """
+    Registra el avance de un trabajo. Escribe en la base como mucho una vez
+    por ``interval`` segundos para no agregar una consulta por ítem.
+
+    Cada escritura renueva ``heartbeat_at``; aunque el porcentaje no cambie se
+    escribe al menos cada ``JOB_HEARTBEAT_INTERVAL`` segundos (por defecto
+    60), así ``requeue_stale`` distingue un trabajo largo de uno cuyo worker
+    murió.
+    """
+
+    def __init__(self, job, interval=1.0):
+        self.job = job
+        self.interval = interval
+        self._last_write = 0
+
+    def update(self, done, total):
+        # El 100% se marca al guardar el resultado
+        percent = min(99, done * 100 // total) if total else 0
+        now = time.monotonic()
+        elapsed = now - self._last_write
+        heartbeat = getattr(settings, 'JOB_HEARTBEAT_INTERVAL', 60)
+        if elapsed >= self.interval and (percent != self.job.progress or elapsed >= heartbeat):
+            self._last_write = now
+            try:
+                self._write(percent)
+            except OperationalError as exc:
+                # El progreso es informativo: si la base sigue bloqueada se
+                # intenta de nuevo en la próxima actualización
+                if not is_locked_error(exc):
+                    raise
+                logger.warning('No se pudo guardar el progreso del trabajo %s', self.job.pk)
+                return
+            self.job.progress = percent
+
+    @retry_on_locked
+    def _write(self, percent):
+        BackgroundJob.objects.filter(pk=self.job.pk).update(progress=percent, heartbeat_at=timezone.now())
+
+    def track(self, iterable, total):
+        """
+        Recorre ``iterable`` actualizando el progreso sobre ``total`` ítems.
+        ``iterable`` no tiene que mantener un cursor abierto mientras se
+        recorre (ver ``track_queryset``).
+        """
+        for done, item in enumerate(iterable, 1):
+            yield item
+            self.update(done, total)
+
+    def track_queryset(self, queryset, batch_size=BATCH_SIZE):
+        """
+        Recorre ``queryset`` en su orden actualizando el progreso. Lee
+        primero los pk y después los objetos de a ``batch_size`` con
+        ``in_bulk``: cada lote queda en memoria antes de escribir el progreso.
+        """
+        pks = list(queryset.values_list('pk', flat=True))
+        return self.track(self._iter_batches(queryset, pks, batch_size), len(pks))
+
+    @staticmethod
+    def _iter_batches(queryset, pks, batch_size):
+        for start in range(0, len(pks), batch_size):
+            batch = pks[start:start + batch_size]
+            objects = queryset.in_bulk(batch)
+            # Los que se borraron mientras tanto se omiten
+            yield from (objects[pk] for pk in batch if pk in objects)
+
+
+def get_job_alias(job):
+    """Base de la que lee el trabajo: la que correspondía a la petición que lo encoló"""
+    using = job.params.get('using')
+    if using in settings.DATABASES:
+        return using
+    return get_reporting_alias()
+
+
+def _phone_labels(job, progress):
+    phone_ids = job.params.get('phone_ids', [])
+    phones = with_catalog(Phone.objects.using(get_job_alias(job)).filter(id__in=phone_ids)).order_by(model_order())
+    buffer = LabelGenerator.generate_multiple_labels_pdf(
+        progress.track_queryset(phones),
+        job.params.get('label_type') or DEFAULT_TEMPLATE,
+    )
+    return 'etiquetas.pdf', buffer
+
+
+def _inventory_report(job, progress):
+    phones = with_catalog(Phone.objects.using(get_job_alias(job))).order_by(model_order())
+    status = job.params.get('status')
+    if status:
+        phones = phones.filter(status=status)
+    buffer = ReportGenerator.generate_inventory_report(progress.track_queryset(phones))
+    return 'reporte_inventario.pdf', buffer
+
+
+def _sales_report(job, progress):
+    sales = with_catalog(
+        Sale.objects.using(get_job_alias(job)).select_related('customer', 'phone'), 'phone__model'
+    ).order_by('-sale_date')
+    days = job.params.get('days')
+    if days:
+        sales = sales.filter(sale_date__gte=timezone.now() - timedelta(days=int(days)))
+    buffer = ReportGenerator.generate_sales_report(progress.track_queryset(sales))
+    return 'reporte_ventas.pdf', buffer
+
+
+def _inventory_export(job, progress):
+    # Se escribe a un temporal en disco: la exportación puede ser grande.
+    # iter_ndjson lee por lotes, sin cursor abierto entre uno y otro
+    output = tempfile.TemporaryFile()
+    using = get_job_alias(job)
+    chunks = math.ceil(InventoryExporter.get_queryset(using=using).count() / InventoryExporter.CHUNK_SIZE)
+    for chunk in progress.track(InventoryExporter.iter_ndjson(using=using), chunks):
+        output.write(chunk)
+    output.seek(0)
+    return 'inventario.ndjson', output
+
+
+# Tipo de trabajo -> función(job, progress) que retorna (nombre de archivo, archivo)
+JOB_HANDLERS = {
+    'phone_labels': _phone_labels,
+    'inventory_report': _inventory_report,
+    'sales_report': _sales_report,
+    'inventory_export': _inventory_export,
+}
+
+
+class JobQueue:
+    """
+    Operaciones sobre la cola: encolar, tomar, ejecutar, reintentar y limpiar
+    """
+
+    @staticmethod
+    def enqueue(kind, params=None, user=None):
+        if kind not in JOB_HANDLERS:
+            raise ValueError(f'Tipo de trabajo desconocido: {kind}')
+        return BackgroundJob.objects.create(
+            kind=kind,
+            params=params or {},
+            created_by=user,
+            max_attempts=getattr(settings, 'JOB_MAX_ATTEMPTS', 3),
+        )
+
+    @staticmethod
+    def claim(worker):
+        """
+        Toma el próximo trabajo pendiente. El ``UPDATE ... WHERE status =
+        'pending'`` es atómico, así que dos procesos nunca toman el mismo.
+        """
+        now = timezone.now()
+        candidates = BackgroundJob.objects.filter(
+            status='pending', run_after__lte=now
+        ).order_by('run_after', 'id').values_list('id', flat=True)[:10]
+        for job_id in list(candidates):
+            claimed = BackgroundJob.objects.filter(pk=job_id, status='pending').update(
+                status='running',
+                worker=worker,
+                started_at=now,
+                heartbeat_at=now,
+                progress=0,
+                attempts=F('attempts') + 1,
+            )
+            if claimed:
+                return BackgroundJob.objects.get(pk=job_id)
+        return None
+
+    @staticmethod
+    def get_retry_delay(attempts):
+        """Espera antes del próximo intento: se duplica con cada fallo"""
+        base = getattr(settings, 'JOB_RETRY_BACKOFF', 30)
+        limit = getattr(settings, 'JOB_RETRY_MAX_BACKOFF', 3600)
+        return timedelta(seconds=min(limit, base * 2 ** (attempts - 1)))
+
+    @staticmethod
+    def _owned(job):
+        """
+        El trabajo, si este intento todavía lo tiene tomado (no lo devolvió a
+        la cola ``requeue_stale`` ni lo tomó otro worker)
+        """
+        return BackgroundJob.objects.filter(
+            pk=job.pk, status='running', worker=job.worker, attempts=job.attempts
+        )
+
+    @staticmethod
+    def run(job):
+        """Ejecuta un trabajo ya tomado y guarda el resultado o el error"""
+        content = None
+        try:
+            filename, content = JOB_HANDLERS[job.kind](job, JobProgress(job))
+            job.result.save(filename, File(content, name=filename), save=False)
+        except Exception:
+            logger.exception('Falló el trabajo %s (intento %s)', job.pk, job.attempts)
+            JobQueue._fail(job, traceback.format_exc())
+            return False
+        finally:
+            if content is not None:
+                content.close()
+
+        now = timezone.now()
+        job.status = 'done'
+        job.progress = 100
+        job.error = ''
+        job.finished_at = now
+        job.expires_at = now + timedelta(seconds=getattr(settings, 'JOB_RESULT_TTL', 24 * 3600))
+        saved = retry_on_locked(JobQueue._owned(job).update)(
+            result=job.result.name,
+            status=job.status,
+            progress=job.progress,
+            error=job.error,
+            finished_at=job.finished_at,
+            expires_at=job.expires_at,
+        )
+        if not saved:
+            logger.warning('El trabajo %s ya no pertenece a este intento; se descarta el resultado', job.pk)
+            job.result.delete(save=False)
+            return False
+        return True
+
+    @staticmethod
+    @retry_on_locked
+    def _fail(job, error):
+        now = timezone.now()
+        job.error = error[-4000:]
+        if job.attempts < job.max_attempts:
+            job.status = 'pending'
+            job.run_after = now + JobQueue.get_retry_delay(job.attempts)
+        else:
+            job.status = 'failed'
+            job.finished_at = now
+            job.expires_at = now + timedelta(seconds=getattr(settings, 'JOB_RESULT_TTL', 24 * 3600))
+        JobQueue._owned(job).update(
+            status=job.status,
+            error=job.error,
+            run_after=job.run_after,
+            finished_at=job.finished_at,
+            expires_at=job.expires_at,
+        )
+
+    @staticmethod
+    def requeue_stale():
+        """
+        Devuelve a la cola los trabajos que quedaron "en proceso" porque su
+        worker murió (por ejemplo, reinicio del servidor): los que no
+        renovaron ``heartbeat_at`` en ``JOB_STALE_TIMEOUT`` segundos. Un
+        trabajo largo que sigue avanzando no se toca.
+        """
+        now = timezone.now()
+        limit = now - timedelta(seconds=getattr(settings, 'JOB_STALE_TIMEOUT', 1800))
+        stale = BackgroundJob.objects.filter(
+            Q(heartbeat_at__lt=limit) | Q(heartbeat_at__isnull=True, started_at__lt=limit),
+            status='running',
+        )
+        failed = stale.filter(attempts__gte=F('max_attempts')).update(
+            status='failed',
+            error='El proceso que ejecutaba el trabajo se interrumpió',
+            finished_at=now,
+            expires_at=now + timedelta(seconds=getattr(settings, 'JOB_RESULT_TTL', 24 * 3600)),
+        )
+        requeued = stale.update(status='pending', run_after=now)
+        return requeued + failed
+
+    @staticmethod
+    def cleanup_expired():
+        """Borra los trabajos vencidos junto con su archivo resultado"""
+        deleted = 0
+        expired = BackgroundJob.objects.filter(expires_at__lt=timezone.now())
+        # Se leen todos antes de borrar (sin cursor abierto al escribir)
+        for job in list(expired.only('id', 'result')):
+            if job.result:
+                job.result.delete(save=False)
+            job.delete()
+            deleted += 1
+        return deleted
+
+
+def run_worker(name, stop_event, poll_interval=2.0, burst=False):
+    """
+    Ciclo de un worker: toma trabajos hasta que se pida detenerlo. Con
+    ``burst`` termina cuando no quedan trabajos pendientes.
+
+    Un error al tomar o guardar un trabajo (por ejemplo la base bloqueada
+    más allá de los reintentos) no detiene el worker: se registra y se sigue
+    con el próximo. Si el trabajo quedó "en proceso", ``requeue_stale`` lo
+    devuelve a la cola.
+    """
+    logger.info('Worker %s iniciado (pid %s)', name, os.getpid())
+    while not stop_event.is_set():
+        close_old_connections()
+        try:
+            job = JobQueue.claim(name)
+            if job is None:
+                if burst:
+                    break
+                stop_event.wait(poll_interval)
+                continue
+            JobQueue.run(job)
+        except Exception:
+            logger.exception('Error en el worker %s', name)
+            stop_event.wait(poll_interval)
+    close_old_connections()
@@ -0,0 +1,184 @@
+"""
+Plantillas de etiquetas imprimibles
+
+Cada plantilla es un JSON en ``inventory/label_templates/`` (o en los
+directorios de ``LABEL_TEMPLATE_DIRS``) que describe la hoja, la grilla de
+etiquetas y los elementos de cada etiqueta, en milímetros desde la esquina
+inferior izquierda:
+
+- ``static``: bordes y textos fijos. Se dibujan una sola vez por documento en
+  un form XObject de ReportLab y cada etiqueta solo lo referencia.
+- ``fields``: textos con datos del celular (``{brand}``, ``{model}``,
+  ``{imei}``, ``{price}``, ``{color}``, ``{storage}``, ``{internal_code}``)
+  y el código QR. Con ``"if": "color"`` el campo se omite si el dato está
+  vacío; ``max_chars`` recorta textos largos.
+
+Las plantillas se leen y se convierten a puntos una sola vez por proceso.
+"""
+import json
+from functools import lru_cache
+from io import BytesIO
+from pathlib import Path
+
+from django.conf import settings
+from reportlab.lib.units import mm
+from reportlab.pdfgen import canvas
+
+from . import qr
+
+DEFAULT_TEMPLATE = 'standard'
+
+STATIC_FORM_NAME = 'label-static'
+
+
+class LabelTemplateError(ValueError):
+    """Plantilla de etiqueta inexistente o mal formada"""
+
+
+def _template_dirs():
+    return [Path(__file__).resolve().parent / 'label_templates'] + [
+        Path(path) for path in getattr(settings, 'LABEL_TEMPLATE_DIRS', [])
+    ]
+
+
+def label_values(phone):
+    """Datos del celular que pueden usar los campos de texto"""
+    from .utils import QRCodeGenerator
+
+    return {
+        'brand': phone.model.brand.name,
+        'model': phone.model.name,
+        'imei': phone.imei,
+        'price': phone.price,
+        'color': phone.color,
+        'storage': phone.storage_capacity,
+        'internal_code': phone.internal_code or '',
+        'qr': QRCodeGenerator.generate_phone_qr_data(phone),
+    }
+
+
+class LabelTemplate:
+    """
+    Plantilla compilada: posiciones de cada etiqueta en la hoja y operaciones
+    de dibujo ya convertidas a puntos
+    """
+
+    def __init__(self, key, spec):
+        self.key = key
+        try:
+            self.name = spec['name']
+            self.page_size = (spec['page']['width'] * mm, spec['page']['height'] * mm)
+            self.label_size = (spec['label']['width'] * mm, spec['label']['height'] * mm)
+            grid = spec['grid']
+            self.slots = self._compute_slots(grid)
+            self.static = [self._compile(op) for op in spec.get('static', [])]
+            self.fields = [self._compile(op) for op in spec['fields']]
+        except (KeyError, TypeError) as exc:
+            raise LabelTemplateError(f'Plantilla de etiqueta "{key}" inválida: {exc}')
+
+    def _compute_slots(self, grid):
+        """Esquina inferior izquierda de cada etiqueta, por filas de arriba hacia abajo"""
+        width, height = self.label_size
+        slots = []
+        for row in range(grid['rows']):
+            y = self.page_size[1] - grid['margin_y'] * mm - (row + 1) * height - row * grid['gap_y'] * mm
+            for column in range(grid['columns']):
+                x = grid['margin_x'] * mm + column * (width + grid['gap_x'] * mm)
+                slots.append((x, y))
+        return slots
+
+    @staticmethod
+    def _compile(op):
+        kind = op['type']
+        if kind == 'rect':
+            return (kind, op['x'] * mm, op['y'] * mm, op['width'] * mm, op['height'] * mm)
+        if kind == 'text':
+            return (
+                kind, op['x'] * mm, op['y'] * mm, op['font'], op['size'],
+                op['value'], op.get('if'), op.get('max_chars'),
+            )
+        if kind == 'qr':
+            return (kind, op['x'] * mm, op['y'] * mm, op['size'] * mm)
+        raise LabelTemplateError(f'Tipo de elemento desconocido: {kind}')
+
+    def _draw_static(self, pdf):
+        """Define el form XObject con los elementos fijos de una etiqueta"""
+        width, height = self.label_size
+        pdf.beginForm(STATIC_FORM_NAME, 0, 0, width, height)
+        for op in self.static:
+            if op[0] == 'rect':
+                pdf.rect(*op[1:], stroke=1, fill=0)
+            else:
+                x, y, font, size, value = op[1:6]
+                pdf.setFont(font, size)
+                pdf.drawString(x, y, value)
+        pdf.endForm()
+
+    def _draw_fields(self, pdf, x, y, values):
+        current_font = None
+        for op in self.fields:
+            if op[0] == 'qr':
+                qr.draw_reportlab(pdf, values['qr'], x + op[1], y + op[2], op[3], border=qr.QUIET_ZONE)
+                continue
+            dx, dy, font, size, value, condition, max_chars = op[1:]
+            if condition and not values.get(condition):
+                continue
+            text = value.format(**values)
+            if max_chars:
+                text = text[:max_chars]
+            if current_font != (font, size):
+                pdf.setFont(font, size)
+                current_font = (font, size)
+            pdf.drawString(x + dx, y + dy, text)
+
+    def render(self, phones):
+        """
+        Genera el PDF con una etiqueta por celular (``phones`` puede ser un
+        iterador; se recorre una sola vez)
+        """
+        buffer = BytesIO()
+        pdf = canvas.Canvas(buffer, pagesize=self.page_size, pageCompression=1)
+        if self.static:
+            self._draw_static(pdf)
+
+        per_page = len(self.slots)
+        index = 0
+        for phone in phones:
+            if index == per_page:
+                pdf.showPage()
+                index = 0
+            x, y = self.slots[index]
+            if self.static:
+                pdf.saveState()
+                pdf.translate(x, y)
+                pdf.doForm(STATIC_FORM_NAME)
+                pdf.restoreState()
+            self._draw_fields(pdf, x, y, label_values(phone))
+            index += 1
+
+        pdf.showPage()
+        pdf.save()
+        buffer.seek(0)
+        return buffer
+
+
+@lru_cache(maxsize=None)
+def get_label_template(key):
+    """Plantilla compilada por su nombre de archivo (sin ``.json``)"""
+    if not key or not key.replace('_', '').isalnum():
+        raise LabelTemplateError(f'Plantilla de etiqueta inválida: {key}')
+    for directory in _template_dirs():
+        path = directory / f'{key}.json'
+        if path.exists():
+            with open(path, encoding='utf-8') as template_file:
+                return LabelTemplate(key, json.load(template_file))
+    raise LabelTemplateError(f'No existe la plantilla de etiqueta "{key}"')
+
+
+@lru_cache(maxsize=None)
+def get_label_template_choices():
+    """Lista ``(clave, nombre)`` de las plantillas disponibles, para formularios"""
+    keys = sorted({path.stem for directory in _template_dirs() for path in directory.glob('*.json')})
+    # La plantilla por defecto primero
+    keys.sort(key=lambda key: key != DEFAULT_TEMPLATE)
+    return [(key, get_label_template(key).name) for key in keys]
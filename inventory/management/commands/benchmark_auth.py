@@ -0,0 +1,80 @@
+import time
+
+from django.core.management.base import BaseCommand
+from django.core.signals import request_finished, request_started
+from django.db import close_old_connections, connection, transaction
+from django.test import Client
+from django.test.utils import CaptureQueriesContext, override_settings
+from django.urls import reverse
+from inventory.auth import invalidate_cached_user
+from inventory.models import CustomUser
+
+CONFIGURATIONS = [
+    ('sesión en base + usuario de la base (anterior)',
+     'django.contrib.sessions.backends.db', 'django.contrib.auth.backends.ModelBackend'),
+    ('sesión cached_db + usuario en caché',
+     'django.contrib.sessions.backends.cached_db', 'inventory.auth.CachedModelBackend'),
+    ('sesión en cookie firmada + usuario en caché',
+     'django.contrib.sessions.backends.signed_cookies', 'inventory.auth.CachedModelBackend'),
+]
+
+AUTH_TABLES = ('django_session', CustomUser._meta.db_table)
+
+
+class Command(BaseCommand):
+    help = (
+        'Mide las consultas de sesión y usuario por petición con cada modo de sesión. '
+        'Crea un usuario temporal dentro de una transacción que se revierte.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--requests',
+            type=int,
+            default=200,
+            help='Peticiones por configuración'
+        )
+        parser.add_argument(
+            '--url',
+            help='Página a pedir (por defecto la búsqueda de celulares)'
+        )
+
+    def handle(self, *args, **options):
+        count = options['requests']
+        url = options['url'] or reverse('search_phone')
+        # Como en los tests de Django: sin cerrar la conexión al terminar cada
+        # petición, que está dentro de la transacción del benchmark
+        request_started.disconnect(close_old_connections)
+        request_finished.disconnect(close_old_connections)
+        try:
+            with transaction.atomic():
+                user = CustomUser.objects.create_user(
+                    username='benchmark-auth', password='benchmark-auth', role='admin'
+                )
+                for name, engine, backend in CONFIGURATIONS:
+                    self._measure(name, engine, backend, user, url, count)
+                transaction.set_rollback(True)
+            invalidate_cached_user(user.pk)
+        finally:
+            request_started.connect(close_old_connections)
+            request_finished.connect(close_old_connections)
+
+    def _measure(self, name, engine, backend, user, url, count):
+        with override_settings(SESSION_ENGINE=engine, AUTHENTICATION_BACKENDS=[backend],
+                               ALLOWED_HOSTS=['testserver']):
+            client = Client()
+            client.force_login(user, backend=backend)
+            client.get(url)
+            with CaptureQueriesContext(connection) as queries:
+                start = time.perf_counter()
+                for _ in range(count):
+                    client.get(url)
+                elapsed = time.perf_counter() - start
+        auth_queries = sum(
+            1 for query in queries.captured_queries
+            if any(f'"{table}"' in query['sql'] for table in AUTH_TABLES)
+        )
+        self.stdout.write(
+            f'{name:<48} {auth_queries / count:5.2f} consultas sesión/usuario '
+            f'{len(queries) / count:6.2f} consultas totales {elapsed * 1000 / count:7.2f} ms/petición'
+        )
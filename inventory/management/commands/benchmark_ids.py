@@ -0,0 +1,82 @@
+import os
+import random
+import sqlite3
+import tempfile
+import time
+import uuid
+
+from django.core.management.base import BaseCommand
+from inventory.ids import uuid7
+
+# Mismas columnas clave que crea Django en SQLite: UUID como char(32) y una
+# clave foránea con índice (como Sale.phone o PhoneComment.phone)
+SCHEMA = [
+    'CREATE TABLE phone (id char(32) NOT NULL PRIMARY KEY, imei varchar(15) NOT NULL UNIQUE)',
+    'CREATE TABLE comment (id integer NOT NULL PRIMARY KEY AUTOINCREMENT, '
+    'phone_id char(32) NOT NULL REFERENCES phone (id))',
+    'CREATE INDEX comment_phone_id ON comment (phone_id)',
+]
+
+
+class Command(BaseCommand):
+    help = (
+        'Inserta celulares con id uuid4 y con id ordenado por tiempo (uuid7) en bases SQLite '
+        'temporales; mide inserciones por segundo, tamaño de los índices y búsquedas por id'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--rows', type=int, default=1_000_000, help='Celulares a insertar')
+        parser.add_argument('--batch', type=int, default=10_000, help='Filas por transacción')
+        parser.add_argument('--lookups', type=int, default=100_000, help='Búsquedas por id')
+        parser.add_argument(
+            '--cache-mb',
+            type=int,
+            default=8,
+            help='Caché de páginas de SQLite (MB); menor que los índices para ver el efecto en disco'
+        )
+
+    def handle(self, *args, **options):
+        with tempfile.TemporaryDirectory() as directory:
+            for name, generate in (('uuid4 (anterior)', uuid.uuid4), ('uuid7', uuid7)):
+                self._measure(name, generate, os.path.join(directory, f'{generate.__name__}.sqlite3'), options)
+
+    def _measure(self, name, generate, path, options):
+        db = sqlite3.connect(path, isolation_level=None)
+        db.execute(f'PRAGMA cache_size = -{options["cache_mb"] * 1024}')
+        for statement in SCHEMA:
+            db.execute(statement)
+
+        rows, batch = options['rows'], options['batch']
+        ids = []
+        start = time.perf_counter()
+        for offset in range(0, rows, batch):
+            chunk = [generate().hex for _ in range(min(batch, rows - offset))]
+            db.execute('BEGIN')
+            db.executemany(
+                'INSERT INTO phone (id, imei) VALUES (?, ?)',
+                ((phone_id, f'{offset + index:015d}') for index, phone_id in enumerate(chunk))
+            )
+            db.executemany('INSERT INTO comment (phone_id) VALUES (?)', ((phone_id,) for phone_id in chunk))
+            db.execute('COMMIT')
+            ids.extend(chunk)
+        insert_elapsed = time.perf_counter() - start
+
+        sample = random.Random(0).sample(ids, min(options['lookups'], len(ids)))
+        start = time.perf_counter()
+        for phone_id in sample:
+            db.execute('SELECT imei FROM phone WHERE id = ?', (phone_id,)).fetchone()
+        lookup_elapsed = time.perf_counter() - start
+
+        sizes = dict(db.execute(
+            "SELECT name, SUM(pgsize) FROM dbstat WHERE name IN ('sqlite_autoindex_phone_1', 'comment_phone_id') "
+            'GROUP BY name'
+        ))
+        db.close()
+        mb = 1024 * 1024
+        self.stdout.write(
+            f'{name:<18} {rows / insert_elapsed:9.0f} inserciones/s '
+            f'{len(sample) / lookup_elapsed:9.0f} búsquedas/s '
+            f'índice pk {sizes.get("sqlite_autoindex_phone_1", 0) / mb:6.1f} MB '
+            f'índice fk {sizes.get("comment_phone_id", 0) / mb:6.1f} MB '
+            f'archivo {os.path.getsize(path) / mb:6.1f} MB'
+        )
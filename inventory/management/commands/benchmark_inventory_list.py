@@ -0,0 +1,68 @@
+import itertools
+import time
+from decimal import Decimal
+
+from django.core.management.base import BaseCommand
+from django.core.paginator import Paginator
+from django.template.loader import get_template
+from django.test import RequestFactory, override_settings
+from django.utils import timezone
+from inventory.forms import PhoneSearchForm
+from inventory.models import Brand, CustomUser, Phone, PhoneModel
+
+
+class Command(BaseCommand):
+    help = 'Mide el render del template de inventario con N filas por página (no usa la base de datos)'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--rows',
+            type=int,
+            nargs='+',
+            default=[20, 100, 500],
+            help='Cantidades de filas por página a medir'
+        )
+        parser.add_argument(
+            '--row-cache',
+            action='store_true',
+            help='Medir con la caché de filas activa y ya cargada'
+        )
+        parser.add_argument(
+            '--repeat',
+            type=int,
+            default=20,
+            help='Renders por medición'
+        )
+
+    def handle(self, *args, **options):
+        with override_settings(ROW_FRAGMENT_CACHE_TIMEOUT=3600 if options['row_cache'] else 0):
+            self.run(options)
+
+    def run(self, options):
+        template = get_template('inventory/inventory_list.html')
+        factory = RequestFactory()
+        model = PhoneModel(name='Galaxy S23', brand=Brand(name='Samsung'))
+        added_by = CustomUser(username='empleado1', first_name='Ana', last_name='Pérez')
+        statuses = itertools.cycle([value for value, label in Phone.STATUS_CHOICES if value != 'sold'])
+        conditions = itertools.cycle([value for value, label in Phone.CONDITION_CHOICES])
+        now = timezone.now()
+
+        for role in ('admin', 'employee'):
+            request = factory.get('/inventory/')
+            request.user = CustomUser(username=role, role=role)
+            for rows in options['rows']:
+                phones = [
+                    Phone(model=model, imei=f'35{index:013d}', status=next(statuses),
+                          condition=next(conditions), price=Decimal('899999.00'), color='Negro',
+                          storage_capacity='256GB', added_by=added_by, created_at=now, updated_at=now)
+                    for index in range(rows)
+                ]
+                page_obj = Paginator(phones, rows).get_page(1)
+                context = {'form': PhoneSearchForm(), 'page_obj': page_obj, 'phones': page_obj}
+
+                template.render(context, request)
+                start = time.perf_counter()
+                for _ in range(options['repeat']):
+                    template.render(context, request)
+                elapsed = (time.perf_counter() - start) / options['repeat']
+                self.stdout.write(f'{role:<9} {rows:4d} filas {elapsed * 1000:8.2f} ms/render')
@@ -0,0 +1,79 @@
+import time
+from decimal import Decimal
+from io import BytesIO
+
+from django.core.management.base import BaseCommand
+from reportlab.lib.pagesizes import A4
+from reportlab.lib.units import mm
+from reportlab.pdfgen import canvas
+from inventory import qr
+from inventory.labels import get_label_template, get_label_template_choices
+from inventory.models import Brand, Phone, PhoneModel
+from inventory.utils import QRCodeGenerator
+
+
+def _legacy_sheet(phones):
+    """Hoja A4 de 3x7 como se dibujaba antes: todo por etiqueta, sin compresión"""
+    buffer = BytesIO()
+    p = canvas.Canvas(buffer, pagesize=A4)
+    label_width, label_height = 60*mm, 40*mm
+    x_positions = [15*mm + i * (label_width + 5*mm) for i in range(3)]
+    y_positions = [A4[1] - 15*mm - (i + 1) * (label_height + 2*mm) for i in range(7)]
+    index = 0
+    for phone in phones:
+        if index >= 21:
+            p.showPage()
+            index = 0
+        x, y = x_positions[index % 3], y_positions[index // 3]
+        p.rect(x, y, label_width, label_height)
+        p.setFont("Helvetica-Bold", 8)
+        p.drawString(x + 2*mm, y + label_height - 5*mm, f"{phone.model.brand.name}")
+        p.drawString(x + 2*mm, y + label_height - 8*mm, f"{phone.model.name}")
+        p.setFont("Helvetica", 6)
+        p.drawString(x + 2*mm, y + label_height - 12*mm, f"IMEI: {phone.imei}")
+        p.drawString(x + 2*mm, y + label_height - 15*mm, f"${phone.price}")
+        if phone.color:
+            p.drawString(x + 2*mm, y + label_height - 18*mm, f"Color: {phone.color}")
+        qr.draw_reportlab(p, QRCodeGenerator.generate_phone_qr_data(phone),
+                          x + label_width - 15*mm, y + 2*mm, 12*mm, border=qr.QUIET_ZONE)
+        index += 1
+    p.showPage()
+    p.save()
+    return buffer.getvalue()
+
+
+class Command(BaseCommand):
+    help = 'Mide tiempo y tamaño de PDF de cada plantilla de etiquetas (no usa la base de datos)'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--count',
+            type=int,
+            default=2000,
+            help='Cantidad de etiquetas a generar'
+        )
+
+    def handle(self, *args, **options):
+        count = options['count']
+        model = PhoneModel(name='Galaxy S23 Ultra', brand=Brand(name='Samsung'))
+        phones = [
+            Phone(model=model, imei=f'35{index:013d}', price=Decimal('899999.00'),
+                  color='Negro', storage_capacity='256GB')
+            for index in range(count)
+        ]
+        # Matrices QR en caché para medir solo el armado del PDF
+        for phone in phones:
+            qr.get_pdf_path(QRCodeGenerator.generate_phone_qr_data(phone))
+
+        def measure(name, render):
+            start = time.perf_counter()
+            size = len(render())
+            elapsed = time.perf_counter() - start
+            self.stdout.write(
+                f'{name:<45} {elapsed:7.2f} s {elapsed * 1000 / count:7.3f} ms/etiqueta {size / 1024:9.0f} KB'
+            )
+
+        measure('estándar, dibujo por etiqueta (anterior)', lambda: _legacy_sheet(phones))
+        for key, name in get_label_template_choices():
+            template = get_label_template(key)
+            measure(name, lambda: template.render(phones).getvalue())
@@ -0,0 +1,90 @@
+import time
+from io import BytesIO
+
+from django.core.management.base import BaseCommand
+from reportlab.lib.units import mm
+from reportlab.pdfgen import canvas
+from inventory import qr
+
+
+def _legacy_pil_png(data, size=200):
+    """Camino anterior: imagen PIL a box_size 10 re-muestreada con LANCZOS"""
+    import qrcode
+    from PIL import Image
+
+    code = qrcode.QRCode(version=1, error_correction=qrcode.constants.ERROR_CORRECT_L, box_size=10, border=4)
+    code.add_data(data)
+    code.make(fit=True)
+    img = code.make_image(fill_color="black", back_color="white").resize((size, size), Image.Resampling.LANCZOS)
+    buffer = BytesIO()
+    img.save(buffer, format='PNG')
+    return buffer.getvalue()
+
+
+def _legacy_widget_pdf(payloads):
+    """Camino anterior de las etiquetas: QrCodeWidget de ReportLab"""
+    from reportlab.graphics import renderPDF
+    from reportlab.graphics.barcode.qr import QrCodeWidget
+    from reportlab.graphics.shapes import Drawing
+
+    buffer = BytesIO()
+    p = canvas.Canvas(buffer)
+    for data in payloads:
+        widget = QrCodeWidget(data)
+        widget.barWidth = widget.barHeight = 15*mm
+        drawing = Drawing(15*mm, 15*mm)
+        drawing.add(widget)
+        renderPDF.draw(drawing, p, 20*mm, 20*mm)
+        p.showPage()
+    p.save()
+    return buffer.getvalue()
+
+
+def _engine_pdf(payloads):
+    buffer = BytesIO()
+    p = canvas.Canvas(buffer)
+    for data in payloads:
+        qr.draw_reportlab(p, data, 20*mm, 20*mm, 15*mm, border=qr.QUIET_ZONE)
+        p.showPage()
+    p.save()
+    return buffer.getvalue()
+
+
+class Command(BaseCommand):
+    help = 'Mide tiempo y tamaño por código QR de cada salida (SVG, PNG, PDF), frente al camino anterior'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--count',
+            type=int,
+            default=200,
+            help='Cantidad de códigos distintos a generar'
+        )
+
+    def handle(self, *args, **options):
+        count = options['count']
+        payloads = [
+            f'PHONE:{index:08d}-aaaa-bbbb-cccc-{index:012d}:35{index:013d}:Samsung:Galaxy S23'
+            for index in range(count)
+        ]
+
+        def measure(name, render, per_code=True):
+            start = time.perf_counter()
+            if per_code:
+                size = sum(len(render(data)) for data in payloads)
+            else:
+                size = len(render(payloads))
+            elapsed = time.perf_counter() - start
+            self.stdout.write(
+                f'{name:<32} {elapsed * 1000 / count:8.3f} ms/código {size / count:10.0f} bytes/código'
+            )
+
+        qr.get_matrix.cache_clear()
+        qr.get_runs.cache_clear()
+        qr.get_pdf_path.cache_clear()
+        measure('matriz (sin caché)', lambda data: qr.get_runs(data) and b'')
+        measure('SVG (matriz en caché)', lambda data: qr.render_svg(data).encode())
+        measure('PNG 1 bit x6 (matriz en caché)', lambda data: qr.render_png(data, scale=6))
+        measure('PNG PIL + LANCZOS (anterior)', _legacy_pil_png)
+        measure('PDF rectángulos (matriz en caché)', _engine_pdf, per_code=False)
+        measure('PDF QrCodeWidget (anterior)', _legacy_widget_pdf, per_code=False)
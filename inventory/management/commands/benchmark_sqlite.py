@@ -0,0 +1,116 @@
+import os
+import random
+import sqlite3
+import tempfile
+import threading
+import time
+
+from django.core.management.base import BaseCommand, CommandError
+from inventory.db import apply_sqlite_pragmas, get_sqlite_pragmas
+
+SCHEMA = [
+    'CREATE TABLE phone (id INTEGER PRIMARY KEY, imei TEXT, status TEXT, price REAL, updated_at REAL)',
+    'CREATE INDEX phone_updated ON phone (updated_at)',
+    'CREATE TABLE sale (id INTEGER PRIMARY KEY, phone_id INTEGER, price REAL, created_at REAL)',
+]
+
+READ_QUERY = 'SELECT id, imei, status, price FROM phone WHERE status = ? ORDER BY updated_at DESC LIMIT 50'
+
+
+class Command(BaseCommand):
+    help = (
+        'Lecturas y ventas concurrentes sobre una base SQLite temporal: configuración por defecto '
+        'con una conexión por operación frente a SQLITE_PRAGMAS con conexiones persistentes. '
+        'Usar con el perfil de producción (DJANGO_SETTINGS_MODULE=tienda_celulares.settings_production).'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--readers', type=int, default=8, help='Hilos de lectura')
+        parser.add_argument('--writers', type=int, default=2, help='Hilos que registran ventas')
+        parser.add_argument('--seconds', type=float, default=5, help='Duración de cada medición')
+        parser.add_argument('--rows', type=int, default=20000, help='Celulares en la base temporal')
+
+    def handle(self, *args, **options):
+        pragmas = get_sqlite_pragmas()
+        if not pragmas:
+            raise CommandError('SQLITE_PRAGMAS está vacío: usar el perfil de producción')
+        configurations = [
+            ('por defecto, conexión por operación (anterior)', {}, False),
+            ('SQLITE_PRAGMAS, conexión persistente', pragmas, True),
+        ]
+        with tempfile.TemporaryDirectory() as directory:
+            for index, (name, config, persistent) in enumerate(configurations):
+                path = os.path.join(directory, f'bench{index}.sqlite3')
+                self._create(path, options['rows'])
+                reads, writes, locked = self._run(path, config, persistent, options)
+                seconds = options['seconds']
+                self.stdout.write(
+                    f'{name:<48} {reads / seconds:9.0f} lecturas/s {writes / seconds:7.0f} ventas/s '
+                    f'{locked:5d} "database is locked"'
+                )
+
+    def _create(self, path, rows):
+        db = sqlite3.connect(path)
+        for statement in SCHEMA:
+            db.execute(statement)
+        now = time.time()
+        db.executemany(
+            'INSERT INTO phone (imei, status, price, updated_at) VALUES (?, ?, ?, ?)',
+            ((f'35{i:013d}', 'available', 100 + i % 900, now + i) for i in range(rows))
+        )
+        db.commit()
+        db.close()
+
+    def _run(self, path, pragmas, persistent, options):
+        rows = options['rows']
+        deadline = time.perf_counter() + options['seconds']
+        counts = {'reads': 0, 'writes': 0, 'locked': 0}
+        lock = threading.Lock()
+
+        def connect():
+            # Mismo timeout que usa Django por defecto con sqlite3
+            db = sqlite3.connect(path, timeout=5, isolation_level=None)
+            apply_sqlite_pragmas(db, pragmas)
+            return db
+
+        def worker(operation, counter):
+            db = connect() if persistent else None
+            done = locked = 0
+            rng = random.Random()
+            while time.perf_counter() < deadline:
+                current = db or connect()
+                try:
+                    operation(current, rng)
+                    done += 1
+                except sqlite3.OperationalError as exc:
+                    if 'locked' not in str(exc):
+                        raise
+                    locked += 1
+                    if current.in_transaction:
+                        current.execute('ROLLBACK')
+                finally:
+                    if not persistent:
+                        current.close()
+            if db:
+                db.close()
+            with lock:
+                counts[counter] += done
+                counts['locked'] += locked
+
+        def read(db, rng):
+            db.execute(READ_QUERY, ('available',)).fetchall()
+
+        def write(db, rng):
+            phone_id = rng.randint(1, rows)
+            db.execute('BEGIN')
+            db.execute('UPDATE phone SET status = ?, updated_at = ? WHERE id = ?', ('sold', time.time(), phone_id))
+            db.execute('INSERT INTO sale (phone_id, price, created_at) VALUES (?, ?, ?)', (phone_id, 100, time.time()))
+            db.execute('COMMIT')
+
+        threads = [threading.Thread(target=worker, args=(read, 'reads')) for _ in range(options['readers'])]
+        threads += [threading.Thread(target=worker, args=(write, 'writes')) for _ in range(options['writers'])]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        return counts['reads'], counts['writes'], counts['locked']
@@ -0,0 +1,58 @@
+from collections import Counter
+from io import StringIO
+
+from django.core.management import call_command
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection
+from inventory.db import get_sqlite_pragmas
+from inventory.jobs import JOB_HANDLERS, JobQueue
+from inventory.models import BackgroundJob, Phone
+
+
+class Command(BaseCommand):
+    help = (
+        'Prueba de la cola de trabajos con varios workers a la vez: encola trabajos de cada tipo, '
+        'los ejecuta con run_workers --burst y falla si alguno no terminó al primer intento '
+        '(por ejemplo por "database is locked"). Usar con el perfil de producción (SQLite en modo WAL) '
+        'sobre una copia de la base con datos, por ejemplo los de seed_load_data.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--processes', type=int, default=2, help='Procesos worker')
+        parser.add_argument('--jobs', type=int, default=4, help='Trabajos de cada tipo')
+        parser.add_argument('--labels', type=int, default=2000, help='Celulares por trabajo de etiquetas')
+
+    def handle(self, *args, **options):
+        if connection.vendor == 'sqlite' and not get_sqlite_pragmas():
+            raise CommandError('SQLITE_PRAGMAS está vacío: usar el perfil de producción')
+        if BackgroundJob.objects.filter(status__in=['pending', 'running']).exists():
+            raise CommandError('Hay trabajos pendientes en la cola: usar una copia de la base')
+        phone_ids = [str(pk) for pk in Phone.objects.values_list('pk', flat=True)[:options['labels']]]
+        if not phone_ids:
+            raise CommandError('No hay celulares: cargar datos con seed_load_data')
+
+        params = {'phone_labels': {'phone_ids': phone_ids}}
+        jobs = [
+            JobQueue.enqueue(kind, params.get(kind))
+            for _ in range(options['jobs'])
+            for kind in JOB_HANDLERS
+        ]
+        self.stdout.write(f'{len(jobs)} trabajos encolados, {options["processes"]} workers')
+        try:
+            call_command('run_workers', processes=options['processes'], burst=True, stdout=StringIO())
+            results = BackgroundJob.objects.filter(pk__in=[job.pk for job in jobs])
+            statuses = Counter(results.values_list('status', flat=True))
+            problems = [job for job in results if job.status != 'done' or job.attempts > 1]
+            self.stdout.write(', '.join(f'{count} {status}' for status, count in sorted(statuses.items())))
+            for job in problems:
+                error = job.error.strip().splitlines()[-1:] or ['']
+                self.stderr.write(f'Trabajo {job.pk} ({job.kind}): {job.status}, {job.attempts} intentos. {error[0]}')
+        finally:
+            for job in BackgroundJob.objects.filter(pk__in=[job.pk for job in jobs]):
+                if job.result:
+                    job.result.delete(save=False)
+                job.delete()
+
+        if problems:
+            raise CommandError(f'{len(problems)} trabajos no terminaron al primer intento')
+        self.stdout.write(self.style.SUCCESS('Todos los trabajos terminaron al primer intento'))
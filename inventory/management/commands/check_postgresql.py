@@ -0,0 +1,170 @@
+import importlib
+from io import StringIO
+
+from django.apps import apps
+from django.core.management import call_command
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection, transaction
+from django.db.models.functions import Reverse
+from django.test.utils import override_settings
+from inventory.audit import AuditService
+from inventory.db import estimate_count
+from inventory.identifiers import imei_suffix_filter
+from inventory.jobs import JOB_HANDLERS, JobQueue
+from inventory.models import BackgroundJob, CustomUser, Phone
+from inventory.routers import has_reporting_db
+
+# Cachés locales mientras dura la prueba: los datos de la base de prueba no
+# tienen que invalidar ni ensuciar la caché compartida de producción
+LOCAL_CACHES = {
+    'default': {'BACKEND': 'django.core.cache.backends.locmem.LocMemCache', 'LOCATION': 'check-postgresql'},
+    'template_fragments': {
+        'BACKEND': 'django.core.cache.backends.locmem.LocMemCache', 'LOCATION': 'check-postgresql-fragments',
+    },
+}
+
+
+class CheckFailed(Exception):
+    pass
+
+
+class Command(BaseCommand):
+    help = (
+        'Comprueba en PostgreSQL lo que las pruebas con SQLite no ejecutan: índices de trigramas '
+        '(migración 0010), relleno de imei_reversed con REVERSE() (0012), estimate_count con EXPLAIN, '
+        'y los recorridos con iterator() con la configuración de cursores actual '
+        '(DISABLE_SERVER_SIDE_CURSORS con DJANGO_DB_PGBOUNCER=1). Crea una base de prueba '
+        '("test_" + DJANGO_DB_NAME) con todas las migraciones y datos de seed_load_data, y la borra al '
+        'terminar. Usar con DJANGO_DB_ENGINE=postgresql.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--phones', type=int, default=5000, help='Celulares de los datos de prueba')
+        parser.add_argument('--keepdb', action='store_true', help='No borrar la base de prueba al terminar')
+
+    def handle(self, *args, **options):
+        if connection.vendor != 'postgresql':
+            raise CommandError('La base no es PostgreSQL: definir DJANGO_DB_ENGINE=postgresql')
+        if has_reporting_db():
+            raise CommandError('Correr sin base de reportes (DJANGO_REPORTING_*): la prueba solo crea "default"')
+
+        checks = [
+            ('migraciones e índices de trigramas', self._check_trigram_indexes),
+            ('imei_reversed (0012) y búsqueda por sufijo', self._check_imei_reversed),
+            ('estimate_count', self._check_estimate_count),
+            ('iterator(), auditorías y trabajos', self._check_cursors),
+        ]
+        old_name = connection.settings_dict['NAME']
+        with override_settings(CACHES=LOCAL_CACHES):
+            connection.creation.create_test_db(verbosity=0, autoclobber=True, serialize=False)
+            try:
+                call_command('seed_load_data', phones=options['phones'], stdout=StringIO())
+                failed = 0
+                for name, check in checks:
+                    try:
+                        detail = check()
+                    except CheckFailed as exc:
+                        failed += 1
+                        self.stdout.write(self.style.ERROR(f'{name:<46} FALLÓ: {exc}'))
+                    else:
+                        self.stdout.write(f'{name:<46} ok {detail}')
+            finally:
+                connection.creation.destroy_test_db(old_name, verbosity=0, keepdb=options['keepdb'])
+
+        if failed:
+            raise CommandError(f'{failed} comprobaciones fallaron')
+        self.stdout.write(self.style.SUCCESS('PostgreSQL: todas las comprobaciones pasaron'))
+
+    def _existing_indexes(self, names):
+        with connection.cursor() as cursor:
+            cursor.execute('SELECT indexname FROM pg_indexes WHERE indexname = ANY(%s)', [list(names)])
+            return {row[0] for row in cursor.fetchall()}
+
+    def _check_trigram_indexes(self):
+        migration = importlib.import_module('inventory.migrations.0010_search_trigram_indexes')
+        expected = {name for name, table, column in migration._indexes(apps, None)}
+        missing = expected - self._existing_indexes(expected)
+        if missing:
+            raise CheckFailed(f'faltan los índices {", ".join(sorted(missing))}')
+
+        # Con pocas filas el planificador prefiere recorrer la tabla: se le
+        # impide para ver que el filtro de icontains puede usar el índice
+        index = f'{Phone._meta.db_table}_imei_trgm'
+        sql, params = Phone.objects.filter(imei__icontains='4321').values('pk').query.sql_with_params()
+        with transaction.atomic(), connection.cursor() as cursor:
+            cursor.execute('SET LOCAL enable_seqscan = off')
+            cursor.execute(f'EXPLAIN {sql}', params)
+            plan = '\n'.join(row[0] for row in cursor.fetchall())
+        if index not in plan:
+            raise CheckFailed(f'icontains sobre imei no usa {index}:\n{plan}')
+        return f'({len(expected)} índices)'
+
+    def _check_imei_reversed(self):
+        # Se deshace y se vuelve a aplicar 0012 con datos cargados, así corre
+        # el relleno con REVERSE()
+        call_command('migrate', 'inventory', '0011', verbosity=0)
+        call_command('migrate', 'inventory', verbosity=0)
+        if not self._existing_indexes(['inventory_phone_imei_rev_idx']):
+            raise CheckFailed('falta el índice inventory_phone_imei_rev_idx')
+        wrong = Phone.objects.exclude(imei_reversed=Reverse('imei')).count()
+        if wrong:
+            raise CheckFailed(f'{wrong} celulares con imei_reversed incorrecto')
+
+        # El rango sobre imei_reversed depende de cómo compara la colación
+        suffixes = [imei[-6:] for imei in Phone.objects.values_list('imei', flat=True)[:50]]
+        for suffix in suffixes:
+            found = sorted(Phone.objects.filter(imei_suffix_filter(suffix)).values_list('pk', flat=True))
+            expected = sorted(Phone.objects.filter(imei__endswith=suffix).values_list('pk', flat=True))
+            if found != expected:
+                raise CheckFailed(f'el sufijo {suffix} encontró {len(found)} celulares en lugar de {len(expected)}')
+        return f'({len(suffixes)} sufijos)'
+
+    def _check_estimate_count(self):
+        with connection.cursor() as cursor:
+            cursor.execute(f'ANALYZE {connection.ops.quote_name(Phone._meta.db_table)}')
+        exact = Phone.objects.count()
+        with override_settings(COUNT_ESTIMATE_THRESHOLD=1):
+            estimate = estimate_count(Phone.objects.all())
+            # El plan de una consulta con filtro también se tiene que poder leer
+            estimate_count(Phone.objects.filter(status='available', model__brand__name='Samsung'))
+        if not exact / 2 <= estimate <= exact * 2:
+            raise CheckFailed(f'estimación {estimate} para {exact} filas')
+        with override_settings(COUNT_ESTIMATE_THRESHOLD=exact * 10):
+            below = estimate_count(Phone.objects.all())
+        if below != exact:
+            raise CheckFailed(f'bajo el umbral devolvió {below} en lugar de contar {exact}')
+        return f'(estimación {estimate}, exacto {exact})'
+
+    def _check_cursors(self):
+        server_side = not connection.settings_dict.get('DISABLE_SERVER_SIDE_CURSORS')
+        iterated = sum(1 for _ in Phone.objects.values_list('pk', flat=True).iterator(chunk_size=100))
+        if iterated != Phone.objects.count():
+            raise CheckFailed(f'iterator() recorrió {iterated} celulares')
+
+        user = CustomUser.objects.order_by('pk').first()
+        audit = AuditService.start_audit(user)
+        codes = list(Phone.objects.exclude(status='sold').values_list('imei', flat=True)[:100])
+        AuditService.scan_batch(audit, codes, user)
+        report = AuditService.close_audit(audit)
+        if report['found'] != len(codes):
+            raise CheckFailed(f'la auditoría encontró {report["found"]} de {len(codes)} celulares')
+
+        phone_ids = [str(pk) for pk in Phone.objects.values_list('pk', flat=True)[:200]]
+        jobs = [JobQueue.enqueue(kind, {'phone_ids': phone_ids} if kind == 'phone_labels' else {}) for kind in JOB_HANDLERS]
+        try:
+            for _ in jobs:
+                job = JobQueue.claim('check_postgresql')
+                if job is not None:
+                    JobQueue.run(job)
+            failed = [
+                f'{job.kind}: {job.error.strip().splitlines()[-1:]}'
+                for job in BackgroundJob.objects.filter(pk__in=[job.pk for job in jobs]).exclude(status='done')
+            ]
+        finally:
+            for job in BackgroundJob.objects.filter(pk__in=[job.pk for job in jobs]):
+                if job.result:
+                    job.result.delete(save=False)
+                job.delete()
+        if failed:
+            raise CheckFailed('; '.join(failed))
+        return f'(cursores del servidor: {"sí" if server_side else "no, PgBouncer"})'
@@ -0,0 +1,24 @@
+from datetime import timedelta
+
+from django.core.management.base import BaseCommand
+from django.utils import timezone
+from inventory.services import ChangeFeedService
+
+
+class Command(BaseCommand):
+    help = 'Compacta el registro de cambios: conserva solo el último cambio de cada registro antiguo'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--days',
+            type=int,
+            default=30,
+            help='Compactar cambios con más de esta cantidad de días'
+        )
+
+    def handle(self, *args, **options):
+        before = timezone.now() - timedelta(days=options['days'])
+        deleted = ChangeFeedService.compact(before)
+        self.stdout.write(
+            self.style.SUCCESS(f'Se eliminaron {deleted} cambios anteriores al {before:%d/%m/%Y}')
+        )
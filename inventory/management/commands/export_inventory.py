@@ -0,0 +1,51 @@
+from django.core.management.base import BaseCommand, CommandError
+from django.utils import timezone
+from django.utils.dateparse import parse_datetime
+from inventory.export import InventoryExporter
+from inventory.routers import get_reporting_alias
+import sys
+import time
+
+
+class Command(BaseCommand):
+    help = 'Exporta todos los celulares en formato NDJSON (una línea JSON por celular)'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--output',
+            type=str,
+            default='-',
+            help='Archivo de salida ("-" para la salida estándar)'
+        )
+        parser.add_argument(
+            '--since',
+            type=str,
+            default=None,
+            help='Exportar solo los celulares modificados desde esta fecha (ISO 8601)'
+        )
+
+    def handle(self, *args, **options):
+        since = options['since']
+        if since:
+            since = parse_datetime(since)
+            if since is None:
+                raise CommandError('Fecha --since inválida')
+            if timezone.is_naive(since):
+                since = timezone.make_aware(since)
+
+        output = options['output']
+        stream = sys.stdout.buffer if output == '-' else open(output, 'wb')
+        start = time.monotonic()
+        written = 0
+        try:
+            for chunk in InventoryExporter.iter_ndjson(since, using=get_reporting_alias()):
+                stream.write(chunk)
+                written += chunk.count(b'\n')
+        finally:
+            if output != '-':
+                stream.close()
+
+        elapsed = time.monotonic() - start
+        self.stderr.write(
+            self.style.SUCCESS(f'Se exportaron {written} celulares en {elapsed:.1f}s')
+        )
@@ -1,6 +1,7 @@
 from django.core.management.base import BaseCommand
 from inventory.models import Phone
-from inventory.utils import QRCodeGenerator, LabelGenerator
+from inventory import qr
+from inventory.utils import QRCodeGenerator
 import os
 
 
@@ -38,10 +39,11 @@ class Command(BaseCommand):
         
         for i, phone in enumerate(phones):
             qr_data = QRCodeGenerator.generate_phone_qr_data(phone)
-            qr_image = QRCodeGenerator.generate_qr_code(qr_data)
             
-            # Guardar imagen (esto requeriría procesamiento adicional del base64)
+            # Guardar imagen
             filename = f"{output_dir}/phone_{phone.id}.png"
+            with open(filename, 'wb') as output:
+                output.write(qr.render_png(qr_data, scale=10))
             
             self.stdout.write(
                 self.style.SUCCESS(f'QR generado para {phone.model}: {qr_data}')
@@ -0,0 +1,79 @@
+import os
+import sqlite3
+import time
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+from django.db import DEFAULT_DB_ALIAS
+from inventory.routers import REPORTING_ALIAS
+
+
+class Command(BaseCommand):
+    help = (
+        'Copia la base SQLite principal a la base de reportes ("reporting") con la API de backup '
+        'y la reemplaza de una sola vez. Las escrituras no se bloquean: con WAL la copia lee '
+        'una foto fija de la base, y sin WAL se copia por partes.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--interval',
+            type=float,
+            default=0,
+            help='Repetir cada esta cantidad de segundos (0 = una sola vez)'
+        )
+        parser.add_argument(
+            '--pages',
+            type=int,
+            default=1024,
+            help='Páginas por paso cuando la base no está en modo WAL'
+        )
+        parser.add_argument(
+            '--sleep',
+            type=float,
+            default=0.01,
+            help='Pausa entre pasos (segundos) cuando la base no está en modo WAL'
+        )
+
+    def handle(self, *args, **options):
+        if REPORTING_ALIAS not in settings.DATABASES:
+            raise CommandError(f'No hay una base "{REPORTING_ALIAS}" en DATABASES')
+        source = settings.DATABASES[DEFAULT_DB_ALIAS]
+        target = settings.DATABASES[REPORTING_ALIAS]
+        for alias, database in ((DEFAULT_DB_ALIAS, source), (REPORTING_ALIAS, target)):
+            if database['ENGINE'] != 'django.db.backends.sqlite3':
+                raise CommandError(f'La base "{alias}" no es SQLite: las réplicas se actualizan solas')
+
+        while True:
+            start = time.monotonic()
+            self.refresh(str(source['NAME']), str(target['NAME']), options['pages'], options['sleep'])
+            elapsed = time.monotonic() - start
+            self.stdout.write(self.style.SUCCESS(
+                f'Copia de reportes actualizada en {elapsed:.2f} s '
+                f'({os.path.getsize(target["NAME"]) / 1024 / 1024:.1f} MB)'
+            ))
+            if not options['interval']:
+                break
+            time.sleep(max(0, options['interval'] - elapsed))
+
+    def refresh(self, source_path, target_path, pages, sleep):
+        temporary = f'{target_path}.tmp'
+        if os.path.exists(temporary):
+            os.remove(temporary)
+        source = sqlite3.connect(source_path)
+        destination = sqlite3.connect(temporary)
+        try:
+            wal = source.execute('PRAGMA journal_mode').fetchone()[0] == 'wal'
+            # En WAL una sola pasada lee una foto consistente sin frenar a los
+            # que escriben. Sin WAL cada paso toma el bloqueo de lectura un
+            # momento y la copia se reinicia si otra conexión escribió.
+            source.backup(destination, pages=-1 if wal else pages, sleep=sleep)
+            # La copia se abre solo para leer: sin archivos -wal/-shm que
+            # quedarían desparejados al reemplazar el archivo
+            destination.execute('PRAGMA journal_mode = DELETE')
+        finally:
+            destination.close()
+            source.close()
+        # Las conexiones abiertas siguen leyendo la copia anterior hasta que
+        # se cierran; las nuevas ven la actualizada
+        os.replace(temporary, target_path)
@@ -0,0 +1,154 @@
+import os
+import tempfile
+from pathlib import Path
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+from django.core.signals import request_finished, request_started
+from django.db import DEFAULT_DB_ALIAS, close_old_connections, connections
+from django.test.utils import (
+    override_settings, setup_databases, setup_test_environment, teardown_databases, teardown_test_environment,
+)
+from benchmarks import runner
+from benchmarks.micro import MICRO_BENCHMARKS
+from benchmarks.scenarios import VIEW_SCENARIOS, create_fixtures, get_missing_url_names, seed_dataset
+from inventory.routers import REPORTING_ALIAS
+
+BENCHMARKS_DIR = Path(settings.BASE_DIR) / 'benchmarks'
+
+
+class Command(BaseCommand):
+    help = (
+        'Ejecuta la suite de benchmarks: todas las URLs de la aplicación sobre una base de prueba '
+        'con datos generados y los micro-benchmarks de IMEI, QR y etiquetas. Guarda los resultados '
+        'en JSON y falla si alguna vista hace más consultas o usa más memoria que en la línea base '
+        '(y con --latency, si tarda más).'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--phones', type=int, default=20_000, help='Celulares de los datos generados')
+        parser.add_argument('--seed', type=int, default=1, help='Semilla de los datos generados')
+        parser.add_argument('--iterations', type=int, default=20, help='Repeticiones medidas por escenario')
+        parser.add_argument('--warmup', type=int, default=2, help='Repeticiones previas sin medir')
+        parser.add_argument('--only', nargs='+', help='Ejecutar solo estos escenarios')
+        parser.add_argument(
+            '--output',
+            default=str(BENCHMARKS_DIR / 'results.json'),
+            help='Archivo JSON de resultados'
+        )
+        parser.add_argument(
+            '--baseline',
+            default=str(BENCHMARKS_DIR / 'baseline.json'),
+            help='Archivo JSON con la línea base'
+        )
+        parser.add_argument(
+            '--threshold',
+            type=float,
+            default=0.5,
+            help='Empeoramiento tolerado de tiempos y memoria (fracción)'
+        )
+        parser.add_argument(
+            '--latency',
+            action='store_true',
+            help='Comparar también los tiempos. La línea base se tiene que haber medido en esta máquina'
+        )
+        parser.add_argument(
+            '--update-baseline',
+            action='store_true',
+            help='Guardar los resultados como nueva línea base en lugar de comparar'
+        )
+
+    def handle(self, *args, **options):
+        missing = get_missing_url_names()
+        if missing:
+            raise CommandError(f'URLs sin escenario en benchmarks/scenarios.py: {", ".join(missing)}')
+        only = set(options['only'] or [])
+        known = {scenario.name for scenario in VIEW_SCENARIOS} | {micro.__name__ for micro in MICRO_BENCHMARKS}
+        if only - known:
+            raise CommandError(f'Escenarios desconocidos: {", ".join(sorted(only - known))}')
+
+        results = {
+            'environment': runner.get_environment(),
+            'dataset': {'phones': options['phones'], 'seed': options['seed']},
+            'views': {},
+            'micro': {},
+        }
+        # La base de reportes lee la misma base de prueba; la caché y los
+        # archivos generados quedan aislados de los de la instalación
+        if REPORTING_ALIAS in connections:
+            connections[REPORTING_ALIAS].settings_dict['TEST']['MIRROR'] = DEFAULT_DB_ALIAS
+        # Como en los tests de Django (pero con DEBUG apagado, como en
+        # producción): sin cerrar la conexión al terminar cada petición, que
+        # está dentro de la transacción del escenario
+        setup_test_environment(debug=False)
+        request_started.disconnect(close_old_connections)
+        request_finished.disconnect(close_old_connections)
+        databases = setup_databases(verbosity=0, interactive=False)
+        try:
+            with tempfile.TemporaryDirectory() as media_root, override_settings(
+                MEDIA_ROOT=media_root,
+                JOB_RESULTS_ROOT=os.path.join(media_root, 'job_results'),
+                CACHES={'default': {'BACKEND': 'django.core.cache.backends.locmem.LocMemCache'}},
+            ):
+                self.stdout.write(seed_dataset(options['phones'], options['seed']))
+                self._run_views(results, only, options)
+            self._run_micro(results, only, options)
+        finally:
+            teardown_databases(databases, verbosity=0)
+            request_started.connect(close_old_connections)
+            request_finished.connect(close_old_connections)
+            teardown_test_environment()
+
+        if options['update_baseline']:
+            runner.save_results(options['baseline'], results)
+            self.stdout.write(self.style.SUCCESS(f'Línea base guardada en {options["baseline"]}'))
+            return
+        runner.save_results(options['output'], results)
+        self.stdout.write(f'Resultados guardados en {options["output"]}')
+        if not Path(options['baseline']).exists():
+            self.stdout.write(self.style.WARNING('No hay línea base: crearla con --update-baseline'))
+            return
+        baseline = runner.load_results(options['baseline'])
+        if baseline['dataset'] != results['dataset']:
+            raise CommandError(
+                f'La línea base se midió con otros datos ({baseline["dataset"]}): '
+                'usar las mismas opciones o actualizarla con --update-baseline'
+            )
+        if options['latency'] and not runner.same_machine(results, baseline):
+            raise CommandError(
+                f'La línea base se midió en otra máquina ({baseline.get("environment")}): para comparar '
+                'tiempos generar una en esta con --baseline <archivo> --update-baseline'
+            )
+        regressions = runner.compare(results, baseline, options['threshold'], options['latency'])
+        if regressions:
+            raise CommandError('Regresiones frente a la línea base:\n  ' + '\n  '.join(regressions))
+        self.stdout.write(self.style.SUCCESS('Sin regresiones frente a la línea base'))
+
+    def _run_views(self, results, only, options):
+        benchmark = runner.ViewBenchmark(create_fixtures())
+        for scenario in VIEW_SCENARIOS:
+            if only and scenario.name not in only:
+                continue
+            try:
+                result = benchmark.run(scenario, options['iterations'], options['warmup'])
+            except AssertionError as exc:
+                raise CommandError(str(exc))
+            results['views'][scenario.name] = result
+            self._write_row(scenario.name, result)
+
+    def _run_micro(self, results, only, options):
+        for micro in MICRO_BENCHMARKS:
+            if only and micro.__name__ not in only:
+                continue
+            result = runner.run_micro(micro, options['iterations'], options['warmup'])
+            results['micro'][micro.__name__] = result
+            self._write_row(micro.__name__, result)
+
+    def _write_row(self, name, result):
+        queries = result.get('queries')
+        self.stdout.write(
+            f'{name:<24} p50 {result["p50_ms"]:8.2f} ms  p90 {result["p90_ms"]:8.2f} ms  '
+            f'p99 {result["p99_ms"]:8.2f} ms  '
+            f'{"" if queries is None else f"{queries:3d} consultas  "}'
+            f'{result["peak_kb"]:7d} KB pico'
+        )
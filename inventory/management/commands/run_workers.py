@@ -0,0 +1,102 @@
+import multiprocessing
+import os
+import signal
+import socket
+import time
+
+from django.apps import apps
+from django.conf import settings
+from django.core.management.base import BaseCommand
+from django.db import connections
+from inventory.jobs import JobQueue, run_worker
+
+
+def _worker_main(name, stop_event, poll_interval, burst):
+    # Ctrl+C llega a todo el grupo de procesos: el padre decide cuándo parar
+    signal.signal(signal.SIGINT, signal.SIG_IGN)
+    signal.signal(signal.SIGTERM, signal.SIG_IGN)
+    if not apps.ready:
+        import django
+        django.setup()
+    run_worker(name, stop_event, poll_interval=poll_interval, burst=burst)
+
+
+class Command(BaseCommand):
+    help = 'Ejecuta los workers de la cola de trabajos en segundo plano (PDFs, exportaciones)'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--processes',
+            type=int,
+            default=getattr(settings, 'JOB_WORKER_PROCESSES', 2),
+            help='Cantidad de procesos worker (0 ejecuta los trabajos en este mismo proceso)'
+        )
+        parser.add_argument(
+            '--poll-interval',
+            type=float,
+            default=2.0,
+            help='Segundos de espera entre consultas cuando no hay trabajos'
+        )
+        parser.add_argument(
+            '--burst',
+            action='store_true',
+            help='Terminar cuando no queden trabajos pendientes'
+        )
+
+    def handle(self, *args, **options):
+        stop_event = multiprocessing.Event()
+        for signum in (signal.SIGINT, signal.SIGTERM):
+            signal.signal(signum, lambda *args: stop_event.set())
+
+        self._maintenance()
+        prefix = f'{socket.gethostname()}:{os.getpid()}'
+        processes = options['processes']
+        if processes <= 0:
+            run_worker(prefix, stop_event, options['poll_interval'], options['burst'])
+            return
+
+        # Los procesos hijos no deben heredar la conexión abierta del padre
+        connections.close_all()
+        workers = {}
+
+        def start(index):
+            process = multiprocessing.Process(
+                target=_worker_main,
+                args=(f'{prefix}/{index}', stop_event, options['poll_interval'], options['burst']),
+                daemon=True,
+            )
+            process.start()
+            workers[index] = process
+
+        for index in range(processes):
+            start(index)
+        self.stdout.write(self.style.SUCCESS(f'{processes} workers iniciados'))
+
+        interval = getattr(settings, 'JOB_CLEANUP_INTERVAL', 300)
+        next_maintenance = time.monotonic() + interval
+        while not stop_event.wait(1):
+            for index, process in list(workers.items()):
+                if process.is_alive():
+                    continue
+                if options['burst'] or process.exitcode == 0:
+                    del workers[index]
+                else:
+                    self.stderr.write(f'El worker {index} terminó con código {process.exitcode}; se reinicia')
+                    start(index)
+            if not workers:
+                break
+            if time.monotonic() >= next_maintenance:
+                self._maintenance()
+                next_maintenance = time.monotonic() + interval
+
+        stop_event.set()
+        for process in workers.values():
+            process.join()
+        self.stdout.write(self.style.SUCCESS('Workers detenidos'))
+
+    def _maintenance(self):
+        requeued = JobQueue.requeue_stale()
+        deleted = JobQueue.cleanup_expired()
+        connections.close_all()
+        if requeued or deleted:
+            self.stdout.write(f'{requeued} trabajos reencolados, {deleted} resultados vencidos eliminados')
@@ -0,0 +1,299 @@
+import random
+import time
+from collections import namedtuple
+from datetime import datetime, timedelta
+from decimal import Decimal
+from itertools import accumulate
+from operator import attrgetter, methodcaller
+
+from django.core.management.base import BaseCommand, CommandError
+from django.core.management.color import no_style
+from django.db import connection, transaction
+from django.db.models import Max
+from django.utils import timezone
+from inventory.fragments import bump_row_version
+from inventory.ids import uuid7
+from inventory.models import Brand, Customer, CustomUser, Phone, PhoneComment, PhoneModel, Sale
+from inventory.utils import IMEIValidator
+
+# Marca -> (identificador de organismo del IMEI, [(modelo, precio de lista)])
+CATALOG = {
+    'Samsung': ('35', [
+        ('Galaxy S23', 899999), ('Galaxy S23 Ultra', 1399999), ('Galaxy A54', 459999),
+        ('Galaxy A14', 219999), ('Galaxy Z Flip5', 1199999),
+    ]),
+    'Apple': ('35', [
+        ('iPhone 13', 899999), ('iPhone 14', 1099999), ('iPhone 14 Pro', 1399999),
+        ('iPhone 15', 1299999), ('iPhone 15 Pro Max', 1899999),
+    ]),
+    'Motorola': ('35', [
+        ('Moto G84', 349999), ('Moto G54', 279999), ('Edge 40', 599999), ('Moto E13', 129999),
+    ]),
+    'Xiaomi': ('86', [
+        ('Redmi Note 12', 299999), ('Redmi Note 13 Pro', 449999), ('Poco X6', 399999),
+        ('Xiaomi 13T', 699999),
+    ]),
+}
+COLORS = ['Negro', 'Blanco', 'Azul', 'Verde', 'Violeta', 'Gris', 'Dorado', 'Rojo']
+STORAGE = ['64GB', '128GB', '256GB', '512GB']
+FIRST_NAMES = [
+    'Juan', 'María', 'Carlos', 'Lucía', 'Martín', 'Sofía', 'Diego', 'Valentina', 'Pablo', 'Camila',
+    'Javier', 'Florencia', 'Nicolás', 'Agustina', 'Federico', 'Julieta', 'Matías', 'Paula',
+]
+LAST_NAMES = [
+    'González', 'Rodríguez', 'Gómez', 'Fernández', 'López', 'Díaz', 'Martínez', 'Pérez', 'García',
+    'Sánchez', 'Romero', 'Sosa', 'Torres', 'Álvarez', 'Ruiz', 'Ramírez', 'Flores', 'Benítez',
+]
+COMMENTS = [
+    'Pantalla con rayón leve', 'Batería revisada', 'Cliente consultó precio', 'Se cambió el módulo',
+    'Falta caja original', 'Revisado por servicio técnico', 'Reservado por teléfono', 'Sin detalles',
+]
+# Estados de los celulares que no se vendieron
+UNSOLD_STATUS_WEIGHTS = {'available': 70, 'reserved': 8, 'service': 5, 'in_transit': 5, 'warehouse': 12}
+PAYMENT_WEIGHTS = {'cash': 35, 'card': 30, 'transfer': 25, 'financing': 5, 'mixed': 5}
+SELLERS = 5
+MILLISECOND = timedelta(milliseconds=1)
+
+# Filas que se insertan directamente (ver Command._insert); los nombres son
+# los de los campos del modelo
+PHONE_ROW = namedtuple('PHONE_ROW', [
+    'id', 'model', 'imei', 'status', 'condition', 'price', 'storage_capacity', 'color',
+    'battery_percentage', 'acquisition_type', 'acquired_from', 'added_by', 'created_at', 'updated_at',
+])
+SALE_ROW = namedtuple('SALE_ROW', [
+    'id', 'phone', 'customer', 'sale_price', 'payment_method', 'is_picked_up', 'pickup_date',
+    'has_trade_in', 'trade_in_phone', 'trade_in_value', 'sold_by', 'sale_date', 'updated_at',
+])
+
+
+class Command(BaseCommand):
+    help = (
+        'Genera datos sintéticos para pruebas de carga (celulares, clientes, ventas, partes de pago '
+        'y comentarios), insertados por lotes en transacciones. Con la misma semilla genera siempre '
+        'los mismos datos; para agregar más a una base que ya tiene datos usar otra semilla.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--phones', type=int, default=100_000, help='Celulares a generar')
+        parser.add_argument('--customers', type=int, help='Clientes a generar (por defecto 1 cada 4 celulares)')
+        parser.add_argument('--sold', type=float, default=0.45, help='Fracción de celulares vendidos')
+        parser.add_argument('--used', type=float, default=0.4, help='Fracción de celulares usados')
+        parser.add_argument('--refurbished', type=float, default=0.05, help='Fracción de reacondicionados')
+        parser.add_argument('--trade-in', type=float, default=0.15, help='Fracción de ventas con parte de pago')
+        parser.add_argument('--comments', type=float, default=0.3, help='Comentarios promedio por celular')
+        parser.add_argument('--days', type=int, default=730, help='Días de historial')
+        parser.add_argument('--seed', type=int, default=1, help='Semilla (0-999)')
+        parser.add_argument('--chunk', type=int, default=20_000, help='Celulares por transacción')
+
+    def handle(self, *args, **options):
+        if not 0 <= options['seed'] < 1000:
+            raise CommandError('La semilla tiene que estar entre 0 y 999')
+        self.options = options
+        self.rng = random.Random(options['seed'])
+        self.now = timezone.now()
+        self.counts = {'clientes': 0, 'celulares': 0, 'ventas': 0, 'partes de pago': 0, 'comentarios': 0}
+        start = time.perf_counter()
+
+        models = self._ensure_catalog()
+        sellers = self._ensure_sellers()
+        self.db_id, self.db_date = self._adapters()
+        self.epoch = datetime(1970, 1, 1, tzinfo=self.now.tzinfo)
+        customers = self._create_customers(options['customers'] or max(1, options['phones'] // 4))
+        self._create_phones(models, sellers, customers)
+        # Los inserts directos no disparan señales: se invalidan a mano las
+        # filas cacheadas
+        bump_row_version()
+
+        elapsed = time.perf_counter() - start
+        total = sum(self.counts.values())
+        for name, count in self.counts.items():
+            self.stdout.write(f'{name:<16} {count:>10}')
+        self.stdout.write(self.style.SUCCESS(
+            f'{total} filas en {elapsed:.1f} s ({total / elapsed:.0f} filas/s)'
+        ))
+
+    def _ensure_catalog(self):
+        models = []
+        for brand_name, (prefix, entries) in CATALOG.items():
+            brand, _ = Brand.objects.get_or_create(name=brand_name)
+            for name, price in entries:
+                model, _ = PhoneModel.objects.get_or_create(brand=brand, name=name)
+                models.append((model.pk, Decimal(price), prefix))
+        return models
+
+    def _ensure_sellers(self):
+        sellers = []
+        for index in range(1, SELLERS + 1):
+            user, created = CustomUser.objects.get_or_create(
+                username=f'carga_vendedor{index}',
+                defaults={'first_name': 'Vendedor', 'last_name': str(index), 'role': 'employee'},
+            )
+            if created:
+                user.set_unusable_password()
+                user.save(update_fields=['password'])
+            sellers.append(user.pk)
+        return sellers
+
+    def _id_for(self, date):
+        # Ids ordenados por la fecha generada y reproducibles con la semilla
+        return uuid7((date - self.epoch) // MILLISECOND, self.rng.getrandbits(80))
+
+    def _date_at(self, index, total):
+        """
+        Fecha del registro ``index`` de ``total``: crecen a lo largo de
+        ``--days`` (con unos minutos de variación), como un historial real,
+        y así los ids ordenados por tiempo se insertan al final del índice
+        """
+        span = self.options['days'] * 86400
+        offset = span * (index / total) + self.rng.random() * 600
+        return self.now - timedelta(seconds=max(0, span - offset))
+
+    def _create_customers(self, count):
+        rng, seed, chunk = self.rng, self.options['seed'], self.options['chunk']
+        # Los ids se asignan acá para poder usarlos en las ventas sin leerlos
+        # de vuelta; al final se ajusta la secuencia (PostgreSQL)
+        first_id = (Customer.objects.aggregate(last=Max('id'))['last'] or 0) + 1
+        for offset in range(0, count, chunk):
+            rows = []
+            for index in range(offset, min(count, offset + chunk)):
+                first, last = rng.choice(FIRST_NAMES), rng.choice(LAST_NAMES)
+                created = self.db_date(self._date_at(index, count))
+                rows.append((
+                    first_id + index, f'{first} {last}', f'{first.lower()}.{last.lower()}{index}@ejemplo.com',
+                    f'11{rng.randrange(10**8):08d}', '', f'{seed:03d}{index:08d}', created, created,
+                ))
+            with transaction.atomic():
+                self._insert(Customer, ('id', 'name', 'email', 'phone', 'address', 'dni', 'created_at', 'updated_at'), rows)
+            self.counts['clientes'] += len(rows)
+        self._reset_sequences(Customer)
+        return range(first_id, first_id + count)
+
+    def _imei(self, prefix, serial):
+        # Los 12 dígitos siguientes al prefijo son un contador que arranca en
+        # semilla * 10^9: no se repiten dentro de una corrida ni entre semillas
+        body = f'{prefix}{serial:012d}'
+        return body + IMEIValidator.calculate_check_digit(body)
+
+    def _create_phones(self, models, sellers, customers):
+        rng, options = self.rng, self.options
+        total, chunk = options['phones'], options['chunk']
+        statuses, status_weights = zip(*UNSOLD_STATUS_WEIGHTS.items())
+        payments, payment_weights = zip(*PAYMENT_WEIGHTS.items())
+        status_weights, payment_weights = list(accumulate(status_weights)), list(accumulate(payment_weights))
+        serial = options['seed'] * 10**9
+        db_id, db_date = self.db_id, self.db_date
+        used, refurbished = options['used'], options['used'] + options['refurbished']
+
+        for offset in range(0, total, chunk):
+            phones, sales, comments = [], [], []
+            for index in range(offset, min(total, offset + chunk)):
+                model_id, list_price, prefix = rng.choice(models)
+                roll = rng.random()
+                condition = 'used' if roll < used else 'refurbished' if roll < refurbished else 'new'
+                if condition == 'new':
+                    price = list_price
+                else:
+                    price = (list_price * Decimal(rng.uniform(0.55, 0.8))).quantize(Decimal('1'))
+                created = self._date_at(index, total)
+                sold = rng.random() < options['sold']
+                phone_id = db_id(self._id_for(created))
+                updated = created
+                seller = rng.choice(sellers)
+
+                if sold:
+                    sale_date = min(self.now, created + timedelta(days=rng.expovariate(1 / 20)))
+                    updated = sale_date
+                    customer_id = rng.choice(customers)
+                    picked_up = rng.random() < 0.95
+                    trade_in_id = trade_value = None
+                    if rng.random() < options['trade_in']:
+                        trade_model_id, trade_list_price, trade_prefix = rng.choice(models)
+                        trade_value = (trade_list_price * Decimal(rng.uniform(0.3, 0.5))).quantize(Decimal('1'))
+                        trade_in_id = db_id(self._id_for(sale_date))
+                        phones.append(PHONE_ROW(
+                            trade_in_id, trade_model_id, self._imei(trade_prefix, serial),
+                            rng.choices(statuses, cum_weights=status_weights)[0], 'used',
+                            (trade_value * Decimal('1.3')).quantize(Decimal('1')),
+                            rng.choice(STORAGE), rng.choice(COLORS), rng.randint(60, 95),
+                            'parte_pago', customer_id, seller, db_date(sale_date), db_date(sale_date),
+                        ))
+                        serial += 1
+                        self.counts['partes de pago'] += 1
+                    sales.append(SALE_ROW(
+                        db_id(self._id_for(sale_date)), phone_id, customer_id, price,
+                        rng.choices(payments, cum_weights=payment_weights)[0], picked_up,
+                        db_date(sale_date) if picked_up else None, trade_in_id is not None,
+                        trade_in_id, trade_value, rng.choice(sellers), db_date(sale_date), db_date(sale_date),
+                    ))
+
+                phones.append(PHONE_ROW(
+                    phone_id, model_id, self._imei(prefix, serial),
+                    'sold' if sold else rng.choices(statuses, cum_weights=status_weights)[0], condition, price,
+                    rng.choice(STORAGE), rng.choice(COLORS),
+                    100 if condition == 'new' else rng.randint(70, 100),
+                    'mayorista' if condition == 'new' else '', None, seller,
+                    db_date(created), db_date(updated),
+                ))
+                serial += 1
+
+                for _ in range(self._comment_count()):
+                    comment_date = min(self.now, created + timedelta(days=rng.random() * 30))
+                    comments.append((phone_id, rng.choice(sellers), rng.choice(COMMENTS), db_date(comment_date)))
+
+            with transaction.atomic():
+                self._insert(Phone, PHONE_ROW._fields + ('notes', 'imei_reversed'), [
+                    row + ('', row.imei[::-1]) for row in phones
+                ])
+                self._insert(Sale, SALE_ROW._fields + ('notes',), [row + ('',) for row in sales])
+                self._insert(PhoneComment, ('phone', 'user', 'comment', 'created_at'), comments)
+            self.counts['celulares'] += len(phones)
+            self.counts['ventas'] += len(sales)
+            self.counts['comentarios'] += len(comments)
+            self.stdout.write(f'  {min(total, offset + chunk):>10} / {total}', ending='\r')
+            self.stdout.flush()
+        self.stdout.write('')
+
+    def _adapters(self):
+        """
+        Conversión de ids y fechas al formato de la base, hecha una vez por
+        valor y sin pasar por los campos del modelo
+        """
+        if connection.features.has_native_uuid_field:
+            db_id = str
+        else:
+            db_id = attrgetter('hex')
+        if connection.features.supports_timezones:
+            db_date = lambda value: value  # noqa: E731
+        else:
+            # Mismo formato que guarda Django en SQLite: UTC sin zona. Todas
+            # las fechas se calculan a partir de ``self.now``, así que alcanza
+            # con sacarle la zona una vez
+            self.now = self.now.replace(tzinfo=None)
+            db_date = methodcaller('isoformat', ' ')
+        return db_id, db_date
+
+    def _reset_sequences(self, *models):
+        statements = connection.ops.sequence_reset_sql(no_style(), models)
+        if statements:
+            with connection.cursor() as cursor:
+                for sql in statements:
+                    cursor.execute(sql)
+
+    def _insert(self, model, field_names, rows):
+        if not rows:
+            return
+        quote = connection.ops.quote_name
+        columns = ', '.join(quote(model._meta.get_field(name).column) for name in field_names)
+        placeholders = ', '.join(['%s'] * len(field_names))
+        with connection.cursor() as cursor:
+            cursor.executemany(
+                f'INSERT INTO {quote(model._meta.db_table)} ({columns}) VALUES ({placeholders})', rows
+            )
+
+    def _comment_count(self):
+        # Cantidad de comentarios con promedio --comments (la mayoría sin ninguno)
+        mean = self.options['comments']
+        count = 0
+        while self.rng.random() < mean / (1 + mean):
+            count += 1
+        return count
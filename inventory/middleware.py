@@ -0,0 +1,48 @@
+from asgiref.sync import iscoroutinefunction, markcoroutinefunction
+from django.conf import settings
+
+from .routers import has_reporting_db, request_scope
+
+PIN_COOKIE = 'pin_primary_db'
+
+
+class ReadYourWritesMiddleware:
+    """
+    Después de una petición que escribió en la base, deja una cookie para que
+    las peticiones siguientes lean de ``default`` en lugar de la base de
+    reportes mientras la copia se pone al día. Sin base de reportes no hace
+    nada.
+    """
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        self.async_mode = iscoroutinefunction(get_response)
+        if self.async_mode:
+            markcoroutinefunction(self)
+
+    def __call__(self, request):
+        if self.async_mode:
+            return self.__acall__(request)
+        if not has_reporting_db():
+            return self.get_response(request)
+        with request_scope(pinned=PIN_COOKIE in request.COOKIES) as state:
+            response = self.get_response(request)
+        return self.process_response(state, response)
+
+    async def __acall__(self, request):
+        if not has_reporting_db():
+            return await self.get_response(request)
+        with request_scope(pinned=PIN_COOKIE in request.COOKIES) as state:
+            response = await self.get_response(request)
+        return self.process_response(state, response)
+
+    def process_response(self, state, response):
+        if state.wrote:
+            response.set_cookie(
+                PIN_COOKIE, '1',
+                max_age=getattr(settings, 'REPORTING_PIN_SECONDS', 300),
+                httponly=True, samesite='Lax',
+            )
+        return response
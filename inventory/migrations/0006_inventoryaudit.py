@@ -0,0 +1,50 @@
+# Generated by Django 4.2.7 on 2026-10-19 07:00
+
+from django.conf import settings
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('inventory', '0005_customer_updated_at_sale_updated_at'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='InventoryAudit',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('scope_status', models.CharField(blank=True, choices=[('available', 'Stock'), ('reserved', 'Reservado'), ('sold', 'Vendido'), ('service', 'Servicio técnico'), ('in_transit', 'En camino'), ('warehouse', 'Depósito')], help_text='Vacío: todos los celulares no vendidos', max_length=20, verbose_name='Estado a contar')),
+                ('scope_condition', models.CharField(blank=True, choices=[('new', 'Nuevo'), ('used', 'Usado'), ('refurbished', 'Reacondicionado')], max_length=20, verbose_name='Condición a contar')),
+                ('status', models.CharField(choices=[('open', 'Abierta'), ('closed', 'Cerrada')], default='open', max_length=10, verbose_name='Estado')),
+                ('expected', models.JSONField(default=list, verbose_name='Celulares esperados')),
+                ('expected_count', models.PositiveIntegerField(default=0, verbose_name='Cantidad esperada')),
+                ('report', models.JSONField(blank=True, null=True, verbose_name='Reporte de diferencias')),
+                ('started_at', models.DateTimeField(auto_now_add=True, verbose_name='Fecha de inicio')),
+                ('closed_at', models.DateTimeField(blank=True, null=True, verbose_name='Fecha de cierre')),
+                ('started_by', models.ForeignKey(null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='audits_started', to=settings.AUTH_USER_MODEL, verbose_name='Iniciada por')),
+            ],
+            options={
+                'verbose_name': 'Auditoría de inventario',
+                'verbose_name_plural': 'Auditorías de inventario',
+                'ordering': ['-started_at'],
+            },
+        ),
+        migrations.CreateModel(
+            name='InventoryAuditScan',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('code', models.CharField(max_length=100, verbose_name='Código')),
+                ('scanned_at', models.DateTimeField(auto_now_add=True, verbose_name='Fecha')),
+                ('audit', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='scans', to='inventory.inventoryaudit', verbose_name='Auditoría')),
+                ('scanned_by', models.ForeignKey(null=True, on_delete=django.db.models.deletion.SET_NULL, to=settings.AUTH_USER_MODEL, verbose_name='Escaneado por')),
+            ],
+            options={
+                'verbose_name': 'Escaneo de auditoría',
+                'verbose_name_plural': 'Escaneos de auditoría',
+                'ordering': ['id'],
+            },
+        ),
+    ]
@@ -0,0 +1,18 @@
+# Generated by Django 4.2.7 on 2026-10-19 07:02
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('inventory', '0006_inventoryaudit'),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name='phone',
+            name='updated_at',
+            field=models.DateTimeField(auto_now=True, db_index=True, verbose_name='Última modificación'),
+        ),
+    ]
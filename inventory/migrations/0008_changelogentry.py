@@ -0,0 +1,29 @@
+# Generated by Django 4.2.7 on 2026-10-19 07:04
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('inventory', '0007_phone_updated_at_index'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='ChangeLogEntry',
+            fields=[
+                ('id', models.BigAutoField(primary_key=True, serialize=False)),
+                ('model', models.CharField(choices=[('phone', 'Celular'), ('sale', 'Venta'), ('customer', 'Cliente')], max_length=20, verbose_name='Modelo')),
+                ('object_id', models.CharField(max_length=36, verbose_name='ID del registro')),
+                ('action', models.CharField(choices=[('create', 'Alta'), ('update', 'Modificación'), ('delete', 'Baja')], max_length=10, verbose_name='Acción')),
+                ('changed_at', models.DateTimeField(auto_now_add=True, verbose_name='Fecha')),
+            ],
+            options={
+                'verbose_name': 'Cambio registrado',
+                'verbose_name_plural': 'Cambios registrados',
+                'ordering': ['id'],
+                'indexes': [models.Index(fields=['model', 'object_id'], name='inventory_c_model_040fa1_idx')],
+            },
+        ),
+    ]
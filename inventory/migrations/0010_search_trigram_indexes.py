@@ -0,0 +1,52 @@
+# Generated by Django 4.2.7 on 2026-10-19 07:34
+
+from django.db import migrations
+
+# Campos que se buscan con icontains. En PostgreSQL el filtro queda como
+# UPPER(campo::text) LIKE UPPER('%texto%'), que solo puede usar un índice
+# GIN de trigramas sobre esa misma expresión. En otras bases no se hace nada.
+SEARCH_FIELDS = {
+    'phone': ['imei', 'color'],
+    'phonemodel': ['name'],
+    'brand': ['name'],
+    'customer': ['name', 'email', 'phone', 'dni'],
+}
+
+
+def _indexes(apps, schema_editor):
+    for model_name, fields in SEARCH_FIELDS.items():
+        model = apps.get_model('inventory', model_name)
+        table = model._meta.db_table
+        for field in fields:
+            column = model._meta.get_field(field).column
+            yield f'{table}_{column}_trgm', table, column
+
+
+def create_trigram_indexes(apps, schema_editor):
+    if schema_editor.connection.vendor != 'postgresql':
+        return
+    quote = schema_editor.quote_name
+    schema_editor.execute('CREATE EXTENSION IF NOT EXISTS pg_trgm')
+    for name, table, column in _indexes(apps, schema_editor):
+        schema_editor.execute(
+            f'CREATE INDEX IF NOT EXISTS {quote(name)} ON {quote(table)} '
+            f'USING gin ((UPPER({quote(column)}::text)) gin_trgm_ops)'
+        )
+
+
+def drop_trigram_indexes(apps, schema_editor):
+    if schema_editor.connection.vendor != 'postgresql':
+        return
+    for name, table, column in _indexes(apps, schema_editor):
+        schema_editor.execute(f'DROP INDEX IF EXISTS {schema_editor.quote_name(name)}')
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('inventory', '0009_backgroundjob'),
+    ]
+
+    operations = [
+        migrations.RunPython(create_trigram_indexes, drop_trigram_indexes),
+    ]
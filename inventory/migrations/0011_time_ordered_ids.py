@@ -0,0 +1,30 @@
+# Generated by Django 4.2.7 on 2026-10-19 07:37
+
+from django.db import migrations, models
+import inventory.ids
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('inventory', '0010_search_trigram_indexes'),
+    ]
+
+    # Solo cambia el valor por defecto que genera Python: no hace falta tocar
+    # la base (en SQLite AlterField reconstruiría las dos tablas)
+    operations = [
+        migrations.SeparateDatabaseAndState(
+            state_operations=[
+                migrations.AlterField(
+                    model_name='phone',
+                    name='id',
+                    field=models.UUIDField(default=inventory.ids.uuid7, editable=False, primary_key=True, serialize=False),
+                ),
+                migrations.AlterField(
+                    model_name='sale',
+                    name='id',
+                    field=models.UUIDField(default=inventory.ids.uuid7, editable=False, primary_key=True, serialize=False),
+                ),
+            ],
+        ),
+    ]
@@ -0,0 +1,53 @@
+# Generated by Django 4.2.7 on 2026-10-19 08:41
+
+from django.db import migrations, models
+
+BATCH_SIZE = 5000
+
+
+def fill_imei_reversed(apps, schema_editor):
+    Phone = apps.get_model('inventory', 'Phone')
+    connection = schema_editor.connection
+    quote = schema_editor.quote_name
+    table = quote(Phone._meta.db_table)
+    if connection.vendor == 'postgresql':
+        schema_editor.execute(f'UPDATE {table} SET {quote("imei_reversed")} = REVERSE({quote("imei")})')
+        return
+    # SQLite no tiene REVERSE(): se calcula en Python, por lotes ordenados
+    # por pk (sin leer y escribir la tabla a la vez con dos cursores)
+    sql = f'UPDATE {table} SET {quote("imei_reversed")} = %s WHERE {quote("id")} = %s'
+    pk_field = Phone._meta.pk
+    phones = Phone.objects.using(connection.alias).order_by('pk')
+    last_pk = None
+    while True:
+        batch = phones if last_pk is None else phones.filter(pk__gt=last_pk)
+        batch = list(batch.values_list('pk', 'imei')[:BATCH_SIZE])
+        if not batch:
+            break
+        with connection.cursor() as cursor:
+            cursor.executemany(sql, [
+                (imei[::-1], pk_field.get_db_prep_value(pk, connection)) for pk, imei in batch
+            ])
+        last_pk = batch[-1][0]
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('inventory', '0011_time_ordered_ids'),
+    ]
+
+    # El índice se crea después de completar la columna, para no actualizarlo
+    # fila por fila
+    operations = [
+        migrations.AddField(
+            model_name='phone',
+            name='imei_reversed',
+            field=models.CharField(default='', editable=False, max_length=15),
+        ),
+        migrations.RunPython(fill_imei_reversed, migrations.RunPython.noop),
+        migrations.AddIndex(
+            model_name='phone',
+            index=models.Index(fields=['imei_reversed'], name='inventory_phone_imei_rev_idx'),
+        ),
+    ]
@@ -0,0 +1,43 @@
+# Generated by Django 4.2.7 on 2026-10-19 09:21
+
+import os
+
+from django.conf import settings
+from django.core.files import File
+from django.db import migrations, models
+import inventory.models
+
+
+def move_results(apps, schema_editor):
+    """
+    Pasa los resultados que quedaron en MEDIA_ROOT (accesibles para
+    cualquiera que conozca la ruta) al almacenamiento privado, con ruta nueva
+    """
+    BackgroundJob = apps.get_model('inventory', 'BackgroundJob')
+    storage = inventory.models.job_result_storage()
+    jobs = BackgroundJob.objects.using(schema_editor.connection.alias).exclude(result='')
+    for job in list(jobs.only('id', 'result')):
+        source = os.path.join(settings.MEDIA_ROOT, job.result.name)
+        if not os.path.exists(source):
+            continue
+        filename = os.path.basename(source)
+        with open(source, 'rb') as content:
+            name = storage.save(inventory.models.job_result_path(job, filename), File(content, name=filename))
+        os.remove(source)
+        BackgroundJob.objects.using(schema_editor.connection.alias).filter(pk=job.pk).update(result=name)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('inventory', '0012_phone_imei_reversed'),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name='backgroundjob',
+            name='result',
+            field=models.FileField(blank=True, storage=inventory.models.job_result_storage, upload_to=inventory.models.job_result_path, verbose_name='Archivo resultado'),
+        ),
+        migrations.RunPython(move_results, migrations.RunPython.noop),
+    ]
@@ -1,8 +1,14 @@
+import secrets
+
+from django.conf import settings
 from django.contrib.auth.models import AbstractUser
+from django.core.files.storage import FileSystemStorage
 from django.db import models
 from django.utils import timezone
 from django.core.validators import RegexValidator
-import uuid
+from django.utils.functional import cached_property
+
+from .ids import uuid7
 
 
 class CustomUser(AbstractUser):
@@ -41,6 +47,20 @@ class CustomUser(AbstractUser):
     def __str__(self):
         return f"{self.get_full_name()} ({self.get_role_display()})"
     
+    def get_session_auth_hash(self):
+        # El usuario de CachedModelBackend no trae la contraseña, sino los
+        # hash de sesión ya calculados (ver inventory/auth.py)
+        hashes = self.__dict__.get('_session_auth_hashes')
+        if hashes is None:
+            return super().get_session_auth_hash()
+        return hashes[0]
+    
+    def get_session_auth_fallback_hash(self):
+        hashes = self.__dict__.get('_session_auth_hashes')
+        if hashes is None:
+            return super().get_session_auth_fallback_hash()
+        return iter(hashes[1:])
+    
     def is_admin(self):
         return self.role == 'admin' or self.is_staff
     
@@ -171,7 +191,7 @@ class Phone(models.Model):
     
     id = models.UUIDField(
         primary_key=True,
-        default=uuid.uuid4,
+        default=uuid7,
         editable=False
     )
     model = models.ForeignKey(
@@ -185,6 +205,13 @@ class Phone(models.Model):
         validators=[imei_validator],
         verbose_name='IMEI'
     )
+    # IMEI al revés, para buscar por los últimos dígitos con un índice (ver
+    # ``identifiers``). Se completa al guardar
+    imei_reversed = models.CharField(
+        max_length=15,
+        default='',
+        editable=False
+    )
     status = models.CharField(
         max_length=20,
         choices=STATUS_CHOICES,
@@ -231,6 +258,7 @@ class Phone(models.Model):
     )
     updated_at = models.DateTimeField(
         auto_now=True,
+        db_index=True,
         verbose_name='Última modificación'
     )
     
@@ -238,6 +266,9 @@ class Phone(models.Model):
         verbose_name = 'Celular'
         verbose_name_plural = 'Celulares'
         ordering = ['-created_at']
+        indexes = [
+            models.Index(fields=['imei_reversed'], name='inventory_phone_imei_rev_idx'),
+        ]
     
     def __str__(self):
         return f"{self.model} - {self.imei} ({self.get_status_display()})"
@@ -246,6 +277,10 @@ class Phone(models.Model):
         # Si no se especifica precio, usar el precio base del modelo
         if not self.price:
             self.price = self.model.base_price
+        self.imei_reversed = self.imei[::-1]
+        update_fields = kwargs.get('update_fields')
+        if update_fields is not None and 'imei' in update_fields:
+            kwargs['update_fields'] = {*update_fields, 'imei_reversed'}
         super().save(*args, **kwargs)
     
     def can_be_sold(self):
@@ -318,6 +353,10 @@ class Customer(models.Model):
         auto_now_add=True,
         verbose_name='Fecha de registro'
     )
+    updated_at = models.DateTimeField(
+        auto_now=True,
+        verbose_name='Última modificación'
+    )
     
     class Meta:
         verbose_name = 'Cliente'
@@ -342,7 +381,7 @@ class Sale(models.Model):
     
     id = models.UUIDField(
         primary_key=True,
-        default=uuid.uuid4,
+        default=uuid7,
         editable=False
     )
     phone = models.OneToOneField(
@@ -411,6 +450,10 @@ class Sale(models.Model):
         blank=True,
         verbose_name='Notas'
     )
+    updated_at = models.DateTimeField(
+        auto_now=True,
+        verbose_name='Última modificación'
+    )
     
     class Meta:
         verbose_name = 'Venta'
@@ -437,3 +480,299 @@ class Sale(models.Model):
         if self.has_trade_in and self.trade_in_value:
             return self.sale_price - self.trade_in_value
         return self.sale_price
+
+
+class InventoryAudit(models.Model):
+    """
+    Sesión de conteo físico de inventario (auditoría de stock)
+    """
+    STATUS_CHOICES = [
+        ('open', 'Abierta'),
+        ('closed', 'Cerrada'),
+    ]
+    
+    scope_status = models.CharField(
+        max_length=20,
+        choices=Phone.STATUS_CHOICES,
+        blank=True,
+        verbose_name='Estado a contar',
+        help_text='Vacío: todos los celulares no vendidos'
+    )
+    scope_condition = models.CharField(
+        max_length=20,
+        choices=Phone.CONDITION_CHOICES,
+        blank=True,
+        verbose_name='Condición a contar'
+    )
+    status = models.CharField(
+        max_length=10,
+        choices=STATUS_CHOICES,
+        default='open',
+        verbose_name='Estado'
+    )
+    # Foto de los celulares esperados al abrir la sesión: [[id, imei], ...]
+    expected = models.JSONField(
+        default=list,
+        verbose_name='Celulares esperados'
+    )
+    expected_count = models.PositiveIntegerField(
+        default=0,
+        verbose_name='Cantidad esperada'
+    )
+    report = models.JSONField(
+        null=True,
+        blank=True,
+        verbose_name='Reporte de diferencias'
+    )
+    started_by = models.ForeignKey(
+        CustomUser,
+        on_delete=models.SET_NULL,
+        null=True,
+        related_name='audits_started',
+        verbose_name='Iniciada por'
+    )
+    started_at = models.DateTimeField(
+        auto_now_add=True,
+        verbose_name='Fecha de inicio'
+    )
+    closed_at = models.DateTimeField(
+        null=True,
+        blank=True,
+        verbose_name='Fecha de cierre'
+    )
+    
+    class Meta:
+        verbose_name = 'Auditoría de inventario'
+        verbose_name_plural = 'Auditorías de inventario'
+        ordering = ['-started_at']
+    
+    def __str__(self):
+        return f"Auditoría #{self.pk} - {self.started_at.strftime('%d/%m/%Y %H:%M')} ({self.get_status_display()})"
+
+
+class InventoryAuditScan(models.Model):
+    """
+    Código escaneado durante una auditoría (se guardan por lote)
+    """
+    audit = models.ForeignKey(
+        InventoryAudit,
+        on_delete=models.CASCADE,
+        related_name='scans',
+        verbose_name='Auditoría'
+    )
+    code = models.CharField(
+        max_length=100,
+        verbose_name='Código'
+    )
+    scanned_by = models.ForeignKey(
+        CustomUser,
+        on_delete=models.SET_NULL,
+        null=True,
+        verbose_name='Escaneado por'
+    )
+    scanned_at = models.DateTimeField(
+        auto_now_add=True,
+        verbose_name='Fecha'
+    )
+    
+    class Meta:
+        verbose_name = 'Escaneo de auditoría'
+        verbose_name_plural = 'Escaneos de auditoría'
+        ordering = ['id']
+    
+    def __str__(self):
+        return f"{self.code} (auditoría #{self.audit_id})"
+
+
+class ChangeLogEntry(models.Model):
+    """
+    Registro de cambios para sincronizar integraciones externas.
+    El ID es la secuencia: siempre creciente, sirve como cursor (el feed
+    retiene las entradas recientes, ver ChangeFeedService.get_queryset).
+    """
+    MODEL_CHOICES = [
+        ('phone', 'Celular'),
+        ('sale', 'Venta'),
+        ('customer', 'Cliente'),
+    ]
+    
+    ACTION_CHOICES = [
+        ('create', 'Alta'),
+        ('update', 'Modificación'),
+        ('delete', 'Baja'),
+    ]
+    
+    id = models.BigAutoField(primary_key=True)
+    model = models.CharField(
+        max_length=20,
+        choices=MODEL_CHOICES,
+        verbose_name='Modelo'
+    )
+    object_id = models.CharField(
+        max_length=36,
+        verbose_name='ID del registro'
+    )
+    action = models.CharField(
+        max_length=10,
+        choices=ACTION_CHOICES,
+        verbose_name='Acción'
+    )
+    changed_at = models.DateTimeField(
+        auto_now_add=True,
+        verbose_name='Fecha'
+    )
+    
+    class Meta:
+        verbose_name = 'Cambio registrado'
+        verbose_name_plural = 'Cambios registrados'
+        ordering = ['id']
+        indexes = [
+            models.Index(fields=['model', 'object_id']),
+        ]
+    
+    def __str__(self):
+        return f"#{self.id} {self.get_action_display()} {self.get_model_display()} {self.object_id}"
+
+
+class JobResultStorage(FileSystemStorage):
+    """
+    Almacenamiento privado de los resultados de los trabajos, en
+    ``JOB_RESULTS_ROOT`` y fuera de ``MEDIA_ROOT``: nada los sirve
+    directamente, solo la vista ``job_download`` después de verificar quién
+    lo pide. Como ``FileSystemStorage`` con ``MEDIA_ROOT``, sigue los cambios
+    del setting (``override_settings``).
+    """
+
+    @cached_property
+    def base_location(self):
+        return self._value_or_setting(self._location, settings.JOB_RESULTS_ROOT)
+
+    def _clear_cached_properties(self, setting, **kwargs):
+        super()._clear_cached_properties(setting, **kwargs)
+        if setting == 'JOB_RESULTS_ROOT':
+            self.__dict__.pop('base_location', None)
+            self.__dict__.pop('location', None)
+
+
+job_results_storage = JobResultStorage()
+
+
+def job_result_storage():
+    return job_results_storage
+
+
+def job_result_path(instance, filename):
+    # Un directorio al azar por resultado: la ruta no se puede adivinar
+    return f'{timezone.now():%Y/%m/%d}/{secrets.token_hex(16)}/{filename}'
+
+
+class BackgroundJob(models.Model):
+    """
+    Trabajo pesado (PDFs, exportaciones) que se ejecuta fuera de la petición.
+    Los procesos de ``manage.py run_workers`` toman los pendientes de esta tabla.
+    """
+    KIND_CHOICES = [
+        ('phone_labels', 'Etiquetas de celulares'),
+        ('inventory_report', 'Reporte de inventario'),
+        ('sales_report', 'Reporte de ventas'),
+        ('inventory_export', 'Exportación de inventario'),
+    ]
+    
+    STATUS_CHOICES = [
+        ('pending', 'Pendiente'),
+        ('running', 'En proceso'),
+        ('done', 'Terminado'),
+        ('failed', 'Fallido'),
+    ]
+    
+    kind = models.CharField(
+        max_length=30,
+        choices=KIND_CHOICES,
+        verbose_name='Tipo'
+    )
+    params = models.JSONField(
+        default=dict,
+        blank=True,
+        verbose_name='Parámetros'
+    )
+    status = models.CharField(
+        max_length=10,
+        choices=STATUS_CHOICES,
+        default='pending',
+        verbose_name='Estado'
+    )
+    progress = models.PositiveSmallIntegerField(
+        default=0,
+        verbose_name='Progreso (%)'
+    )
+    attempts = models.PositiveSmallIntegerField(
+        default=0,
+        verbose_name='Intentos'
+    )
+    max_attempts = models.PositiveSmallIntegerField(
+        default=3,
+        verbose_name='Intentos máximos'
+    )
+    # Un trabajo pendiente no se toma antes de esta fecha (reintentos con espera)
+    run_after = models.DateTimeField(
+        default=timezone.now,
+        verbose_name='Ejecutar después de'
+    )
+    worker = models.CharField(
+        max_length=100,
+        blank=True,
+        verbose_name='Proceso'
+    )
+    error = models.TextField(
+        blank=True,
+        verbose_name='Último error'
+    )
+    result = models.FileField(
+        upload_to=job_result_path,
+        storage=job_result_storage,
+        blank=True,
+        verbose_name='Archivo resultado'
+    )
+    created_by = models.ForeignKey(
+        CustomUser,
+        on_delete=models.SET_NULL,
+        null=True,
+        related_name='background_jobs',
+        verbose_name='Solicitado por'
+    )
+    created_at = models.DateTimeField(
+        auto_now_add=True,
+        verbose_name='Fecha de creación'
+    )
+    started_at = models.DateTimeField(
+        null=True,
+        blank=True,
+        verbose_name='Fecha de inicio'
+    )
+    # Lo renueva el worker mientras avanza (ver jobs.JobProgress)
+    heartbeat_at = models.DateTimeField(
+        null=True,
+        blank=True,
+        verbose_name='Última señal del worker'
+    )
+    finished_at = models.DateTimeField(
+        null=True,
+        blank=True,
+        verbose_name='Fecha de finalización'
+    )
+    expires_at = models.DateTimeField(
+        null=True,
+        blank=True,
+        verbose_name='Vencimiento del resultado'
+    )
+    
+    class Meta:
+        verbose_name = 'Trabajo en segundo plano'
+        verbose_name_plural = 'Trabajos en segundo plano'
+        ordering = ['-created_at']
+        indexes = [
+            models.Index(fields=['status', 'run_after']),
+        ]
+    
+    def __str__(self):
+        return f"#{self.pk} {self.get_kind_display()} ({self.get_status_display()})"
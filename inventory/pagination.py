@@ -0,0 +1,18 @@
+from django.core.paginator import Paginator
+from django.utils.functional import cached_property
+
+from .db import estimate_count
+
+
+class EstimatedCountPaginator(Paginator):
+    """
+    Paginator que en tablas grandes de PostgreSQL usa la cantidad estimada
+    por el planificador (ver ``estimate_count``). La cantidad de páginas
+    puede ser aproximada: las últimas páginas pueden quedar vacías.
+    """
+
+    @cached_property
+    def count(self):
+        if hasattr(self.object_list, 'query'):
+            return estimate_count(self.object_list)
+        return super().count
@@ -0,0 +1,142 @@
+"""
+Motor único de códigos QR
+
+La matriz de módulos de cada contenido se calcula una sola vez (con la
+librería ``qrcode``, sin generar imagen) y queda en una caché LRU. A partir de
+la matriz se dibuja directamente en el formato que se necesite:
+
+- SVG: un único ``<path>`` con un tramo por cada corrida horizontal de módulos
+  oscuros; escala sin pérdida a cualquier tamaño.
+- PNG: blanco y negro de 1 bit, escalado por un factor entero (vecino más
+  cercano) y comprimido con zlib, sin pasar por PIL.
+- ReportLab: rectángulos sobre el canvas del PDF (uno por corrida), con los
+  operadores ya armados en caché.
+"""
+import base64
+import struct
+import zlib
+from functools import lru_cache
+
+import qrcode
+
+# Módulos de margen blanco alrededor del código (zona de silencio)
+QUIET_ZONE = 4
+
+
+@lru_cache(maxsize=2048)
+def get_matrix(data):
+    """
+    Matriz de módulos del QR para ``data``: tupla de filas, cada una una
+    tupla de booleanos (``True`` = módulo oscuro), sin zona de silencio
+    """
+    qr = qrcode.QRCode(error_correction=qrcode.constants.ERROR_CORRECT_L, border=0)
+    qr.add_data(data)
+    qr.make(fit=True)
+    return tuple(tuple(row) for row in qr.get_matrix())
+
+
+@lru_cache(maxsize=2048)
+def get_runs(data):
+    """
+    Corridas horizontales de módulos oscuros: tupla de ``(fila, columna,
+    largo)``. Es lo que dibujan el SVG y ReportLab.
+    """
+    runs = []
+    for y, row in enumerate(get_matrix(data)):
+        x = 0
+        width = len(row)
+        while x < width:
+            if row[x]:
+                start = x
+                while x < width and row[x]:
+                    x += 1
+                runs.append((y, start, x - start))
+            else:
+                x += 1
+    return tuple(runs)
+
+
+def render_svg(data, size=150, border=QUIET_ZONE):
+    """SVG del QR de ``size`` píxeles de lado"""
+    modules = len(get_matrix(data)) + 2 * border
+    path = ''.join(
+        f'M{x + border} {y + border}h{length}v1h-{length}z'
+        for y, x, length in get_runs(data)
+    )
+    return (
+        f'<svg xmlns="http://www.w3.org/2000/svg" width="{size}" height="{size}" '
+        f'viewBox="0 0 {modules} {modules}" shape-rendering="crispEdges">'
+        f'<rect width="{modules}" height="{modules}" fill="#fff"/>'
+        f'<path d="{path}" fill="#000"/></svg>'
+    )
+
+
+def _png_chunk(kind, payload):
+    chunk = kind + payload
+    return struct.pack('>I', len(payload)) + chunk + struct.pack('>I', zlib.crc32(chunk))
+
+
+def render_png(data, scale=4, border=QUIET_ZONE):
+    """
+    PNG de 1 bit del QR, con cada módulo de ``scale`` x ``scale`` píxeles
+    """
+    matrix = get_matrix(data)
+    modules = len(matrix) + 2 * border
+    width = modules * scale
+    # En escala de grises de 1 bit, 0 es negro: los módulos oscuros valen '0'
+    row_bytes = (width + 7) // 8
+    padding = row_bytes * 8 - width
+
+    blank_row = b'\x00' + b'\xff' * row_bytes
+    margin = '1' * (border * scale)
+    raw = [blank_row * (border * scale)]
+    for row in matrix:
+        bits = margin + ''.join('0' * scale if dark else '1' * scale for dark in row) + margin + '1' * padding
+        line = b'\x00' + int(bits, 2).to_bytes(row_bytes, 'big')
+        raw.append(line * scale)
+    raw.append(blank_row * (border * scale))
+
+    header = struct.pack('>IIBBBBB', width, width, 1, 0, 0, 0, 0)
+    return b''.join([
+        b'\x89PNG\r\n\x1a\n',
+        _png_chunk(b'IHDR', header),
+        _png_chunk(b'IDAT', zlib.compress(b''.join(raw), 9)),
+        _png_chunk(b'IEND', b''),
+    ])
+
+
+def png_data_uri(data, size=200, border=QUIET_ZONE):
+    """
+    PNG como data URI, con la mayor escala entera que entra en ``size``
+    píxeles (nunca menos de 1 píxel por módulo)
+    """
+    modules = len(get_matrix(data)) + 2 * border
+    scale = max(1, size // modules)
+    encoded = base64.b64encode(render_png(data, scale, border)).decode()
+    return f'data:image/png;base64,{encoded}'
+
+
+@lru_cache(maxsize=2048)
+def get_pdf_path(data):
+    """
+    Operadores PDF que rellenan los módulos oscuros, en unidades de módulo
+    (enteros) con el origen abajo a la izquierda. Se arma una vez por
+    contenido; cada dibujo solo agrega una transformación de escala.
+    """
+    height = len(get_matrix(data))
+    rects = ' '.join(f'{x} {height - y - 1} {length} 1 re' for y, x, length in get_runs(data))
+    return f'{rects} f'
+
+
+def draw_reportlab(canvas, data, x, y, size, border=0):
+    """
+    Dibuja el QR en un canvas de ReportLab, con la esquina inferior izquierda
+    en ``(x, y)`` y ``size`` puntos de lado
+    """
+    modules = len(get_matrix(data)) + 2 * border
+    module = size / modules
+    canvas.saveState()
+    canvas.transform(module, 0, 0, module, x + border * module, y + border * module)
+    canvas.setFillColorRGB(0, 0, 0)
+    canvas.addLiteral(get_pdf_path(data))
+    canvas.restoreState()
@@ -0,0 +1,88 @@
+"""
+Lecturas de reportes y exportaciones en una base aparte
+
+Si ``DATABASES`` tiene el alias ``reporting`` (una réplica o una copia de
+SQLite que refresca el comando ``refresh_reporting_snapshot``), las consultas
+hechas dentro de ``reporting_reads()`` se leen de ahí y no compiten con las
+escrituras de la base principal. Sin ese alias todo sigue en ``default``.
+
+Lectura de lo propio: cuando una petición escribe en la base, el resto de la
+petición y las siguientes de ese navegador durante ``REPORTING_PIN_SECONDS``
+(ver ReadYourWritesMiddleware) leen de ``default``, porque la copia todavía no
+tiene esos cambios.
+"""
+from contextlib import contextmanager
+from contextvars import ContextVar
+
+from django.conf import settings
+from django.db import DEFAULT_DB_ALIAS
+
+REPORTING_ALIAS = 'reporting'
+
+# Modelos que nunca se leen de la copia: el estado de los trabajos cambia
+# mientras se generan los reportes que los usan
+NOT_ROUTED = {'inventory.BackgroundJob'}
+
+_reporting = ContextVar('reporting_reads', default=False)
+_request_state = ContextVar('reporting_request_state', default=None)
+
+
+class RequestState:
+    """Estado de la petición en curso (un objeto mutable compartido entre hilos)"""
+
+    def __init__(self, pinned=False):
+        self.pinned = pinned
+        self.wrote = False
+
+
+def has_reporting_db():
+    return REPORTING_ALIAS in settings.DATABASES
+
+
+def get_reporting_alias():
+    """Alias del que leen los reportes en este momento"""
+    state = _request_state.get()
+    if not has_reporting_db() or (state is not None and state.pinned):
+        return DEFAULT_DB_ALIAS
+    return REPORTING_ALIAS
+
+
+@contextmanager
+def reporting_reads():
+    """Las lecturas dentro del bloque van a la base de reportes"""
+    token = _reporting.set(True)
+    try:
+        yield
+    finally:
+        _reporting.reset(token)
+
+
+@contextmanager
+def request_scope(pinned=False):
+    """Marca el comienzo y fin de una petición (lo usa el middleware)"""
+    state = RequestState(pinned)
+    token = _request_state.set(state)
+    try:
+        yield state
+    finally:
+        _request_state.reset(token)
+
+
+class ReportingRouter:
+    def db_for_read(self, model, **hints):
+        if _reporting.get() and model._meta.label not in NOT_ROUTED:
+            return get_reporting_alias()
+        return None
+
+    def db_for_write(self, model, **hints):
+        state = _request_state.get()
+        if state is not None:
+            state.wrote = state.pinned = True
+        return None
+
+    def allow_migrate(self, db, app_label, model_name=None, **hints):
+        # La copia se arma desde la base principal (o la réplica desde el
+        # servidor primario); nunca se migra directamente
+        if db == REPORTING_ALIAS:
+            return False
+        return None
@@ -0,0 +1,48 @@
+from .catalog import with_catalog
+
+
+class PhoneSerializer:
+    """
+    Serialización compacta de celulares para las APIs JSON
+    """
+
+    @staticmethod
+    def get_queryset(queryset):
+        """
+        Agrega lo que necesita to_dict para no hacer consultas por fila: el
+        usuario unido y el modelo del catálogo en memoria
+        """
+        return with_catalog(queryset.select_related('added_by'))
+
+    @staticmethod
+    def to_dict(phone):
+        """
+        Convierte un celular en un diccionario listo para JsonResponse
+        """
+        return {
+            'id': str(phone.id),
+            'model': str(phone.model),
+            'imei': phone.imei,
+            'status': phone.get_status_display(),
+            'condition': phone.get_condition_display(),
+            'price': str(phone.price),
+            'color': phone.color,
+            'storage_capacity': phone.storage_capacity,
+            'added_by': phone.added_by.get_full_name() if phone.added_by else '',
+            'created_at': phone.created_at.strftime('%d/%m/%Y %H:%M'),
+        }
+
+    @staticmethod
+    def lookup_result(phones):
+        """
+        ``(datos, status)`` de la API de un celular para los celulares que
+        resolvió un código (ver ``identifiers.PhoneLookup``)
+        """
+        if not phones:
+            return {'error': 'Celular no encontrado'}, 404
+        if len(phones) > 1:
+            return {
+                'error': 'El código corresponde a más de un celular',
+                'results': [PhoneSerializer.to_dict(phone) for phone in phones],
+            }, 409
+        return PhoneSerializer.to_dict(phones[0]), 200
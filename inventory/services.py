@@ -1,7 +1,20 @@
-from django.db.models import Count, Sum, Avg, Q
+from django.conf import settings
+from django.core.cache import cache
+from django.db import connections
+from django.db.models import Count, Sum, Avg, Q, Exists, OuterRef
+from django.db.models.functions import TruncMonth
 from django.utils import timezone
+from concurrent.futures import ThreadPoolExecutor, TimeoutError as FutureTimeoutError
+from contextvars import copy_context
 from datetime import datetime, timedelta
-from .models import Phone, Sale, Customer, Brand, PhoneModel
+import logging
+import threading
+import time
+from .catalog import search_model_ids, with_catalog
+from .models import Phone, Sale, Customer, Brand, PhoneModel, ChangeLogEntry
+from .routers import reporting_reads
+
+logger = logging.getLogger(__name__)
 
 
 class InventoryService:
@@ -12,22 +25,45 @@ class InventoryService:
     @staticmethod
     def get_available_phones():
         """Obtiene celulares disponibles para venta"""
-        return Phone.objects.filter(status='available').select_related('model__brand')
+        return with_catalog(Phone.objects.filter(status='available'))
     
     @staticmethod
     def get_phones_by_status(status):
         """Obtiene celulares por estado"""
-        return Phone.objects.filter(status=status).select_related('model__brand')
+        return with_catalog(Phone.objects.filter(status=status))
     
     @staticmethod
     def search_phones(query):
         """Busca celulares por múltiples criterios"""
-        return Phone.objects.filter(
+        return with_catalog(Phone.objects.filter(
             Q(imei__icontains=query) |
-            Q(model__name__icontains=query) |
-            Q(model__brand__name__icontains=query) |
+            Q(model_id__in=search_model_ids(query)) |
             Q(color__icontains=query)
-        ).select_related('model__brand')
+        ))
+    
+    @staticmethod
+    def filter_phones(phones, cleaned_data, include_condition=True):
+        """
+        Aplica los filtros de PhoneSearchForm a un queryset de celulares
+        """
+        search = cleaned_data.get('search')
+        status = cleaned_data.get('status')
+        condition = cleaned_data.get('condition')
+        
+        if search:
+            phones = phones.filter(
+                Q(imei__icontains=search) |
+                Q(model_id__in=search_model_ids(search)) |
+                Q(color__icontains=search)
+            )
+        
+        if status:
+            phones = phones.filter(status=status)
+        
+        if include_condition and condition:
+            phones = phones.filter(condition=condition)
+        
+        return phones
     
     @staticmethod
     def get_low_stock_models(threshold=5):
@@ -73,9 +109,9 @@ class SalesService:
     @staticmethod
     def get_sales_by_period(start_date, end_date):
         """Obtiene ventas en un período específico"""
-        return Sale.objects.filter(
+        return with_catalog(Sale.objects.filter(
             sale_date__range=[start_date, end_date]
-        ).select_related('phone__model__brand', 'customer', 'sold_by')
+        ).select_related('phone', 'customer', 'sold_by'), 'phone__model')
     
     @staticmethod
     def get_monthly_sales(year=None, month=None):
@@ -102,11 +138,120 @@ class SalesService:
         )
 
 
+def _run_in_own_connection(func):
+    """
+    Ejecuta una sección de reporte en un hilo del pool y cierra su conexión
+    a la base al terminar (cada hilo usa una conexión propia)
+    """
+    try:
+        return func()
+    finally:
+        connections.close_all()
+
+
+class _ReportSection:
+    """
+    Sección enviada al pool de reportes. El timeout se cuenta desde que la
+    sección empieza a ejecutarse, no desde que se encoló: con el pool ocupado
+    (varias peticiones de reportes a la vez) una sección puede esperar un
+    hilo libre.
+    """
+
+    def __init__(self, name, func, timeout):
+        self.name = name
+        self.func = func
+        self.timeout = timeout
+        self.submitted_at = time.monotonic()
+        self.started_at = None
+        self.started = threading.Event()
+        self.future = None
+
+    def __call__(self):
+        self.started_at = time.monotonic()
+        self.started.set()
+        return _run_in_own_connection(self.func)
+
+    def result(self):
+        """
+        Resultado de la sección. Espera hasta ``timeout`` segundos a que
+        tome un hilo (si no lo toma se cancela) y hasta ``timeout`` segundos
+        más desde que empezó; si no, ``FutureTimeoutError``.
+        """
+        if not self.started.wait(max(0, self.submitted_at + self.timeout - time.monotonic())):
+            if self.future.cancel():
+                raise FutureTimeoutError
+            # No se pudo cancelar: acaba de tomar un hilo
+            self.started.wait()
+        return self.future.result(timeout=max(0, self.started_at + self.timeout - time.monotonic()))
+
+
 class ReportService:
     """
     Servicio para generar reportes
     """
     
+    # Secciones independientes del reporte: (nombre, método, timeout en segundos)
+    REPORT_SECTIONS = [
+        ('inventory_stats', 'get_inventory_stats', 10),
+        ('sales_stats', 'get_sales_stats', 10),
+        ('monthly_revenue', 'get_monthly_revenue', 5),
+        ('top_models', 'get_top_selling_models_list', 10),
+    ]
+    
+    _executor = None
+    
+    @classmethod
+    def _get_executor(cls):
+        if cls._executor is None:
+            cls._executor = ThreadPoolExecutor(
+                max_workers=getattr(settings, 'REPORT_WORKERS', len(cls.REPORT_SECTIONS)),
+                thread_name_prefix='report'
+            )
+        return cls._executor
+    
+    @classmethod
+    def build_report(cls):
+        """
+        Calcula todas las secciones del reporte en paralelo, cada una con su
+        propia conexión, así la demora total es la de la sección más lenta.
+        
+        Si una sección falla o supera su timeout se usa el último resultado
+        bueno guardado en caché (o ``None``). Retorna ``(reporte, secciones
+        con problemas)``.
+        """
+        timeouts = getattr(settings, 'REPORT_SECTION_TIMEOUTS', {})
+        executor = cls._get_executor()
+        sections = [
+            _ReportSection(name, getattr(cls, method), timeouts.get(name, default_timeout))
+            for name, method, default_timeout in cls.REPORT_SECTIONS
+        ]
+        # Las secciones leen de la base de reportes (si hay una); cada hilo
+        # recibe una copia del contexto con esa marca
+        with reporting_reads():
+            for section in sections:
+                section.future = executor.submit(copy_context().run, section)
+        
+        report = {}
+        failed = []
+        for section in sections:
+            name = section.name
+            cache_key = f'report_section:{name}'
+            try:
+                report[name] = section.result()
+            except FutureTimeoutError:
+                # Si ya había empezado, el hilo sigue corriendo hasta que
+                # termine la consulta
+                logger.warning('Sección de reporte %s superó el timeout de %ss', name, section.timeout)
+            except Exception:
+                logger.exception('Error calculando la sección de reporte %s', name)
+            else:
+                cache.set(cache_key, report[name], None)
+                continue
+            report[name] = cache.get(cache_key)
+            failed.append(name)
+        
+        return report, failed
+    
     @staticmethod
     def get_inventory_stats():
         """Estadísticas generales del inventario"""
@@ -139,14 +284,19 @@ class ReportService:
         
         # Ventas por mes (últimos 12 meses)
         twelve_months_ago = timezone.now() - timedelta(days=365)
-        monthly_sales = Sale.objects.filter(
-            sale_date__gte=twelve_months_ago
-        ).extra(
-            select={'month': "strftime('%%Y-%%m', sale_date)"}
-        ).values('month').annotate(
-            count=Count('id'),
-            revenue=Sum('sale_price')
-        ).order_by('month')
+        # TruncMonth funciona en cualquier base y agrupa por el mes en la zona
+        # horaria local; el reporte sigue recibiendo el mes como 'AAAA-MM'
+        monthly_sales = [
+            dict(row, month=timezone.localtime(row['month']).strftime('%Y-%m'))
+            for row in Sale.objects.filter(
+                sale_date__gte=twelve_months_ago
+            ).annotate(
+                month=TruncMonth('sale_date')
+            ).values('month').annotate(
+                count=Count('id'),
+                revenue=Sum('sale_price')
+            ).order_by('month')
+        ]
         
         # Ventas por forma de pago
         payment_stats = Sale.objects.values('payment_method').annotate(
@@ -157,7 +307,7 @@ class ReportService:
         return {
             'total_sales': total_sales,
             'total_revenue': total_revenue,
-            'monthly_sales': list(monthly_sales),
+            'monthly_sales': monthly_sales,
             'payment_stats': list(payment_stats),
         }
     
@@ -199,10 +349,15 @@ class ReportService:
     @staticmethod
     def get_top_selling_models(limit=10):
         """Modelos más vendidos"""
-        return PhoneModel.objects.annotate(
+        return PhoneModel.objects.select_related('brand').annotate(
             sales_count=Count('phone__sale')
         ).filter(sales_count__gt=0).order_by('-sales_count')[:limit]
     
+    @staticmethod
+    def get_top_selling_models_list(limit=10):
+        """Modelos más vendidos, ya evaluados (para calcular fuera del request)"""
+        return list(ReportService.get_top_selling_models(limit))
+    
     @staticmethod
     def get_customer_stats():
         """Estadísticas de clientes"""
@@ -220,3 +375,88 @@ class ReportService:
                 'name', 'purchase_count', 'total_spent'
             )),
         }
+
+
+class ChangeFeedService:
+    """
+    Servicio para consultar y compactar el registro de cambios
+    """
+    
+    @staticmethod
+    def get_lag():
+        """
+        Segundos que se retiene cada entrada antes de entregarla
+        (``CHANGE_FEED_LAG``). En SQLite las escrituras son de a una, así que
+        las secuencias se confirman en orden y no hace falta esperar.
+        """
+        lag = getattr(settings, 'CHANGE_FEED_LAG', None)
+        if lag is None:
+            lag = 0 if connections[ChangeLogEntry.objects.db].vendor == 'sqlite' else 5
+        return lag
+
+    @staticmethod
+    def get_queryset(after=0, limit=500):
+        """
+        Cambios con secuencia mayor a ``after``, en orden, que se pueden
+        entregar.
+
+        Cada entrada se inserta en su propia transacción al confirmarse el
+        cambio (ver ``signals``). En PostgreSQL, con escrituras concurrentes,
+        una secuencia menor puede confirmarse un instante después que una
+        mayor; si se entregara la mayor, el cliente avanzaría su cursor y
+        nunca vería la menor. Por eso solo se entregan las entradas con más de
+        ``get_lag()`` segundos: garantía de que un cliente que avanza con
+        ``next`` recibe todas las entradas, siempre que cada inserción se
+        confirme dentro de ese margen (es una sola fila, sin esperas de
+        bloqueos) y que los relojes de los servidores de la aplicación no
+        difieran en más que eso.
+        """
+        changes = ChangeLogEntry.objects.filter(id__gt=after)
+        lag = ChangeFeedService.get_lag()
+        if lag:
+            changes = changes.filter(changed_at__lte=timezone.now() - timedelta(seconds=lag))
+        return changes.order_by('id').values('id', 'model', 'object_id', 'action', 'changed_at')[:limit]
+
+    @staticmethod
+    def get_changes(after=0, limit=500):
+        """Cambios con secuencia mayor a ``after``, en orden (ver ``get_queryset``)"""
+        return list(ChangeFeedService.get_queryset(after, limit))
+    
+    @staticmethod
+    def wait_for_changes(after=0, limit=500, timeout=0, poll_interval=1):
+        """
+        Long-poll: espera hasta ``timeout`` segundos a que haya cambios
+        nuevos, consultando cada ``poll_interval`` segundos
+        """
+        deadline = time.monotonic() + timeout
+        while True:
+            changes = ChangeFeedService.get_changes(after, limit)
+            if changes or time.monotonic() >= deadline:
+                return changes
+            time.sleep(poll_interval)
+    
+    @staticmethod
+    def compact(before, batch_size=1000):
+        """
+        Compacta los cambios anteriores a ``before``: de cada registro se
+        conserva solo el último cambio, así un cliente con cualquier cursor
+        sigue recibiendo el estado final de cada objeto. Retorna la cantidad
+        de entradas eliminadas.
+        
+        Una entrada sobra si hay otra más nueva del mismo registro (un
+        ``EXISTS`` correlacionado que usa el índice de ``model, object_id``).
+        Los lotes avanzan por id, así cada entrada se examina una sola vez.
+        """
+        newer = ChangeLogEntry.objects.filter(
+            model=OuterRef('model'), object_id=OuterRef('object_id'), id__gt=OuterRef('id')
+        )
+        stale = ChangeLogEntry.objects.filter(Exists(newer), changed_at__lt=before).order_by('id')
+        
+        deleted = 0
+        last_id = 0
+        while True:
+            ids = list(stale.filter(id__gt=last_id).values_list('id', flat=True)[:batch_size])
+            if not ids:
+                return deleted
+            last_id = ids[-1]
+            deleted += ChangeLogEntry.objects.filter(id__in=ids).delete()[0]
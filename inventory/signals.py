@@ -0,0 +1,112 @@
+"""
+Señales que alimentan el registro de cambios (ChangeLogEntry), los
+eventos en vivo (SSE) y la invalidación de las filas, los usuarios y el
+catálogo de modelos cacheados
+"""
+from functools import partial
+
+from django.db import transaction
+from django.db.models.signals import post_save, post_delete
+from django.dispatch import receiver
+
+from .models import Phone, Sale, Customer, ChangeLogEntry, Brand, PhoneModel, CustomUser
+from .events import broker, phone_event, sale_event
+from .fragments import bump_row_version
+from .auth import invalidate_cached_user
+from .catalog import invalidate_catalog
+
+
+TRACKED_MODELS = {
+    Phone: 'phone',
+    Sale: 'sale',
+    Customer: 'customer',
+}
+
+
+def _record_change(model_name, object_id, action):
+    ChangeLogEntry.objects.create(model=model_name, object_id=object_id, action=action)
+
+
+def _schedule_change(instance, action):
+    # Se registra al confirmar la transacción, con un INSERT que se confirma
+    # enseguida: los cambios revertidos no aparecen. Con escrituras
+    # concurrentes en PostgreSQL dos secuencias pueden confirmarse en otro
+    # orden; el feed lo cubre con el margen de ChangeFeedService.get_lag
+    transaction.on_commit(partial(
+        _record_change, TRACKED_MODELS[type(instance)], str(instance.pk), action
+    ))
+
+
+@receiver(post_save, sender=Phone)
+@receiver(post_save, sender=Sale)
+@receiver(post_save, sender=Customer)
+def log_save(sender, instance, created, raw=False, **kwargs):
+    if raw:
+        return
+    _schedule_change(instance, 'create' if created else 'update')
+
+
+@receiver(post_delete, sender=Phone)
+@receiver(post_delete, sender=Sale)
+@receiver(post_delete, sender=Customer)
+def log_delete(sender, instance, **kwargs):
+    _schedule_change(instance, 'delete')
+
+
+def _publish_on_commit(build_event):
+    # Solo se arma el evento si hay conexiones escuchando en este proceso
+    if broker.subscriber_count:
+        transaction.on_commit(lambda: broker.publish(build_event()))
+
+
+@receiver(post_save, sender=Phone)
+def publish_phone(sender, instance, raw=False, **kwargs):
+    if raw:
+        return
+    _publish_on_commit(partial(phone_event, instance))
+
+
+@receiver(post_delete, sender=Phone)
+def publish_phone_delete(sender, instance, **kwargs):
+    _publish_on_commit(lambda: {'type': 'phone_deleted', 'id': str(instance.pk)})
+
+
+@receiver(post_save, sender=Sale)
+def publish_sale(sender, instance, created, raw=False, **kwargs):
+    if raw:
+        return
+    _publish_on_commit(partial(sale_event, instance, created))
+
+
+@receiver(post_save, sender=Brand)
+@receiver(post_save, sender=PhoneModel)
+@receiver(post_save, sender=CustomUser)
+@receiver(post_delete, sender=Brand)
+@receiver(post_delete, sender=PhoneModel)
+@receiver(post_delete, sender=CustomUser)
+def invalidate_rows(sender, instance, update_fields=None, raw=False, **kwargs):
+    # Marca, modelo y nombre del usuario se muestran en las filas de las
+    # listas pero no cambian el updated_at del celular o la venta
+    if raw or update_fields == frozenset({'last_login'}):
+        return
+    transaction.on_commit(bump_row_version)
+
+
+@receiver(post_save, sender=Brand)
+@receiver(post_save, sender=PhoneModel)
+@receiver(post_delete, sender=Brand)
+@receiver(post_delete, sender=PhoneModel)
+def invalidate_model_catalog(sender, instance, raw=False, **kwargs):
+    if raw:
+        return
+    transaction.on_commit(invalidate_catalog)
+
+
+@receiver(post_save, sender=CustomUser)
+@receiver(post_delete, sender=CustomUser)
+def invalidate_user(sender, instance, raw=False, **kwargs):
+    # Al confirmar: una petición concurrente podría volver a cachear los
+    # datos anteriores mientras la transacción sigue abierta
+    if raw:
+        return
+    transaction.on_commit(partial(invalidate_cached_user, instance.pk))
@@ -1,10 +1,25 @@
 from django import template
+from django.utils.html import format_html
 from django.utils.safestring import mark_safe
+from ..fragments import get_row_cache_settings
+from ..models import Phone
 from ..utils import QRCodeGenerator, IMEIValidator
+from functools import lru_cache
 import json
 
 register = template.Library()
 
+STATUS_COLORS = {
+    # Colores optimizados estilo Bootstrap para estados actuales
+    'available': 'success',        # Stock - verde
+    'reserved': 'info',            # Reservado - celeste
+    'sold': 'warning',             # Vendido - amarillo
+    'service': 'danger',           # Servicio técnico - rojo
+    'in_transit': 'secondary',     # En camino - gris
+    'warehouse': 'dark',           # Depósito - gris oscuro
+    'damaged': 'danger',           # Legacy / fallback
+}
+
 
 @register.filter
 def generate_qr(data, size="200x200"):
@@ -19,6 +34,14 @@ def generate_qr(data, size="200x200"):
         return ""
 
 
+@register.filter
+def qr_svg(data, size=150):
+    """
+    Renderiza un código QR como SVG en línea (sin JavaScript)
+    """
+    return mark_safe(QRCodeGenerator.generate_qr_svg(str(data), int(size)))
+
+
 @register.filter
 def format_imei(imei):
     """
@@ -71,41 +94,69 @@ def qr_code(data, size=150, label=""):
     }
 
 
-@register.inclusion_tag('inventory/partials/phone_status_badge.html')
+CONDITION_COLORS = {
+    'new': 'primary',
+    'used': 'warning',
+    'refurbished': 'info',
+    'trade_in': 'secondary'
+}
+
+
+# Los badges y las opciones del selector de estado solo dependen del valor,
+# así que se arman una vez y se reutilizan en todas las filas
+@lru_cache(maxsize=64)
+def _status_badge_html(status):
+    label = dict(Phone.STATUS_CHOICES).get(status, status)
+    return format_html('<span class="badge bg-{}">{}</span>', STATUS_COLORS.get(status, 'secondary'), label)
+
+
+@lru_cache(maxsize=64)
+def _condition_badge_html(condition):
+    label = dict(Phone.CONDITION_CHOICES).get(condition, condition)
+    return format_html('<span class="badge bg-{}">{}</span>', CONDITION_COLORS.get(condition, 'secondary'), label)
+
+
+@lru_cache(maxsize=64)
+def _status_options_html(selected):
+    return mark_safe(''.join(
+        format_html(
+            '<option value="{}"{}>{}</option>',
+            value, mark_safe(' selected') if value == selected else '', label
+        )
+        for value, label in Phone.STATUS_CHOICES
+    ))
+
+
+@register.simple_tag
 def phone_status_badge(phone):
     """
     Renderiza un badge del estado del celular
     """
-    status_colors = {
-        # Colores optimizados estilo Bootstrap para estados actuales
-        'available': 'success',        # Stock - verde
-        'reserved': 'info',            # Reservado - celeste
-        'sold': 'warning',             # Vendido - amarillo
-        'service': 'danger',           # Servicio técnico - rojo
-        'in_transit': 'secondary',     # En camino - gris
-        'warehouse': 'dark',           # Depósito - gris oscuro
-        'damaged': 'danger',           # Legacy / fallback
-    }
-    
-    return {
-        'phone': phone,
-        'color': status_colors.get(phone.status, 'secondary')
-    }
+    return _status_badge_html(phone.status)
 
 
-@register.inclusion_tag('inventory/partials/condition_badge.html')
+@register.simple_tag
 def condition_badge(phone):
     """
     Renderiza un badge de la condición del celular
     """
-    condition_colors = {
-        'new': 'primary',
-        'used': 'warning',
-        'refurbished': 'info',
-        'trade_in': 'secondary'
-    }
-    
-    return {
-        'phone': phone,
-        'color': condition_colors.get(phone.condition, 'secondary')
-    }
+    return _condition_badge_html(phone.condition)
+
+
+@register.simple_tag
+def status_select(phone):
+    """
+    Renderiza el selector de estado de un celular (cambio rápido de estado)
+    """
+    return format_html(
+        '<select class="form-select form-select-sm status-dropdown" data-phone-id="{}">{}</select>',
+        phone.id, _status_options_html(phone.status)
+    )
+
+
+@register.simple_tag
+def row_cache_settings():
+    """
+    Timeout y versión para cachear filas de las listas con ``{% cache %}``
+    """
+    return get_row_cache_settings()
@@ -1,6 +1,13 @@
+from django.conf import settings
 from django.urls import path
 from . import views
 
+# En el despliegue ASGI las consultas y APIs JSON usan vistas asíncronas
+if settings.ASYNC_VIEWS:
+    from . import async_views as lookup_views
+else:
+    lookup_views = views
+
 urlpatterns = [
     # Página principal
     path('', views.home, name='home'),
@@ -27,14 +34,36 @@ urlpatterns = [
     path('customers/', views.customer_list, name='customer_list'),
     path('customers/add/', views.add_customer, name='add_customer'),
     path('customers/<int:customer_id>/', views.customer_detail, name='customer_detail'),
-    path('api/customers/search/', views.search_customers, name='search_customers'),
+    path('api/customers/search/', lookup_views.search_customers, name='search_customers'),
     
     # Reportes (solo admin)
-    path('reports/', views.reports, name='reports'),
+    path('reports/', lookup_views.reports, name='reports'),
+    path('export/inventory.ndjson', views.export_inventory, name='export_inventory'),
+    path('reports/jobs/<str:kind>/', views.report_job, name='report_job'),
+    
+    # Trabajos en segundo plano (PDFs, exportaciones)
+    path('labels/', views.print_labels, name='print_labels'),
+    path('jobs/<int:job_id>/', views.job_detail, name='job_detail'),
+    path('jobs/<int:job_id>/download/', views.job_download, name='job_download'),
+    path('api/jobs/<int:job_id>/', views.job_status_api, name='job_status_api'),
     
     # Búsqueda por QR/IMEI
     path('search/', views.search_phone, name='search_phone'),
-    path('api/phone/<str:identifier>/', views.phone_api, name='phone_api'),
+    path('api/phone/<str:identifier>/', lookup_views.phone_api, name='phone_api'),
+    path('api/phones/batch/', views.phone_batch_api, name='phone_batch_api'),
+    
+    # API de solo lectura con proyección de campos y cursores
+    path('api/phones/', views.resource_list_api, {'resource': 'phones'}, name='phone_list_api'),
+    path('api/sales/', views.resource_list_api, {'resource': 'sales'}, name='sale_list_api'),
+    path('api/customers/', views.resource_list_api, {'resource': 'customers'}, name='customer_list_api'),
+    path('api/changes/', lookup_views.changes_api, name='changes_api'),
+    path('events/', views.inventory_events, name='inventory_events'),
+    
+    # Auditorías de inventario (conteo físico)
+    path('api/audits/', views.audit_start_api, name='audit_start_api'),
+    path('api/audits/<int:audit_id>/', views.audit_api, name='audit_api'),
+    path('api/audits/<int:audit_id>/scan/', views.audit_scan_api, name='audit_scan_api'),
+    path('api/audits/<int:audit_id>/close/', views.audit_close_api, name='audit_close_api'),
     
     # Registro de usuarios (solo admin)
     path('register/', views.register_user, name='register_user'),
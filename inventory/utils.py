@@ -1,18 +1,14 @@
-import qrcode
 from io import BytesIO
-import base64
-from PIL import Image, ImageDraw, ImageFont
 from django.http import HttpResponse
 from django.template.loader import render_to_string
 from reportlab.pdfgen import canvas
 from reportlab.lib.pagesizes import letter, A4
 from reportlab.lib.units import mm
-from reportlab.graphics.shapes import Drawing
-from reportlab.graphics.barcode.qr import QrCodeWidget
-from reportlab.graphics.renderPDF import drawToString
-from reportlab.graphics import renderPDF
 import uuid
 
+from . import qr
+from .labels import DEFAULT_TEMPLATE, get_label_template
+
 
 class QRCodeGenerator:
     """
@@ -22,26 +18,17 @@ class QRCodeGenerator:
     @staticmethod
     def generate_qr_code(data, size=(200, 200)):
         """
-        Genera un código QR y lo retorna como imagen base64
+        Genera un código QR y lo retorna como imagen PNG base64 (escalada por
+        un factor entero, así que puede ser algo menor que ``size``)
         """
-        qr = qrcode.QRCode(
-            version=1,
-            error_correction=qrcode.constants.ERROR_CORRECT_L,
-            box_size=10,
-            border=4,
-        )
-        qr.add_data(data)
-        qr.make(fit=True)
-        
-        img = qr.make_image(fill_color="black", back_color="white")
-        img = img.resize(size, Image.Resampling.LANCZOS)
-        
-        # Convertir a base64
-        buffer = BytesIO()
-        img.save(buffer, format='PNG')
-        img_str = base64.b64encode(buffer.getvalue()).decode()
-        
-        return f"data:image/png;base64,{img_str}"
+        return qr.png_data_uri(data, min(size))
+    
+    @staticmethod
+    def generate_qr_svg(data, size=150):
+        """
+        Genera un código QR como SVG para insertar en el HTML
+        """
+        return qr.render_svg(data, size)
     
     @staticmethod
     def generate_phone_qr_data(phone):
@@ -61,6 +48,7 @@ class QRCodeGenerator:
 class LabelGenerator:
     """
     Utilidad para generar etiquetas imprimibles con códigos QR
+    (el diseño de cada tipo de etiqueta está en ``inventory/label_templates/``)
     """
     
     @staticmethod
@@ -68,106 +56,18 @@ class LabelGenerator:
         """
         Genera una etiqueta PDF para un celular
         """
-        buffer = BytesIO()
-        p = canvas.Canvas(buffer, pagesize=(60*mm, 40*mm))
-        
-        # Información del celular
-        p.setFont("Helvetica-Bold", 8)
-        p.drawString(5*mm, 35*mm, f"{phone.model.brand.name}")
-        p.drawString(5*mm, 32*mm, f"{phone.model.name}")
-        
-        p.setFont("Helvetica", 6)
-        p.drawString(5*mm, 28*mm, f"IMEI: {phone.imei}")
-        p.drawString(5*mm, 25*mm, f"${phone.price}")
-        
-        if phone.color:
-            p.drawString(5*mm, 22*mm, f"Color: {phone.color}")
-        
-        if phone.storage_capacity:
-            p.drawString(5*mm, 19*mm, f"{phone.storage_capacity}")
-        
-        # Código QR
-        qr_data = QRCodeGenerator.generate_phone_qr_data(phone)
-        qr_widget = QrCodeWidget(qr_data)
-        qr_widget.barWidth = 15*mm
-        qr_widget.barHeight = 15*mm
-        
-        drawing = Drawing(15*mm, 15*mm)
-        drawing.add(qr_widget)
-        
-        renderPDF.draw(drawing, p, 40*mm, 20*mm)
-        
-        p.showPage()
-        p.save()
-        
-        buffer.seek(0)
-        return buffer
+        return get_label_template('thermal').render([phone])
     
     @staticmethod
-    def generate_multiple_labels_pdf(phones):
+    def generate_multiple_labels_pdf(phones, template=DEFAULT_TEMPLATE):
         """
         Genera múltiples etiquetas en un PDF
         """
-        buffer = BytesIO()
-        p = canvas.Canvas(buffer, pagesize=A4)
-        
-        # Configuración de la página
-        labels_per_row = 3
-        labels_per_col = 7
-        label_width = 60*mm
-        label_height = 40*mm
-        margin_x = 15*mm
-        margin_y = 15*mm
-        
-        x_positions = [margin_x + i * (label_width + 5*mm) for i in range(labels_per_row)]
-        y_positions = [A4[1] - margin_y - (i + 1) * (label_height + 2*mm) for i in range(labels_per_col)]
-        
-        phone_index = 0
-        
-        for phone in phones:
-            if phone_index >= labels_per_row * labels_per_col:
-                p.showPage()
-                phone_index = 0
-            
-            row = phone_index // labels_per_row
-            col = phone_index % labels_per_row
-            
-            x = x_positions[col]
-            y = y_positions[row]
-            
-            # Dibujar borde de la etiqueta
-            p.rect(x, y, label_width, label_height)
-            
-            # Información del celular
-            p.setFont("Helvetica-Bold", 8)
-            p.drawString(x + 2*mm, y + label_height - 5*mm, f"{phone.model.brand.name}")
-            p.drawString(x + 2*mm, y + label_height - 8*mm, f"{phone.model.name}")
-            
-            p.setFont("Helvetica", 6)
-            p.drawString(x + 2*mm, y + label_height - 12*mm, f"IMEI: {phone.imei}")
-            p.drawString(x + 2*mm, y + label_height - 15*mm, f"${phone.price}")
-            
-            if phone.color:
-                p.drawString(x + 2*mm, y + label_height - 18*mm, f"Color: {phone.color}")
-            
-            # Código QR
-            qr_data = QRCodeGenerator.generate_phone_qr_data(phone)
-            qr_widget = QrCodeWidget(qr_data)
-            qr_widget.barWidth = 12*mm
-            qr_widget.barHeight = 12*mm
-            
-            drawing = Drawing(12*mm, 12*mm)
-            drawing.add(qr_widget)
-            
-            renderPDF.draw(drawing, p, x + label_width - 15*mm, y + 2*mm)
-            
-            phone_index += 1
-        
-        p.showPage()
-        p.save()
-        
-        buffer.seek(0)
-        return buffer
+        return get_label_template(template).render(phones)
+
+
+# Dígito -> suma de las cifras de su doble (Luhn)
+_LUHN_DOUBLED = {str(digit): digit * 2 - 9 * (digit > 4) for digit in range(10)}
 
 
 class IMEIValidator:
@@ -226,6 +126,15 @@ class IMEIValidator:
             'formatted': IMEIValidator.format_imei(imei)
         }
 
+    @staticmethod
+    def calculate_check_digit(body):
+        """
+        Dígito verificador Luhn para los primeros 14 dígitos de un IMEI
+        """
+        # Desde la derecha se duplican las posiciones pares (0, 2, ...)
+        total = sum(_LUHN_DOUBLED[digit] for digit in body[-1::-2]) + sum(map(int, body[-2::-2]))
+        return str(-total % 10)
+
 
 class SearchHelper:
     """
@@ -289,32 +198,68 @@ class SearchHelper:
     @staticmethod
     def search_phones_by_query(query):
         """
-        Busca celulares basado en una consulta
+        Busca celulares basado en una consulta. Los códigos (IMEI completo o
+        sus últimos dígitos, ID, QR) se buscan por índice con ``PhoneLookup``;
+        el texto libre (que también puede ser un código interno), en varias
+        columnas
         """
+        from .catalog import search_model_ids
+        from .identifiers import PhoneLookup
         from .models import Phone
         from django.db.models import Q
         
-        parsed = SearchHelper.parse_search_query(query)
+        lookup = PhoneLookup(query)
         
-        if parsed['type'] == 'imei':
-            return Phone.objects.filter(imei=parsed['value'])
+        if lookup.kind not in ('text', 'internal_code'):
+            return Phone.objects.filter(lookup.get_filter())
         
-        elif parsed['type'] == 'uuid':
-            return Phone.objects.filter(id=parsed['value'])
-        
-        elif parsed['type'] == 'qr_phone':
-            return Phone.objects.filter(id=parsed['value'])
+        text = (
+            Q(imei__icontains=query) |
+            Q(model_id__in=search_model_ids(query)) |
+            Q(color__icontains=query) |
+            Q(storage_capacity__icontains=query)
+        )
+        if lookup.kind == 'internal_code':
+            text |= lookup.get_filter()
+        return Phone.objects.filter(text)
+    
+    @staticmethod
+    def resolve_phone_codes(codes, queryset=None):
+        """
+        Resuelve un lote de códigos (IMEI, UUID o QR ``PHONE:``) a celulares.
         
-        elif parsed['type'] == 'text':
-            return Phone.objects.filter(
-                Q(imei__icontains=query) |
-                Q(model__name__icontains=query) |
-                Q(model__brand__name__icontains=query) |
-                Q(color__icontains=query) |
-                Q(storage_capacity__icontains=query)
-            )
+        Usa a lo sumo dos consultas ``IN`` (por IMEI y por ID) sin importar el
+        tamaño del lote. Retorna un diccionario código -> celular, con ``None``
+        para los códigos que no se encontraron o no son de celular.
+        """
+        from .models import Phone
         
-        return Phone.objects.none()
+        if queryset is None:
+            queryset = Phone.objects.all()
+        
+        by_imei = {}
+        by_id = {}
+        for code in codes:
+            parsed = SearchHelper.parse_search_query(code)
+            if parsed['type'] == 'imei':
+                by_imei.setdefault(parsed['value'], []).append(code)
+            elif parsed['type'] in ('uuid', 'qr_phone'):
+                try:
+                    phone_id = uuid.UUID(parsed['value'])
+                except ValueError:
+                    continue
+                by_id.setdefault(phone_id, []).append(code)
+        
+        results = dict.fromkeys(codes)
+        if by_imei:
+            for phone in queryset.filter(imei__in=list(by_imei)):
+                for code in by_imei[phone.imei]:
+                    results[code] = phone
+        if by_id:
+            for phone in queryset.filter(id__in=list(by_id)):
+                for code in by_id[phone.id]:
+                    results[code] = phone
+        return results
 
 
 class ReportGenerator:
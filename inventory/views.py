@@ -1,20 +1,43 @@
 from django.shortcuts import render, get_object_or_404, redirect
+from django.conf import settings
+from django.core.exceptions import ValidationError
 from django.contrib.auth.decorators import login_required, user_passes_test
 from django.contrib import messages
-from django.http import JsonResponse, HttpResponseForbidden
-from django.db.models import Q, Count, Sum, Avg
+from django.http import (
+    HttpResponse, JsonResponse, HttpResponseForbidden, StreamingHttpResponse, FileResponse, Http404
+)
+from django.core.handlers.asgi import ASGIRequest
+from asgiref.sync import sync_to_async
+from django.db.models import Q, Count, Sum, Avg, Max
 from django.utils import timezone
+from django.utils.dateparse import parse_datetime
 from django.urls import reverse
-from django.core.paginator import Paginator
 from datetime import datetime, timedelta
 import json
+import os
 
-from .models import Phone, PhoneModel, Brand, Sale, Customer, PhoneComment, CustomUser
+from .models import (
+    Phone, PhoneModel, Brand, Sale, Customer, PhoneComment, CustomUser, InventoryAudit, BackgroundJob
+)
 from .forms import (
     PhoneForm, PhoneCommentForm, SaleForm, CustomerForm, 
     PhoneSearchForm, CustomUserCreationForm, PhoneModelForm
 )
-from .services import InventoryService, SalesService, ReportService
+from .services import InventoryService, SalesService, ReportService, ChangeFeedService
+from .catalog import model_order, with_catalog
+from .conditional import conditional_page
+from .serializers import PhoneSerializer
+from .audit import AuditService
+from .api import API_RESOURCES, ApiError
+from .export import InventoryExporter
+from .jobs import JobQueue
+from .db import retry_on_locked
+from .pagination import EstimatedCountPaginator
+from .routers import get_reporting_alias
+from .labels import DEFAULT_TEMPLATE, get_label_template_choices
+from .events import stream_events
+from .identifiers import PhoneLookup
+from .utils import SearchHelper
 
 
 def is_admin(user):
@@ -41,8 +64,10 @@ def home(request):
         sale_date__gte=current_month
     ).aggregate(total=Sum('sale_price'))['total'] or 0
     # Últimas actividades
-    recent_phones = Phone.objects.select_related('model__brand', 'added_by').order_by('-created_at')[:5]
-    recent_sales = Sale.objects.select_related('phone__model__brand', 'customer', 'sold_by').order_by('-sale_date')[:5]
+    recent_phones = with_catalog(Phone.objects.select_related('added_by')).order_by('-created_at')[:5]
+    recent_sales = with_catalog(
+        Sale.objects.select_related('phone', 'customer', 'sold_by'), 'phone__model'
+    ).order_by('-sale_date')[:5]
     context = {
         'total_phones': total_phones,
         'available_phones': available_phones,
@@ -56,30 +81,32 @@ def home(request):
     return render(request, 'inventory/home.html', context)
 
 
-@login_required
-def inventory_list(request):
+def _phone_list_queryset(request, condition=None):
     """
-    Lista de celulares en inventario con filtros y búsqueda
+    Arma el formulario de búsqueda y el queryset filtrado de las listas de inventario
     """
     form = PhoneSearchForm(request.GET)
-    phones = Phone.objects.select_related('model__brand', 'added_by').exclude(status='sold').order_by('-created_at')
-    # Aplicar filtros
+    phones = with_catalog(Phone.objects.select_related('added_by')).exclude(status='sold')
+    if condition:
+        phones = phones.filter(condition=condition)
+    # Si la lista ya está filtrada por condición, se ignora la del formulario
     if form.is_valid():
-        search = form.cleaned_data.get('search')
-        status = form.cleaned_data.get('status')
-        condition = form.cleaned_data.get('condition')
-        if search:
-            phones = phones.filter(
-                Q(imei__icontains=search) |
-                Q(model__name__icontains=search) |
-                Q(model__brand__name__icontains=search) |
-                Q(color__icontains=search)
-            )
-        if status:
-            phones = phones.filter(status=status)
-        if condition:
-            phones = phones.filter(condition=condition)
-    paginator = Paginator(phones, 20)
+        phones = InventoryService.filter_phones(
+            phones, form.cleaned_data, include_condition=condition is None
+        )
+    return form, phones.order_by('-created_at')
+
+
+def _phone_list_state(request, condition=None):
+    """Estado de una lista de inventario para el GET condicional"""
+    form, phones = _phone_list_queryset(request, condition)
+    state = phones.aggregate(last_modified=Max('updated_at'), count=Count('id'))
+    return state['last_modified'], state['count']
+
+
+def _render_phone_list(request, condition=None, inventory_type=None):
+    form, phones = _phone_list_queryset(request, condition)
+    paginator = EstimatedCountPaginator(phones, 20)
     page_number = request.GET.get('page')
     page_obj = paginator.get_page(page_number)
     context = {
@@ -87,108 +114,36 @@ def inventory_list(request):
         'page_obj': page_obj,
         'phones': page_obj,
     }
+    if inventory_type:
+        context['inventory_type'] = inventory_type
     return render(request, 'inventory/inventory_list.html', context)
+
+
 @login_required
+@conditional_page(lambda request: _phone_list_state(request))
+def inventory_list(request):
+    """
+    Lista de celulares en inventario con filtros y búsqueda
+    """
+    return _render_phone_list(request)
+
+
+@login_required
+@conditional_page(lambda request: _phone_list_state(request, 'new'))
 def inventory_new_list(request):
     """
     Lista de celulares NUEVOS en inventario
     """
-    form = PhoneSearchForm(request.GET)
-    phones = Phone.objects.select_related('model__brand', 'added_by').filter(condition='new').exclude(status='sold').order_by('-created_at')
-    # Aplicar filtros de búsqueda (excepto condición, ya filtrado)
-    if form.is_valid():
-        search = form.cleaned_data.get('search')
-        status = form.cleaned_data.get('status')
-        if search:
-            phones = phones.filter(
-                Q(imei__icontains=search) |
-                Q(model__name__icontains=search) |
-                Q(model__brand__name__icontains=search) |
-                Q(color__icontains=search)
-            )
-        if status:
-            phones = phones.filter(status=status)
-    paginator = Paginator(phones, 20)
-    page_number = request.GET.get('page')
-    page_obj = paginator.get_page(page_number)
-    context = {
-        'form': form,
-        'page_obj': page_obj,
-        'phones': page_obj,
-        'inventory_type': 'Nuevos',
-    }
-    return render(request, 'inventory/inventory_list.html', context)
+    return _render_phone_list(request, 'new', 'Nuevos')
+
 
 @login_required
+@conditional_page(lambda request: _phone_list_state(request, 'used'))
 def inventory_used_list(request):
     """
     Lista de celulares USADOS en inventario
     """
-    form = PhoneSearchForm(request.GET)
-    phones = Phone.objects.select_related('model__brand', 'added_by').filter(
-        condition='used'
-    ).exclude(status='sold').order_by('-created_at')
-    # Aplicar filtros de búsqueda (excepto condición, ya filtrado)
-    if form.is_valid():
-        search = form.cleaned_data.get('search')
-        status = form.cleaned_data.get('status')
-        if search:
-            phones = phones.filter(
-                Q(imei__icontains=search) |
-                Q(model__name__icontains=search) |
-                Q(model__brand__name__icontains=search) |
-                Q(color__icontains=search)
-            )
-        if status:
-            phones = phones.filter(status=status)
-    paginator = Paginator(phones, 20)
-    page_number = request.GET.get('page')
-    page_obj = paginator.get_page(page_number)
-    context = {
-        'form': form,
-        'page_obj': page_obj,
-        'phones': page_obj,
-        'inventory_type': 'Usados',
-    }
-    return render(request, 'inventory/inventory_list.html', context)
-    """
-    Lista de celulares en inventario con filtros y búsqueda
-    """
-    form = PhoneSearchForm(request.GET)
-    phones = Phone.objects.select_related('model__brand', 'added_by').order_by('-created_at')
-    
-    # Aplicar filtros
-    if form.is_valid():
-        search = form.cleaned_data.get('search')
-        status = form.cleaned_data.get('status')
-        condition = form.cleaned_data.get('condition')
-        
-        if search:
-            phones = phones.filter(
-                Q(imei__icontains=search) |
-                Q(model__name__icontains=search) |
-                Q(model__brand__name__icontains=search) |
-                Q(color__icontains=search)
-            )
-        
-        if status:
-            phones = phones.filter(status=status)
-        
-        if condition:
-            phones = phones.filter(condition=condition)
-    
-    # Paginación
-    paginator = Paginator(phones, 20)
-    page_number = request.GET.get('page')
-    page_obj = paginator.get_page(page_number)
-    
-    context = {
-        'form': form,
-        'page_obj': page_obj,
-        'phones': page_obj,
-    }
-    
-    return render(request, 'inventory/inventory_list.html', context)
+    return _render_phone_list(request, 'used', 'Usados')
 
 
 @login_required
@@ -232,12 +187,28 @@ def add_phone(request):
     return render(request, 'inventory/add_phone.html', {'form': form})
 
 
+def _phone_detail_state(request, phone_id):
+    """Estado del detalle de un celular: el celular, su venta y sus comentarios"""
+    state = Phone.objects.filter(id=phone_id).annotate(
+        last_comment=Max('comments__created_at'),
+        comment_count=Count('comments'),
+    ).values('updated_at', 'sale__updated_at', 'last_comment', 'comment_count').first()
+    if state is None:
+        return None
+    last_modified = max(
+        value for value in (state['updated_at'], state['sale__updated_at'], state['last_comment'])
+        if value is not None
+    )
+    return last_modified, state['comment_count']
+
+
 @login_required
+@conditional_page(_phone_detail_state)
 def phone_detail(request, phone_id):
     """
     Detalle de un celular específico
     """
-    phone = get_object_or_404(Phone, id=phone_id)
+    phone = get_object_or_404(with_catalog(Phone.objects), id=phone_id)
     comments = phone.comments.select_related('user').order_by('-created_at')
     
     # Verificar si tiene venta asociada
@@ -312,17 +283,32 @@ def add_comment(request, phone_id):
     return redirect('phone_detail', phone_id=phone.id)
 
 
+def _sales_list_state(request):
+    """Estado de la lista de ventas para el GET condicional"""
+    state = Sale.objects.aggregate(
+        last_sale=Max('updated_at'),
+        last_phone=Max('phone__updated_at'),
+        last_customer=Max('customer__updated_at'),
+        count=Count('id'),
+    )
+    if not state['count']:
+        return None
+    last_modified = max(state['last_sale'], state['last_phone'], state['last_customer'])
+    return last_modified, state['count']
+
+
 @login_required
+@conditional_page(_sales_list_state)
 def sales_list(request):
     """
     Lista de ventas
     """
-    sales = Sale.objects.select_related(
-        'phone__model__brand', 'customer', 'sold_by'
+    sales = with_catalog(
+        Sale.objects.select_related('phone', 'customer', 'sold_by'), 'phone__model'
     ).order_by('-sale_date')
     
     # Paginación
-    paginator = Paginator(sales, 20)
+    paginator = EstimatedCountPaginator(sales, 20)
     page_number = request.GET.get('page')
     page_obj = paginator.get_page(page_number)
     
@@ -474,7 +460,16 @@ def add_sale(request, phone_id):
                     monto = payment_detail_form.cleaned_data.get('monto_pesos')
                     cotiz = payment_detail_form.cleaned_data.get('cotizacion')
                     sale.notes = (sale.notes or '') + f"\nPago mixto, pesos: ${monto} (Cotización USD: {cotiz})"
-            sale.save()
+
+            @retry_on_locked
+            def save_sale():
+                # Celular y venta en una sola transacción; el estado se vuelve
+                # a asignar en cada intento porque un intento revertido ya lo
+                # dejó en 'sold' en memoria
+                phone.status = 'sold'
+                phone.save()
+                sale.save()
+            save_sale()
             if errors:
                 for e in errors:
                     messages.warning(request, e)
@@ -504,12 +499,23 @@ def add_sale(request, phone_id):
     })
 
 
+def _sale_detail_state(request, sale_id):
+    """Estado del detalle de una venta: la venta, el celular y el cliente"""
+    state = Sale.objects.filter(id=sale_id).values(
+        'updated_at', 'phone__updated_at', 'customer__updated_at'
+    ).first()
+    if state is None:
+        return None
+    return max(state.values()), None
+
+
 @login_required
+@conditional_page(_sale_detail_state)
 def sale_detail(request, sale_id):
     """
     Detalle de una venta
     """
-    sale = get_object_or_404(Sale, id=sale_id)
+    sale = get_object_or_404(with_catalog(Sale.objects.select_related('phone'), 'phone__model'), id=sale_id)
     payments = []
     payments_total_usd = None
     notes_display = sale.notes or ''
@@ -570,7 +576,7 @@ def customer_list(request):
     ).order_by('-created_at')
     
     # Paginación
-    paginator = Paginator(customers, 20)
+    paginator = EstimatedCountPaginator(customers, 20)
     page_number = request.GET.get('page')
     page_obj = paginator.get_page(page_number)
     
@@ -614,7 +620,7 @@ def customer_detail(request, customer_id):
     Detalle de un cliente
     """
     customer = get_object_or_404(Customer, id=customer_id)
-    sales = customer.sale_set.select_related('phone__model__brand').order_by('-sale_date')
+    sales = with_catalog(customer.sale_set.select_related('phone'), 'phone__model').order_by('-sale_date')
     
     return render(request, 'inventory/customer_detail.html', {
         'customer': customer,
@@ -628,21 +634,11 @@ def reports(request):
     """
     Reportes del sistema (solo administradores)
     """
-    # Usar el servicio de reportes
-    report_service = ReportService()
-    
-    # Reportes básicos
-    inventory_stats = report_service.get_inventory_stats()
-    sales_stats = report_service.get_sales_stats()
-    monthly_revenue = report_service.get_monthly_revenue()
-    top_models = report_service.get_top_selling_models()
-    
-    context = {
-        'inventory_stats': inventory_stats,
-        'sales_stats': sales_stats,
-        'monthly_revenue': monthly_revenue,
-        'top_models': top_models,
-    }
+    # Las secciones se calculan en paralelo; si alguna falla se muestra el
+    # último resultado disponible
+    context, failed = ReportService.build_report()
+    if failed:
+        messages.warning(request, 'Algunas secciones del reporte no están actualizadas.')
     
     return render(request, 'inventory/reports.html', context)
 
@@ -650,57 +646,91 @@ def reports(request):
 @login_required
 def search_phone(request):
     """
-    Búsqueda rápida de celulares por IMEI o código QR
+    Búsqueda rápida de celulares por IMEI (o sus últimos dígitos), código
+    interno o código QR
     """
     query = request.GET.get('q', '').strip()
     phone = None
+    matches = []
     
     if query:
-        # Buscar por IMEI o ID
-        try:
-            if len(query) == 15 and query.isdigit():
-                # Buscar por IMEI
-                phone = Phone.objects.select_related('model__brand').get(imei=query)
-            else:
-                # Buscar por ID (UUID)
-                phone = Phone.objects.select_related('model__brand').get(id=query)
-        except Phone.DoesNotExist:
+        phones = PhoneLookup(query).resolve(with_catalog(Phone.objects))
+        if len(phones) == 1:
+            phone = phones[0]
+        elif phones:
+            # Unos últimos dígitos que comparten varios IMEI
+            matches = phones
+        else:
             messages.error(request, f'No se encontró ningún celular con el código: {query}')
     
     return render(request, 'inventory/search_phone.html', {
         'phone': phone,
+        'matches': matches,
         'query': query
     })
 
 
+def _phone_api_state(request, identifier):
+    """Estado del celular consultado por la API (si el código es de uno solo)"""
+    phones = PhoneLookup(identifier).resolve(Phone.objects.only('id', 'updated_at', 'internal_code'))
+    if len(phones) != 1:
+        return None
+    return phones[0].updated_at, str(phones[0].id)
+
+
 @login_required
+@conditional_page(_phone_api_state)
 def phone_api(request, identifier):
     """
-    API para obtener información de un celular por IMEI o ID
+    API para obtener información de un celular por IMEI (o sus últimos
+    dígitos), código interno, ID o código QR
+    """
+    phones = PhoneLookup(identifier).resolve(PhoneSerializer.get_queryset(Phone.objects.all()))
+    data, status = PhoneSerializer.lookup_result(phones)
+    return JsonResponse(data, status=status)
+
+
+@login_required
+def phone_batch_api(request):
+    """
+    API para resolver un lote de códigos escaneados (IMEI, ID o QR) en una
+    sola petición. Recibe JSON ``{"codes": [...]}`` por POST.
     """
+    if request.method != 'POST':
+        return JsonResponse({'error': 'Método no permitido'}, status=405)
+    
     try:
-        if len(identifier) == 15 and identifier.isdigit():
-            phone = Phone.objects.select_related('model__brand').get(imei=identifier)
+        data = json.loads(request.body)
+    except json.JSONDecodeError:
+        return JsonResponse({'error': 'JSON inválido'}, status=400)
+    
+    codes = data.get('codes') if isinstance(data, dict) else None
+    if not isinstance(codes, list) or not all(isinstance(code, str) for code in codes):
+        return JsonResponse({'error': 'Se espera una lista de códigos en "codes"'}, status=400)
+    
+    limit = getattr(settings, 'PHONE_BATCH_LOOKUP_LIMIT', 500)
+    if len(codes) > limit:
+        return JsonResponse({'error': f'Máximo {limit} códigos por petición'}, status=400)
+    
+    codes = [code.strip() for code in codes if code.strip()]
+    resolved = SearchHelper.resolve_phone_codes(
+        codes, PhoneSerializer.get_queryset(Phone.objects.all())
+    )
+    
+    results = {}
+    found = 0
+    for code, phone in resolved.items():
+        if phone is None:
+            results[code] = {'error': 'Celular no encontrado'}
         else:
-            phone = Phone.objects.select_related('model__brand').get(id=identifier)
-        
-        data = {
-            'id': str(phone.id),
-            'model': str(phone.model),
-            'imei': phone.imei,
-            'status': phone.get_status_display(),
-            'condition': phone.get_condition_display(),
-            'price': str(phone.price),
-            'color': phone.color,
-            'storage_capacity': phone.storage_capacity,
-            'added_by': phone.added_by.get_full_name() if phone.added_by else '',
-            'created_at': phone.created_at.strftime('%d/%m/%Y %H:%M'),
-        }
-        
-        return JsonResponse(data)
+            results[code] = PhoneSerializer.to_dict(phone)
+            found += 1
     
-    except Phone.DoesNotExist:
-        return JsonResponse({'error': 'Celular no encontrado'}, status=404)
+    return JsonResponse({
+        'results': results,
+        'found': found,
+        'not_found': len(results) - found,
+    })
 
 
 @login_required
@@ -733,7 +763,7 @@ def update_phone_status(request, phone_id):
             phone = get_object_or_404(Phone, id=phone_id)
             if new_status in dict(phone.STATUS_CHOICES):
                 phone.status = new_status
-                phone.save(update_fields=['status'])
+                phone.save(update_fields=['status', 'updated_at'])
                 return JsonResponse({'success': True, 'new_status': new_status})
             else:
                 return JsonResponse({'success': False, 'error': 'Estado inválido'})
@@ -786,3 +816,312 @@ def search_customers(request):
             return JsonResponse({'results': results})
     
     return JsonResponse({'results': []})
+
+
+@login_required
+def resource_list_api(request, resource):
+    """
+    API paginada de solo lectura (celulares, ventas o clientes).
+    Parámetros: ``fields`` (lista separada por comas), ``limit``, ``cursor``
+    y los filtros propios de cada recurso.
+    """
+    api_resource = API_RESOURCES[resource]
+    max_limit = getattr(settings, 'API_MAX_PAGE_SIZE', 10000)
+    try:
+        limit = int(request.GET.get('limit', 100))
+    except ValueError:
+        return JsonResponse({'error': 'Límite inválido'}, status=400)
+    if not 1 <= limit <= max_limit:
+        return JsonResponse({'error': f'El límite debe estar entre 1 y {max_limit}'}, status=400)
+    
+    try:
+        fields, results, next_cursor = api_resource.page(request.GET, limit)
+    except ApiError as e:
+        return JsonResponse({'error': str(e)}, status=400)
+    
+    return JsonResponse({
+        'fields': fields,
+        'results': results,
+        'next_cursor': next_cursor,
+    })
+
+
+@login_required
+@user_passes_test(is_admin)
+def export_inventory(request):
+    """
+    Exportación NDJSON en streaming de todos los celulares (solo administradores).
+    Con ``since`` (fecha ISO 8601) solo se exportan los modificados desde entonces.
+    """
+    since = request.GET.get('since')
+    if since:
+        since = parse_datetime(since)
+        if since is None:
+            return JsonResponse({'error': 'Fecha "since" inválida'}, status=400)
+        if timezone.is_naive(since):
+            since = timezone.make_aware(since)
+    
+    response = StreamingHttpResponse(
+        InventoryExporter.iter_ndjson(since or None, using=get_reporting_alias()),
+        content_type='application/x-ndjson; charset=utf-8'
+    )
+    response['Content-Disposition'] = 'attachment; filename="inventario.ndjson"'
+    return response
+
+
+@login_required
+def print_labels(request):
+    """
+    Selección de celulares para imprimir etiquetas. El PDF se genera en
+    segundo plano y se descarga desde la página del trabajo.
+    """
+    if request.method == 'POST':
+        phone_ids = request.POST.getlist('selected_phones')
+        if not phone_ids:
+            messages.error(request, 'Seleccioná al menos un celular.')
+            return redirect('print_labels')
+        try:
+            phone_ids = [str(Phone._meta.pk.to_python(phone_id)) for phone_id in phone_ids]
+        except ValidationError:
+            messages.error(request, 'Selección inválida.')
+            return redirect('print_labels')
+        
+        label_type = request.POST.get('label_type', DEFAULT_TEMPLATE)
+        if label_type not in dict(get_label_template_choices()):
+            messages.error(request, 'Tipo de etiqueta inválido.')
+            return redirect('print_labels')
+        
+        job = JobQueue.enqueue('phone_labels', {
+            'phone_ids': phone_ids,
+            'label_type': label_type,
+            'using': get_reporting_alias(),
+        }, request.user)
+        return redirect('job_detail', job_id=job.id)
+    
+    phones = with_catalog(Phone.objects.exclude(status='sold')).order_by(model_order())
+    return render(request, 'inventory/print_labels.html', {
+        'phones': phones,
+        'label_templates': get_label_template_choices(),
+    })
+
+
+# Trabajos que los administradores pueden pedir desde la página de reportes
+REPORT_JOB_KINDS = ('inventory_report', 'sales_report', 'inventory_export')
+
+
+@login_required
+@user_passes_test(is_admin)
+def report_job(request, kind):
+    """
+    Encola la generación de un reporte PDF o de la exportación completa
+    """
+    if request.method != 'POST':
+        return redirect('reports')
+    if kind not in REPORT_JOB_KINDS:
+        raise Http404
+    
+    # Se decide acá: al encolar la petición escribe y queda fijada a default
+    params = {'using': get_reporting_alias()}
+    if request.POST.get('status') in dict(Phone.STATUS_CHOICES):
+        params['status'] = request.POST['status']
+    if request.POST.get('days', '').isdigit():
+        params['days'] = int(request.POST['days'])
+    
+    job = JobQueue.enqueue(kind, params, request.user)
+    return redirect('job_detail', job_id=job.id)
+
+
+def _get_user_job(request, job_id):
+    """Trabajo del usuario (los administradores ven todos)"""
+    jobs = BackgroundJob.objects.all()
+    if not is_admin(request.user):
+        jobs = jobs.filter(created_by=request.user)
+    return get_object_or_404(jobs, id=job_id)
+
+
+@login_required
+def job_detail(request, job_id):
+    """
+    Página de espera de un trabajo: consulta el estado hasta que termina
+    """
+    job = _get_user_job(request, job_id)
+    return render(request, 'inventory/job_detail.html', {'job': job})
+
+
+@login_required
+def job_status_api(request, job_id):
+    """
+    Estado y progreso de un trabajo en segundo plano
+    """
+    job = _get_user_job(request, job_id)
+    return JsonResponse({
+        'id': job.id,
+        'kind': job.kind,
+        'status': job.status,
+        'status_display': job.get_status_display(),
+        'progress': job.progress,
+        'attempts': job.attempts,
+        'download_url': reverse('job_download', args=[job.id]) if job.status == 'done' and job.result else None,
+        'expires_at': job.expires_at,
+    })
+
+
+@login_required
+def job_download(request, job_id):
+    """
+    Descarga el archivo generado por un trabajo terminado
+    """
+    job = _get_user_job(request, job_id)
+    if job.status != 'done' or not job.result:
+        raise Http404
+    try:
+        result = job.result.open('rb')
+    except FileNotFoundError:
+        raise Http404
+    return FileResponse(result, as_attachment=True, filename=os.path.basename(job.result.name))
+
+
+@login_required
+def changes_api(request):
+    """
+    Feed de cambios de celulares, ventas y clientes posteriores a ``after``.
+    Con ``wait`` (segundos) la petición espera hasta que haya cambios nuevos.
+    Avanzando con ``next`` no se pierde ningún cambio; los más recientes se
+    entregan después de ``CHANGE_FEED_LAG`` segundos (ver
+    ``ChangeFeedService.get_queryset``).
+    """
+    try:
+        after = int(request.GET.get('after', 0))
+        limit = int(request.GET.get('limit', 500))
+        wait = int(request.GET.get('wait', 0))
+    except ValueError:
+        return JsonResponse({'error': 'Parámetros inválidos'}, status=400)
+    
+    limit = max(1, min(limit, 1000))
+    wait = max(0, min(wait, getattr(settings, 'CHANGE_FEED_MAX_WAIT', 25)))
+    changes = ChangeFeedService.wait_for_changes(after, limit, timeout=wait)
+    
+    return JsonResponse({
+        'changes': [
+            {
+                'seq': change['id'],
+                'model': change['model'],
+                'id': change['object_id'],
+                'action': change['action'],
+                'changed_at': change['changed_at'],
+            }
+            for change in changes
+        ],
+        'next': changes[-1]['id'] if changes else after,
+    })
+
+
+async def inventory_events(request):
+    """
+    Canal de eventos en vivo (server-sent events) con cambios de estado de
+    celulares y ventas. Requiere el despliegue ASGI.
+    """
+    if not isinstance(request, ASGIRequest):
+        return HttpResponse('Los eventos en vivo requieren el servidor ASGI.', status=501)
+    
+    is_authenticated = await sync_to_async(lambda: request.user.is_authenticated)()
+    if not is_authenticated:
+        return HttpResponseForbidden()
+    
+    response = StreamingHttpResponse(
+        stream_events(
+            max_seconds=getattr(settings, 'SSE_MAX_STREAM_SECONDS', 300),
+            heartbeat=getattr(settings, 'SSE_HEARTBEAT_SECONDS', 15),
+        ),
+        content_type='text/event-stream'
+    )
+    response['Cache-Control'] = 'no-cache'
+    response['X-Accel-Buffering'] = 'no'
+    return response
+
+
+def _get_open_audit(audit_id):
+    """Auditoría abierta sin cargar la foto de esperados (solo se usa al reconstruir)"""
+    return get_object_or_404(
+        InventoryAudit.objects.defer('expected', 'report'), id=audit_id, status='open'
+    )
+
+
+@login_required
+def audit_start_api(request):
+    """
+    Abre una auditoría de inventario. Recibe JSON opcional
+    ``{"status": "...", "condition": "..."}`` para limitar el alcance.
+    """
+    if request.method != 'POST':
+        return JsonResponse({'error': 'Método no permitido'}, status=405)
+    
+    try:
+        data = json.loads(request.body or '{}')
+    except json.JSONDecodeError:
+        return JsonResponse({'error': 'JSON inválido'}, status=400)
+    
+    status = data.get('status') or ''
+    condition = data.get('condition') or ''
+    if status and status not in dict(Phone.STATUS_CHOICES):
+        return JsonResponse({'error': 'Estado inválido'}, status=400)
+    if condition and condition not in dict(Phone.CONDITION_CHOICES):
+        return JsonResponse({'error': 'Condición inválida'}, status=400)
+    
+    audit = AuditService.start_audit(request.user, status, condition)
+    return JsonResponse({
+        'id': audit.id,
+        'expected': audit.expected_count,
+    }, status=201)
+
+
+@login_required
+def audit_api(request, audit_id):
+    """
+    Totales parciales de una auditoría abierta
+    """
+    audit = _get_open_audit(audit_id)
+    return JsonResponse({'id': audit.id, 'tallies': AuditService.get_tallies(audit)})
+
+
+@login_required
+def audit_scan_api(request, audit_id):
+    """
+    Registra un lote de códigos escaneados (JSON ``{"codes": [...]}``)
+    """
+    if request.method != 'POST':
+        return JsonResponse({'error': 'Método no permitido'}, status=405)
+    
+    audit = _get_open_audit(audit_id)
+    try:
+        data = json.loads(request.body)
+    except json.JSONDecodeError:
+        return JsonResponse({'error': 'JSON inválido'}, status=400)
+    
+    codes = data.get('codes') if isinstance(data, dict) else None
+    if not isinstance(codes, list) or not all(isinstance(code, str) for code in codes):
+        return JsonResponse({'error': 'Se espera una lista de códigos en "codes"'}, status=400)
+    
+    limit = getattr(settings, 'AUDIT_SCAN_BATCH_LIMIT', 1000)
+    if len(codes) > limit:
+        return JsonResponse({'error': f'Máximo {limit} códigos por lote'}, status=400)
+    
+    codes = [code.strip() for code in codes if code.strip()]
+    results, tallies = AuditService.scan_batch(audit, codes, request.user)
+    return JsonResponse({'results': results, 'tallies': tallies})
+
+
+@login_required
+def audit_close_api(request, audit_id):
+    """
+    Cierra una auditoría y retorna el reporte de diferencias (solo quien la
+    abrió o un administrador)
+    """
+    if request.method != 'POST':
+        return JsonResponse({'error': 'Método no permitido'}, status=405)
+    
+    audit = _get_open_audit(audit_id)
+    if audit.started_by_id != request.user.pk and not is_admin(request.user):
+        return JsonResponse({'error': 'Solo quien abrió la auditoría o un administrador puede cerrarla'}, status=403)
+    report = AuditService.close_audit(audit)
+    return JsonResponse({'id': audit.id, 'report': report})
@@ -0,0 +1,18 @@
+"""
+ASGI config for tienda_celulares project.
+
+Necesario para el canal de eventos en vivo (SSE), que mantiene conexiones
+abiertas sin ocupar un worker por cliente. También activa las versiones
+asíncronas de las búsquedas, APIs JSON y reportes (inventory/async_views.py).
+Ejemplo:
+    uvicorn tienda_celulares.asgi:application
+"""
+
+import os
+
+from django.core.asgi import get_asgi_application
+
+os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'tienda_celulares.settings')
+os.environ.setdefault('DJANGO_ASYNC_VIEWS', '1')
+
+application = get_asgi_application()
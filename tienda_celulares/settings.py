@@ -33,6 +33,7 @@ MIDDLEWARE = [
     'django.middleware.common.CommonMiddleware',
     'django.middleware.csrf.CsrfViewMiddleware',
     'django.contrib.auth.middleware.AuthenticationMiddleware',
+    'inventory.middleware.ReadYourWritesMiddleware',
     'django.contrib.messages.middleware.MessageMiddleware',
     'django.middleware.clickjacking.XFrameOptionsMiddleware',
 ]
@@ -57,14 +58,37 @@ TEMPLATES = [
 ]
 
 WSGI_APPLICATION = 'tienda_celulares.wsgi.application'
+ASGI_APPLICATION = 'tienda_celulares.asgi.application'
+
+# Vistas asíncronas para búsquedas, APIs JSON y reportes (las activa asgi.py)
+ASYNC_VIEWS = os.environ.get('DJANGO_ASYNC_VIEWS') == '1'
 
 # Database
-DATABASES = {
-    'default': {
-        'ENGINE': 'django.db.backends.sqlite3',
-        'NAME': BASE_DIR / 'db.sqlite3',
+# SQLite por defecto; con DJANGO_DB_ENGINE=postgresql se usan las variables
+# DJANGO_DB_NAME, DJANGO_DB_USER, DJANGO_DB_PASSWORD, DJANGO_DB_HOST y
+# DJANGO_DB_PORT (requiere instalar psycopg)
+if os.environ.get('DJANGO_DB_ENGINE') == 'postgresql':
+    DATABASES = {
+        'default': {
+            'ENGINE': 'django.db.backends.postgresql',
+            'NAME': os.environ.get('DJANGO_DB_NAME', 'tienda_celulares'),
+            'USER': os.environ.get('DJANGO_DB_USER', ''),
+            'PASSWORD': os.environ.get('DJANGO_DB_PASSWORD', ''),
+            'HOST': os.environ.get('DJANGO_DB_HOST', ''),
+            'PORT': os.environ.get('DJANGO_DB_PORT', ''),
+        }
+    }
+else:
+    DATABASES = {
+        'default': {
+            'ENGINE': 'django.db.backends.sqlite3',
+            'NAME': BASE_DIR / 'db.sqlite3',
+        }
     }
-}
+
+# Reportes y exportaciones leen del alias "reporting" si está definido
+# (ver inventory/routers.py)
+DATABASE_ROUTERS = ['inventory.routers.ReportingRouter']
 
 # Password validation
 AUTH_PASSWORD_VALIDATORS = [
@@ -98,6 +122,10 @@ STATICFILES_DIRS = [
 MEDIA_URL = '/media/'
 MEDIA_ROOT = BASE_DIR / 'media'
 
+# Resultados de los trabajos en segundo plano (reportes, exportaciones):
+# fuera de MEDIA_ROOT, solo se descargan desde la aplicación
+JOB_RESULTS_ROOT = Path(os.environ.get('DJANGO_JOB_RESULTS_ROOT', BASE_DIR / 'job_results'))
+
 # Default primary key field type
 DEFAULT_AUTO_FIELD = 'django.db.models.BigAutoField'
 
@@ -108,3 +136,11 @@ LOGOUT_REDIRECT_URL = '/'
 
 # Custom user model
 AUTH_USER_MODEL = 'inventory.CustomUser'
+
+# Usuario de la sesión en caché (ver inventory/auth.py)
+AUTHENTICATION_BACKENDS = ['inventory.auth.CachedModelBackend']
+
+# Sesiones: "cached_db" lee de la caché y solo escribe en la base al
+# modificarse; "signed_cookies" no usa la base en absoluto (los datos viajan
+# firmados en la cookie)
+SESSION_ENGINE = os.environ.get('DJANGO_SESSION_ENGINE', 'django.contrib.sessions.backends.cached_db')
@@ -0,0 +1,149 @@
+"""
+Perfil de producción. Usar con
+``DJANGO_SETTINGS_MODULE=tienda_celulares.settings_production``.
+
+Variables de entorno:
+
+- ``DJANGO_SECRET_KEY`` (obligatoria) y ``DJANGO_ALLOWED_HOSTS`` (separados
+  por comas).
+- ``DJANGO_CACHE_BACKEND`` / ``DJANGO_CACHE_LOCATION``: caché compartida por
+  todos los procesos. Por defecto en disco (``BASE_DIR/cache``); con varios
+  servidores usar Redis o Memcached, por ejemplo
+  ``django.core.cache.backends.redis.RedisCache`` y ``redis://127.0.0.1:6379``.
+- ``DJANGO_FRAGMENT_CACHE_BACKEND`` / ``DJANGO_FRAGMENT_CACHE_LOCATION``:
+  caché de las filas renderizadas (por defecto en memoria de cada proceso).
+- ``DJANGO_CACHE_MAX_ENTRIES``: límite de entradas de las cachés locales
+  (disco o memoria), por defecto 20000.
+- ``DJANGO_ROW_CACHE_TIMEOUT``: segundos que se guardan las filas
+  renderizadas de las listas (0 desactiva la caché de filas).
+- ``DJANGO_SESSION_ENGINE`` (en ``settings.py``): por defecto ``cached_db``,
+  que guarda las sesiones en la caché "default"; con
+  ``django.contrib.sessions.backends.signed_cookies`` no se consulta la base,
+  pero una sesión no se puede cerrar desde el servidor antes de que expire.
+- ``DJANGO_JOB_RESULTS_ROOT`` (en ``settings.py``): directorio privado de los
+  resultados de los trabajos (por defecto ``BASE_DIR/job_results``). No
+  tiene que estar dentro de lo que sirve el proxy como ``MEDIA_URL``.
+- ``DJANGO_CONN_MAX_AGE``: segundos que se reutiliza cada conexión a la
+  base (por defecto 600).
+- ``DJANGO_SQLITE_PATH``: archivo de la base SQLite (por defecto el de
+  ``settings.py``). Se usa en modo WAL con ``busy_timeout`` de
+  ``DJANGO_SQLITE_BUSY_TIMEOUT`` segundos (por defecto 20).
+- PostgreSQL: ``DJANGO_DB_ENGINE=postgresql`` y las variables ``DJANGO_DB_*``
+  de ``settings.py``. El pool de conexiones es PgBouncer en modo
+  "transaction" delante del servidor, con ``DJANGO_DB_PGBOUNCER=1``; sin él,
+  cada hilo mantiene su conexión persistente.
+- ``DJANGO_REPORTING_SQLITE_PATH`` o ``DJANGO_REPORTING_DB_HOST`` (y
+  ``DJANGO_REPORTING_DB_PORT``): base de la que leen reportes y
+  exportaciones. La copia SQLite se actualiza con
+  ``manage.py refresh_reporting_snapshot --interval 300``. Después de
+  escribir, una sesión lee de la principal durante
+  ``DJANGO_REPORTING_PIN_SECONDS`` (por defecto 300).
+"""
+import copy
+import os
+
+from .settings import *  # noqa: F401,F403
+from .settings import BASE_DIR, DATABASES as BASE_DATABASES, TEMPLATES as BASE_TEMPLATES
+
+DEBUG = False
+
+SECRET_KEY = os.environ['DJANGO_SECRET_KEY']
+
+ALLOWED_HOSTS = [host.strip() for host in os.environ.get('DJANGO_ALLOWED_HOSTS', '').split(',') if host.strip()]
+
+# Templates compilados una sola vez por proceso
+TEMPLATES = copy.deepcopy(BASE_TEMPLATES)
+TEMPLATES[0]['APP_DIRS'] = False
+TEMPLATES[0]['OPTIONS']['loaders'] = [
+    ('django.template.loaders.cached.Loader', [
+        'django.template.loaders.filesystem.Loader',
+        'django.template.loaders.app_directories.Loader',
+    ]),
+]
+TEMPLATES[0]['OPTIONS']['context_processors'] = [
+    processor for processor in TEMPLATES[0]['OPTIONS']['context_processors']
+    if processor != 'django.template.context_processors.debug'
+]
+
+# "default" tiene que ser compartida por todos los procesos: ahí está la
+# versión de las filas cacheadas, que cambian las señales del proceso que
+# guardó el cambio. Las filas renderizadas van en memoria de cada proceso
+# (leerlas de disco cuesta más que volver a renderizarlas).
+CACHES = {
+    'default': {
+        'BACKEND': os.environ.get('DJANGO_CACHE_BACKEND', 'django.core.cache.backends.filebased.FileBasedCache'),
+        'LOCATION': os.environ.get('DJANGO_CACHE_LOCATION', str(BASE_DIR / 'cache')),
+        'TIMEOUT': 3600,
+    },
+    'template_fragments': {
+        'BACKEND': os.environ.get('DJANGO_FRAGMENT_CACHE_BACKEND', 'django.core.cache.backends.locmem.LocMemCache'),
+        'LOCATION': os.environ.get('DJANGO_FRAGMENT_CACHE_LOCATION', 'template-fragments'),
+        'TIMEOUT': 3600,
+    },
+}
+for cache in CACHES.values():
+    if cache['BACKEND'].rsplit('.', 1)[0] in (
+        'django.core.cache.backends.filebased', 'django.core.cache.backends.locmem'
+    ):
+        # El límite por defecto (300) es menor que las filas de unas pocas
+        # páginas y fuerza purgas constantes
+        cache['OPTIONS'] = {'MAX_ENTRIES': int(os.environ.get('DJANGO_CACHE_MAX_ENTRIES', 20000))}
+
+ROW_FRAGMENT_CACHE_TIMEOUT = int(os.environ.get('DJANGO_ROW_CACHE_TIMEOUT', 3600))
+
+# Cada hilo reutiliza su conexión entre peticiones (se verifica antes de
+# usarla después de un error)
+DATABASES = copy.deepcopy(BASE_DATABASES)
+DATABASES['default'].update({
+    'CONN_MAX_AGE': int(os.environ.get('DJANGO_CONN_MAX_AGE', 600)),
+    'CONN_HEALTH_CHECKS': True,
+})
+
+if DATABASES['default']['ENGINE'] == 'django.db.backends.sqlite3':
+    # SQLite en modo WAL: las lecturas no esperan a las escrituras (una venta
+    # ya no frena los listados). Los PRAGMA los aplica
+    # inventory.db.configure_connection.
+    DATABASES['default'].update({
+        'NAME': os.environ.get('DJANGO_SQLITE_PATH', DATABASES['default']['NAME']),
+        # busy_timeout: el módulo sqlite3 lo aplica al abrir la conexión, antes
+        # que los PRAGMA (cambiar a WAL también necesita el bloqueo)
+        'OPTIONS': {'timeout': int(os.environ.get('DJANGO_SQLITE_BUSY_TIMEOUT', 20))},
+    })
+    SQLITE_PRAGMAS = {
+        'journal_mode': 'WAL',
+        # Con WAL, NORMAL no puede corromper la base; una caída del equipo
+        # puede perder solo las últimas transacciones confirmadas
+        'synchronous': 'NORMAL',
+        'mmap_size': 256 * 1024 * 1024,
+        # En KiB cuando es negativo: 64 MB de caché de páginas por conexión
+        'cache_size': -64 * 1024,
+        'temp_store': 'MEMORY',
+    }
+else:
+    DATABASES['default']['OPTIONS'] = {
+        'connect_timeout': int(os.environ.get('DJANGO_DB_CONNECT_TIMEOUT', 5)),
+    }
+    if os.environ.get('DJANGO_DB_PGBOUNCER') == '1':
+        # Detrás de PgBouncer en modo "transaction" cada transacción puede ir
+        # a otra conexión del servidor: los cursores con nombre (iterator())
+        # no sobreviven entre transacciones
+        DATABASES['default']['DISABLE_SERVER_SIDE_CURSORS'] = True
+
+# Base de reportes (ver inventory/routers.py): una copia SQLite que refresca
+# refresh_reporting_snapshot, o una réplica de PostgreSQL
+if os.environ.get('DJANGO_REPORTING_SQLITE_PATH'):
+    DATABASES['reporting'] = {
+        'ENGINE': 'django.db.backends.sqlite3',
+        'NAME': os.environ['DJANGO_REPORTING_SQLITE_PATH'],
+        # Conexión nueva por petición: así se ve la última copia
+        'CONN_MAX_AGE': 0,
+    }
+elif os.environ.get('DJANGO_REPORTING_DB_HOST'):
+    DATABASES['reporting'] = dict(
+        copy.deepcopy(DATABASES['default']),
+        HOST=os.environ['DJANGO_REPORTING_DB_HOST'],
+        PORT=os.environ.get('DJANGO_REPORTING_DB_PORT', DATABASES['default'].get('PORT', '')),
+    )
+# Tiempo que una sesión lee de la base principal después de escribir; no
+# menos que el retraso de la copia o de la réplica
+REPORTING_PIN_SECONDS = int(os.environ.get('DJANGO_REPORTING_PIN_SECONDS', 300))